@@ -0,0 +1,229 @@
+"""
+End-to-end throughput benchmark of the extractors and DataExporter against
+a local mock Mastodon server (benchmarks/mock_server.py).
+
+Usage: python benchmarks/bench_extractors.py [--statuses N] [--latency S]
+       [--page-size N] [--error-rate F] [--output results.json]
+
+Reports, per scenario, records/sec, request latency percentiles (p50/p95/p99,
+measured client-side around each HTTP round-trip), request and 429 counts
+and peak traced memory, as JSON. Memory is measured in a second, separate
+pass because tracemalloc slows the interpreter down enough to distort the
+timings. A final stream_latency entry times streamed statuses from publish
+to delivery, and how quickly the stream reader stops.
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+for path in (SRC_DIR, BENCH_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from extractors.search_handler import SearchHandler  # type: ignore[import]  # noqa: E402
+from extractors.statuses_extractor import StatusesExtractor  # type: ignore[import]  # noqa: E402
+from extractors.stream_extractor import StreamExtractor  # type: ignore[import]  # noqa: E402
+from extractors.timeline_extractor import TimelineExtractor  # type: ignore[import]  # noqa: E402
+from extractors.trends_extractor import TrendsExtractor  # type: ignore[import]  # noqa: E402
+from extractors.utils_parser import (  # type: ignore[import]  # noqa: E402
+    DEFAULT_SETTINGS,
+    MastodonClient,
+    create_client_from_settings,
+)
+from mock_server import MockMastodonServer  # noqa: E402
+from outputs.data_exporter import DataExporter  # type: ignore[import]  # noqa: E402
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run_scenario(
+    name: str,
+    server: MockMastodonServer,
+    client: MastodonClient,
+    produce: Callable[[], Any],
+    consume: Callable[[Any], int],
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    send = client.session.request
+
+    def timed_request(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return send(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    client.session.request = timed_request  # type: ignore[method-assign]
+    requests_before = server.requests
+    limited_before = server.rate_limited
+
+    started = time.perf_counter()
+    records = consume(produce())
+    elapsed = time.perf_counter() - started
+    requests_made = server.requests - requests_before
+    rate_limited = server.rate_limited - limited_before
+
+    client.session.request = send  # type: ignore[method-assign]
+    tracemalloc.start()
+    consume(produce())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "scenario": name,
+        "records": records,
+        "seconds": round(elapsed, 4),
+        "records_per_sec": round(records / elapsed, 1) if elapsed else None,
+        "requests": requests_made,
+        "rate_limited": rate_limited,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+        },
+        "peak_memory_bytes": peak,
+    }
+
+def stream_latency(
+    server: MockMastodonServer, client: MastodonClient, events: int = 20
+) -> Dict[str, Any]:
+    """
+    Time each streamed status from publish() on the server to its delivery by
+    StreamExtractor, then how long the reader takes to shut down once stopped.
+    """
+    extractor = StreamExtractor(client, stream="public", read_timeout=30.0)
+    connections = server.stream_connections
+    records = extractor.iter_records()
+    extractor.start()
+    deadline = time.monotonic() + 5.0
+    while server.stream_connections == connections and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    latencies: List[float] = []
+    for _ in range(events):
+        started = time.perf_counter()
+        server.publish()
+        next(records)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    extractor.stop()
+    stop_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    records.close()
+    shutdown_seconds = time.perf_counter() - started
+
+    return {
+        "scenario": "stream_latency",
+        "events": len(latencies),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+        "stop_ms": round(stop_seconds * 1000, 3),
+        "shutdown_ms": round(shutdown_seconds * 1000, 3),
+        "reader_alive": extractor._thread is not None and extractor._thread.is_alive(),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--statuses", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON here too")
+    parser.add_argument("--log-level", type=str, default="ERROR")
+    args = parser.parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.ERROR))
+
+    server = MockMastodonServer(
+        statuses=args.statuses,
+        page_size=args.page_size,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    )
+    with server, tempfile.TemporaryDirectory() as tmp:
+        settings = dict(DEFAULT_SETTINGS, base_url=server.base_url, retry_backoff=0.01)
+        client = create_client_from_settings(settings)
+        exporter = DataExporter(tmp)
+        exporter_compact = DataExporter(tmp, indent=None, compression="gzip")
+
+        def count(records: Any) -> int:
+            return sum(1 for _ in records)
+
+        def count_export(export: Callable[[Any, str], str]) -> Callable[[Any], int]:
+            def consume(records: Any) -> int:
+                counted = []
+
+                def tally(items: Any) -> Any:
+                    for item in items:
+                        counted.append(None)
+                        yield item
+
+                export(tally(records), "bench")
+                return len(counted)
+
+            return consume
+
+        timeline = TimelineExtractor(client)
+        statuses = StatusesExtractor(client)
+        search = SearchHandler(client)
+        trends = TrendsExtractor(client)
+
+        scenarios = [
+            ("timeline_iter", lambda: timeline.iter_timeline("bench", limit=None), count),
+            ("statuses_iter", lambda: statuses.iter_statuses("bench", limit=None), count),
+            ("trends", lambda: trends.fetch_trends(limit=20), count),
+            ("search_statuses", lambda: search.search_statuses("bench", limit=40), count),
+            (
+                "timeline_to_json",
+                lambda: timeline.iter_timeline("bench", limit=None),
+                count_export(exporter.export_json),
+            ),
+            (
+                "timeline_to_ndjson",
+                lambda: timeline.iter_timeline("bench", limit=None),
+                count_export(exporter.export_ndjson),
+            ),
+            (
+                "timeline_to_json_gzip_compact",
+                lambda: timeline.iter_timeline("bench", limit=None),
+                count_export(exporter_compact.export_json),
+            ),
+            (
+                "timeline_to_sqlite",
+                lambda: timeline.iter_timeline("bench", limit=None),
+                count_export(exporter.export_sqlite),
+            ),
+        ]
+
+        results = {
+            "config": vars(args),
+            "scenarios": [
+                run_scenario(name, server, client, produce, consume)
+                for name, produce, consume in scenarios
+            ]
+            + [stream_latency(server, client)],
+        }
+        client.close()
+
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
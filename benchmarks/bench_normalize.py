@@ -0,0 +1,109 @@
+"""
+Micro-benchmarks for response decoding and status normalization.
+
+Usage: python benchmarks/bench_normalize.py [--statuses N] [--repeat R]
+
+Prints a JSON object with per-variant throughput (statuses/sec) and the
+memory held by N normalized records.
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors import utils_parser  # type: ignore[import]  # noqa: E402
+from extractors.utils_parser import (  # type: ignore[import]  # noqa: E402
+    normalize_status,
+    normalize_statuses,
+)
+
+def make_statuses(count: int) -> List[Dict[str, Any]]:
+    statuses = []
+    for i in range(count):
+        statuses.append(
+            {
+                "id": str(110000000000000000 + i),
+                "created_at": "2025-01-03T14:22:11.000Z",
+                "content": f"<p>Status number {i} about #fediverse</p>",
+                "url": f"https://mastodon.social/@user{i % 97}/{i}",
+                "uri": f"https://mastodon.social/users/user{i % 97}/statuses/{i}",
+                "replies_count": i % 5,
+                "reblogs_count": i % 11,
+                "favourites_count": i % 23,
+                "account": {"id": str(i % 97), "acct": f"user{i % 97}", "username": f"user{i % 97}"},
+                "media_attachments": (
+                    [{"url": f"https://files.example/{i}.png"}] if i % 4 == 0 else []
+                ),
+                "tags": [{"name": "fediverse"}],
+            }
+        )
+    return statuses
+
+def time_it(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    gc.collect()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def measure_memory(build: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--statuses", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    statuses = make_statuses(args.statuses)
+    payload = json.dumps(statuses).encode("utf-8")
+    n = len(statuses)
+
+    variants: Dict[str, Callable[[], Any]] = {
+        "normalize_status_per_item": lambda: [
+            normalize_status(s, tag="fediverse") for s in statuses
+        ],
+        "normalize_statuses_batch": lambda: normalize_statuses(statuses, tag="fediverse"),
+        "normalize_statuses_compact": lambda: normalize_statuses(
+            statuses, tag="fediverse", compact=True
+        ),
+        "decode_stdlib_json": lambda: json.loads(payload),
+        "decode_default": lambda: utils_parser.json_loads(payload),
+    }
+
+    results: Dict[str, Any] = {
+        "statuses": n,
+        "orjson_available": utils_parser.orjson is not None,
+        "throughput_per_sec": {},
+        "memory_bytes": {},
+    }
+    for name, func in variants.items():
+        results["throughput_per_sec"][name] = round(n / time_it(func, args.repeat))
+
+    results["memory_bytes"]["dict_records"] = measure_memory(
+        lambda: normalize_statuses(statuses, tag="fediverse")
+    )
+    results["memory_bytes"]["compact_records"] = measure_memory(
+        lambda: normalize_statuses(statuses, tag="fediverse", compact=True)
+    )
+
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+if __name__ == "__main__":
+    main()
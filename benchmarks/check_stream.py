@@ -0,0 +1,107 @@
+"""
+Reconnect and gap-fill check of StreamExtractor against the local mock
+Mastodon server (benchmarks/mock_server.py).
+
+Usage: python benchmarks/check_stream.py [--statuses N] [--disconnect-after N]
+
+The server drops every streaming connection after a few events while
+statuses keep being published, so some are posted while the extractor is
+reconnecting and can only come back through the REST gap-fill (min_id).
+Checks that every published status arrives exactly once and prints a JSON
+summary; exits with status 1 if a status is missing or duplicated.
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+for path in (SRC_DIR, BENCH_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from extractors.metrics import STREAM_GAP_FILLED  # type: ignore[import]  # noqa: E402
+from extractors.stream_extractor import StreamExtractor  # type: ignore[import]  # noqa: E402
+from extractors.utils_parser import (  # type: ignore[import]  # noqa: E402
+    DEFAULT_SETTINGS,
+    create_client_from_settings,
+)
+from mock_server import MockMastodonServer  # noqa: E402
+
+def check_reconnects(
+    statuses: int = 60, disconnect_after: int = 5, interval: float = 0.02, timeout: float = 30.0
+) -> Dict[str, Any]:
+    """
+    Publish `statuses` statuses across forced disconnects and collect what the
+    extractor delivers.
+
+    :return: Summary with the published, missing and duplicated status IDs.
+    """
+    server = MockMastodonServer(statuses=10, stream_disconnect_after=disconnect_after)
+    with server:
+        settings = dict(DEFAULT_SETTINGS, base_url=server.base_url, retry_backoff=0.01)
+        client = create_client_from_settings(settings)
+        # Long enough for several statuses to be published while disconnected.
+        extractor = StreamExtractor(
+            client, stream="public", reconnect_delay=0.2, reconnect_delay_max=0.2
+        )
+        gap_filled_before = STREAM_GAP_FILLED.value(stream="public")
+        records = extractor.iter_records(duration=timeout)
+        extractor.start()
+        deadline = time.monotonic() + 5.0
+        while server.stream_connections == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        published: List[str] = []
+        received: List[str] = []
+
+        def publish() -> None:
+            for _ in range(statuses):
+                published.extend(status["id"] for status in server.publish())
+                time.sleep(interval)
+            wait_until = time.monotonic() + timeout
+            while not set(published) <= set(received) and time.monotonic() < wait_until:
+                time.sleep(0.05)
+            # Keep reading a little longer so a late duplicate would show up.
+            time.sleep(1.0)
+            extractor.stop()
+
+        publisher = threading.Thread(target=publish, daemon=True)
+        publisher.start()
+        for record in records:
+            received.append(record["status_id"])
+        publisher.join()
+        client.close()
+
+    counts = Counter(received)
+    return {
+        "published": len(published),
+        "received": len(received),
+        "reconnects": extractor.reconnects,
+        "gap_filled": STREAM_GAP_FILLED.value(stream="public") - gap_filled_before,
+        "missing": sorted(set(published) - set(counts)),
+        "duplicates": sorted(status_id for status_id, n in counts.items() if n > 1),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--statuses", type=int, default=60)
+    parser.add_argument("--disconnect-after", type=int, default=5)
+    parser.add_argument("--log-level", type=str, default="ERROR")
+    args = parser.parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.ERROR))
+
+    result = check_reconnects(statuses=args.statuses, disconnect_after=args.disconnect_after)
+    print(json.dumps(result, indent=2))
+    ok = not result["missing"] and not result["duplicates"] and result["reconnects"] > 0
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Local stand-in for the parts of the Mastodon REST API used by the extractors.
+
+Serves synthetic, deterministic statuses with Link-header pagination
+(max_id / since_id / min_id), trends, account lookup and search, with
+configurable latency, page size and 429 injection. Media attachments are
+served with Range support (several indexes share identical bytes, to
+exercise content de-duplication), and status contexts are reply chains of
+ten consecutive statuses. The streaming endpoints send newly published
+statuses as server-sent events and can drop the connection after a number
+of events to exercise reconnects.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+BASE_STATUS_ID = 110000000000000000
+
+def media_body(index: int, size: int = 256 * 1024) -> bytes:
+    # Only 7 distinct files, so different URLs often have identical content.
+    seed = f"media-{index % 7}".encode("ascii")
+    return (seed * (size // len(seed) + 1))[:size]
+
+def make_status(index: int, host: str) -> Dict[str, Any]:
+    account = f"user{index % 500}"
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=index * 37)
+    status_id = str(BASE_STATUS_ID + index)
+    return {
+        "id": status_id,
+        "created_at": created.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "content": f"<p>Synthetic status {index} about <a href=\"https://{host}/tags/bench\">#bench</a></p>",
+        "url": f"https://{host}/@{account}/{status_id}",
+        "uri": f"https://{host}/users/{account}/statuses/{status_id}",
+        "replies_count": index % 7,
+        "reblogs_count": index % 13,
+        "favourites_count": index % 29,
+        "account": {"id": str(index % 500), "acct": account, "username": account},
+        "media_attachments": (
+            [{"url": f"http://{host}/media/{index}.png"}] if index % 5 == 0 else []
+        ),
+        "tags": [{"name": "bench"}],
+    }
+
+class MockMastodonServer:
+    """
+    Threaded HTTP server emulating a Mastodon instance on 127.0.0.1.
+
+    :param statuses: Number of statuses in every timeline / account feed.
+    :param page_size: Server-side cap on `limit` (Mastodon uses 40).
+    :param latency: Seconds to sleep before answering each request.
+    :param error_rate: Fraction of requests answered with 429.
+    :param retry_after: Retry-After value sent with injected 429s.
+    :param rate_limit: Budget advertised in X-RateLimit-* headers per 5 minutes.
+    :param stream_interval: Seconds between automatically published statuses
+        (0 = only publish() adds statuses).
+    :param stream_disconnect_after: Close each streaming connection after this
+        many events (0 = keep it open).
+    :param heartbeat: Seconds between ":thump" comments on idle streams.
+    """
+
+    def __init__(
+        self,
+        statuses: int = 2000,
+        page_size: int = 40,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 0.0,
+        rate_limit: int = 1_000_000,
+        seed: int = 1,
+        stream_interval: float = 0.0,
+        stream_disconnect_after: int = 0,
+        heartbeat: float = 1.0,
+    ) -> None:
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self.stream_interval = stream_interval
+        self.stream_disconnect_after = stream_disconnect_after
+        self.heartbeat = heartbeat
+        self.requests = 0
+        self.rate_limited = 0
+        self.stream_connections = 0
+        self.media_requests = 0
+        self.context_requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+        self._stopped = threading.Event()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._host = f"127.0.0.1:{self._httpd.server_port}"
+        # Newest first, like Mastodon timelines.
+        self.statuses: List[Dict[str, Any]] = [
+            make_status(i, self._host) for i in reversed(range(statuses))
+        ]
+        # Every status published after startup, oldest first.
+        self.published: List[Dict[str, Any]] = []
+        self._next_index = statuses
+        self._thread: Optional[threading.Thread] = None
+        self._publisher: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def start(self) -> "MockMastodonServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        if self.stream_interval > 0:
+            self._publisher = threading.Thread(target=self._publish_loop, daemon=True)
+            self._publisher.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._published:
+            self._published.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockMastodonServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _should_rate_limit(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            limited = self.error_rate > 0 and self._random.random() < self.error_rate
+            if limited:
+                self.rate_limited += 1
+            return limited
+
+    def publish(self, count: int = 1) -> List[Dict[str, Any]]:
+        """
+        Post new statuses: they show up in the REST timelines and are pushed
+        to every open stream.
+        """
+        with self._published:
+            new = [make_status(self._next_index + i, self._host) for i in range(count)]
+            self._next_index += count
+            self.statuses = list(reversed(new)) + self.statuses
+            self.published.extend(new)
+            self._published.notify_all()
+        return new
+
+    def _publish_loop(self) -> None:
+        while not self._stopped.wait(self.stream_interval):
+            self.publish()
+
+    def subscribe(self) -> int:
+        """
+        Register a streaming connection; returns its position in `published`.
+        """
+        with self._published:
+            self.stream_connections += 1
+            return len(self.published)
+
+    def stream_events(self, write: Any, position: int) -> None:
+        """
+        Serve one streaming connection: "update" events for statuses published
+        after subscribe(), heartbeats while idle.
+        """
+        sent = 0
+        while not self._stopped.is_set():
+            with self._published:
+                if position >= len(self.published):
+                    self._published.wait(self.heartbeat)
+                pending = self.published[position:]
+                position += len(pending)
+            if not pending:
+                write(b":thump\n\n")
+                continue
+            for status in pending:
+                write(b"event: update\ndata: " + json.dumps(status).encode("utf-8") + b"\n\n")
+                sent += 1
+                if self.stream_disconnect_after and sent >= self.stream_disconnect_after:
+                    return
+
+    def paginate(self, path: str, query: Dict[str, str]) -> Tuple[List[Any], Dict[str, str]]:
+        limit = max(1, min(int(query.get("limit", 20)), self.page_size))
+        items = self.statuses
+        if "max_id" in query:
+            items = [s for s in items if int(s["id"]) < int(query["max_id"])]
+        if "since_id" in query:
+            items = [s for s in items if int(s["id"]) > int(query["since_id"])]
+        if "min_id" in query:
+            items = [s for s in items if int(s["id"]) > int(query["min_id"])][-limit:]
+        page = items[:limit]
+        headers: Dict[str, str] = {}
+        if page:
+            headers["Link"] = (
+                f'<{self.base_url}{path}?max_id={page[-1]["id"]}&limit={limit}>; rel="next", '
+                f'<{self.base_url}{path}?min_id={page[0]["id"]}&limit={limit}>; rel="prev"'
+            )
+        return page, headers
+
+    def route(self, path: str, query: Dict[str, str]) -> Tuple[int, Any, Dict[str, str]]:
+        if path == "/api/v1/accounts/lookup":
+            acct = query.get("acct", "")
+            return 200, {"id": str(zlib.crc32(acct.encode())), "acct": acct, "username": acct}, {}
+        if path.startswith("/api/v1/statuses/") and path.endswith("/context"):
+            return 200, self._context(path), {}
+        if path == "/api/v1/trends/tags":
+            limit = int(query.get("limit", 10))
+            return 200, [self._trend(i) for i in range(limit)], {}
+        if path == "/api/v2/search":
+            return 200, self._search(query), {}
+        if path.startswith("/api/v1/accounts/") and path.endswith(("/followers", "/following")):
+            page, headers = self._relations(path, query)
+            return 200, page, headers
+        if path.startswith("/api/v1/timelines/") or (
+            path.startswith("/api/v1/accounts/") and path.endswith("/statuses")
+        ):
+            page, headers = self.paginate(path, query)
+            return 200, page, headers
+        return 404, {"error": "Record not found"}, {}
+
+    def _relations(self, path: str, query: Dict[str, str]) -> Tuple[List[Any], Dict[str, str]]:
+        # Deterministic graph over 500 accounts: account n follows n+1 .. n+7.
+        _, _, _, _, account_id, direction = path.split("/")
+        try:
+            n = int(account_id) % 500
+        except ValueError:
+            return [], {}
+        offsets = range(1, 8)
+        ids = sorted(
+            ((n + k) % 500 for k in offsets) if direction == "following"
+            else ((n - k) % 500 for k in offsets),
+            reverse=True,
+        )
+        if "max_id" in query:
+            ids = [i for i in ids if i < int(query["max_id"])]
+        limit = max(1, min(int(query.get("limit", 40)), self.page_size))
+        page = ids[:limit]
+        headers: Dict[str, str] = {}
+        if len(ids) > limit:
+            headers["Link"] = f'<{self.base_url}{path}?max_id={page[-1]}&limit={limit}>; rel="next"'
+        return [{"id": str(i), "acct": f"user{i}", "username": f"user{i}"} for i in page], headers
+
+    def _context(self, path: str) -> Dict[str, Any]:
+        # Every 10 consecutive statuses form one reply chain, oldest first.
+        with self._lock:
+            self.context_requests += 1
+        try:
+            index = int(path.split("/")[4]) - BASE_STATUS_ID
+        except ValueError:
+            return {"ancestors": [], "descendants": []}
+        first = index - index % 10
+        chain = []
+        for member in range(first, first + 10):
+            status = make_status(member, self._host)
+            status["in_reply_to_id"] = str(BASE_STATUS_ID + member - 1) if member > first else None
+            chain.append(status)
+        return {
+            "ancestors": chain[: index - first],
+            "descendants": chain[index - first + 1 :],
+        }
+
+    def _trend(self, index: int) -> Dict[str, Any]:
+        today = int(datetime.now(timezone.utc).replace(hour=0, minute=0, second=0).timestamp())
+        return {
+            "name": f"trend{index}",
+            "url": f"{self.base_url}/tags/trend{index}",
+            "history": [
+                {
+                    "day": str(today - day * 86400),
+                    "uses": str((index + 1) * (7 - day) * 3),
+                    "accounts": str((index + 1) * (7 - day)),
+                }
+                for day in range(7)
+            ],
+        }
+
+    def _search(self, query: Dict[str, str]) -> Dict[str, Any]:
+        limit = max(1, min(int(query.get("limit", 20)), 40))
+        offset = int(query.get("offset", 0))
+        kind = query.get("type")
+        window = slice(offset, offset + limit)
+        result: Dict[str, Any] = {"accounts": [], "hashtags": [], "statuses": []}
+        if kind in (None, "accounts"):
+            result["accounts"] = [
+                {"id": str(i), "acct": f"user{i}", "username": f"user{i}",
+                 "note": f"<p>Account {i}</p>", "url": f"{self.base_url}/@user{i}"}
+                for i in range(500)
+            ][window]
+        if kind in (None, "hashtags"):
+            result["hashtags"] = [self._trend(i) for i in range(200)][window]
+        if kind in (None, "statuses"):
+            result["statuses"] = self.statuses[window]
+        return result
+
+    def _make_handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                pass
+
+            def do_GET(self) -> None:  # noqa: N802
+                if server.latency:
+                    time.sleep(server.latency)
+                parts = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                if parts.path.startswith("/api/v1/streaming/"):
+                    self._stream()
+                    return
+                if parts.path.startswith("/media/"):
+                    self._media(parts.path)
+                    return
+                reset = (datetime.now(timezone.utc) + timedelta(minutes=5)).isoformat()
+                headers = {
+                    "X-RateLimit-Limit": str(server.rate_limit),
+                    "X-RateLimit-Remaining": str(server.rate_limit),
+                    "X-RateLimit-Reset": reset,
+                }
+                if server._should_rate_limit():
+                    status, payload = 429, {"error": "Too many requests"}
+                    headers["Retry-After"] = str(server.retry_after)
+                else:
+                    status, payload, extra = server.route(parts.path, query)
+                    headers.update(extra)
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _media(self, path: str) -> None:
+                with server._lock:
+                    server.media_requests += 1
+                try:
+                    body = media_body(int(path.rsplit("/", 1)[-1].split(".")[0]))
+                except ValueError:
+                    body = b""
+                status, start = 200, 0
+                requested = self.headers.get("Range", "")
+                if requested.startswith("bytes="):
+                    start = int(requested[len("bytes="):].split("-")[0] or 0)
+                    if start >= len(body):
+                        self.send_response(416)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    status = 206
+                self.send_response(status)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(body) - start))
+                if status == 206:
+                    self.send_header(
+                        "Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}"
+                    )
+                self.end_headers()
+                self.wfile.write(body[start:])
+
+            def _stream(self) -> None:
+                # No Content-Length: the body runs until the connection closes.
+                self.close_connection = True
+                position = server.subscribe()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def write(chunk: bytes) -> None:
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+
+                try:
+                    server.stream_events(write, position)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
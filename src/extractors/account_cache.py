@@ -0,0 +1,114 @@
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .utils_parser import DEFAULT_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+def normalize_username(username: str) -> str:
+    return username.strip().lstrip("@").lower()
+
+class AccountIdCache:
+    """
+    Persistent username -> account_id cache backed by SQLite.
+
+    Entries are keyed by (instance, username) and expire after `ttl` seconds,
+    so renamed or migrated accounts are eventually looked up again.
+    """
+
+    def __init__(self, path: str, ttl: float = 86400.0) -> None:
+        self.path = Path(path).resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS account_ids (
+                    instance TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    account_id TEXT NOT NULL,
+                    resolved_at REAL NOT NULL,
+                    PRIMARY KEY (instance, username)
+                )
+                """
+            )
+        logger.debug("AccountIdCache initialized at %s", self.path)
+
+    def get(self, instance: str, username: str) -> Optional[str]:
+        return self.get_many(instance, [username]).get(normalize_username(username))
+
+    def get_many(self, instance: str, usernames: Iterable[str]) -> Dict[str, str]:
+        """
+        Return cached, unexpired account IDs for the given usernames.
+
+        :return: Mapping of normalized username to account ID (hits only).
+        """
+        names = list({normalize_username(u) for u in usernames})
+        if not names:
+            return {}
+        cutoff = time.time() - self.ttl
+        hits: Dict[str, str] = {}
+        with self._lock:
+            # Chunk to stay under SQLite's bound-parameter limit.
+            for start in range(0, len(names), 500):
+                chunk = names[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT username, account_id FROM account_ids "
+                    f"WHERE instance = ? AND resolved_at >= ? AND username IN ({placeholders})",
+                    [instance, cutoff, *chunk],
+                ).fetchall()
+                hits.update(rows)
+        return hits
+
+    def put(self, instance: str, username: str, account_id: str) -> None:
+        self.put_many(instance, {username: account_id})
+
+    def put_many(self, instance: str, account_ids: Dict[str, str]) -> None:
+        now = time.time()
+        rows = [
+            (instance, normalize_username(username), str(account_id), now)
+            for username, account_id in account_ids.items()
+            if account_id
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO account_ids "
+                "(instance, username, account_id, resolved_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired entries and return how many were removed.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM account_ids WHERE resolved_at < ?",
+                (time.time() - self.ttl,),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def create_account_cache_from_settings(settings: Dict[str, Any]) -> Optional[AccountIdCache]:
+    """
+    Build an AccountIdCache from settings, or None when account_cache_path is unset.
+    """
+    path = settings.get("account_cache_path")
+    if not path:
+        return None
+    return AccountIdCache(
+        path,
+        ttl=float(settings.get("account_cache_ttl", DEFAULT_SETTINGS["account_cache_ttl"])),
+    )
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .utils_parser import (
+    DEFAULT_SETTINGS,
+    MAX_PAGE_SIZE,
+    MastodonClient,
+    Paginator,
+    create_client_from_settings,
+)
+
+logger = logging.getLogger(__name__)
+
+class AsyncMastodonClient:
+    """
+    asyncio front-end for MastodonClient with a bounded concurrency limit.
+
+    Requests are dispatched to a dedicated thread pool sized to the
+    concurrency limit and share the wrapped client's requests.Session, whose
+    connection pool is enlarged to match so sockets are reused across tasks.
+    """
+
+    def __init__(self, client: MastodonClient, concurrency: int = 10) -> None:
+        self.client = client
+        self.concurrency = max(1, int(concurrency))
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix="mastodon-async",
+        )
+        self.client.set_pool_size(self.concurrency)
+        logger.debug(
+            "Initialized AsyncMastodonClient with concurrency=%d", self.concurrency
+        )
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Perform a GET request to the Mastodon API without blocking the event loop.
+
+        :param path: API path starting with '/api/...'
+        :param params: Query parameters dictionary.
+        :return: Parsed JSON response.
+        """
+        return await self._run(self.client.get, path, params)
+
+    async def get_page(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        rel: str = "next",
+        cursor_key: str = "max_id",
+    ) -> Tuple[Any, Optional[str]]:
+        """
+        Async counterpart of MastodonClient.get_page.
+        """
+        return await self._run(self.client.get_page, path, params, rel, cursor_key)
+
+    async def iter_pages(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[List[Any]]:
+        """
+        Async counterpart of MastodonClient.iter_pages.
+        """
+        pager = Paginator(path, params, limit=limit, page_size=page_size)
+        while True:
+            page_params = pager.next_params()
+            if page_params is None:
+                return
+            payload, cursor = await self.get_page(
+                path, page_params, pager.rel, pager.cursor_key
+            )
+            page = pager.feed(payload, cursor)
+            if page is None:
+                return
+            yield page
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.client.close()
+
+def create_async_client_from_settings(settings: Dict[str, Any]) -> AsyncMastodonClient:
+    """
+    Build an AsyncMastodonClient instance from settings dictionary.
+    """
+    return AsyncMastodonClient(
+        create_client_from_settings(settings),
+        concurrency=int(settings.get("concurrency", DEFAULT_SETTINGS["concurrency"])),
+    )
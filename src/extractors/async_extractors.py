@@ -0,0 +1,319 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .account_cache import AccountIdCache, normalize_username
+from .async_client import AsyncMastodonClient
+from .search_handler import SEARCH_TYPES, SearchHandler, SearchPager
+from .trends_extractor import TrendsExtractor
+from .utils_parser import normalize_statuses
+
+logger = logging.getLogger(__name__)
+
+class AsyncTrendsExtractor:
+    """
+    asyncio version of TrendsExtractor.
+    """
+
+    def __init__(self, client: AsyncMastodonClient) -> None:
+        self.client = client
+
+    async def fetch_trends(self, limit: int = 20) -> List[Dict[str, Any]]:
+        logger.info("Fetching up to %d trends from Mastodon", limit)
+        raw_trends = await self.client.get("/api/v1/trends/tags", params={"limit": limit})
+        records = TrendsExtractor.normalize_trends(raw_trends, limit)
+        logger.info("Fetched %d normalized trend records", len(records))
+        return records
+
+class AsyncStatusesExtractor:
+    """
+    asyncio version of StatusesExtractor with concurrent multi-account fetching.
+    """
+
+    def __init__(
+        self,
+        client: AsyncMastodonClient,
+        account_cache: Optional[AccountIdCache] = None,
+    ) -> None:
+        self.client = client
+        self.account_cache = account_cache
+        self._resolved: Dict[str, Optional[str]] = {}
+
+    async def _lookup_account_id(self, username: str) -> Optional[str]:
+        name = normalize_username(username)
+        if name in self._resolved:
+            return self._resolved[name]
+        resolved = await self.lookup_account_ids([name])
+        return resolved[name]
+
+    async def _fetch_account_id(self, username: str) -> Optional[str]:
+        logger.info("Looking up account for username=%s", username)
+        try:
+            account = await self.client.get(
+                "/api/v1/accounts/lookup", params={"acct": username}
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Account lookup failed for %s: %s", username, exc)
+            return None
+
+        account_id = account.get("id") if isinstance(account, dict) else None
+        if not account_id:
+            logger.warning("No account found for username=%s", username)
+        return account_id
+
+    async def lookup_account_ids(self, usernames: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve many usernames concurrently, looking up only cache misses.
+
+        :return: Mapping of normalized username to account ID (None if not found).
+        """
+        names = list(dict.fromkeys(normalize_username(u) for u in usernames))
+        resolved = {name: self._resolved[name] for name in names if name in self._resolved}
+        if self.account_cache is not None:
+            pending = [name for name in names if name not in resolved]
+            resolved.update(
+                self.account_cache.get_many(self.client.client.base_url, pending)
+            )
+
+        misses = [name for name in names if name not in resolved]
+        if misses:
+            found = await asyncio.gather(*(self._fetch_account_id(name) for name in misses))
+            fetched = dict(zip(misses, found))
+            if self.account_cache is not None:
+                self.account_cache.put_many(
+                    self.client.client.base_url,
+                    {name: account_id for name, account_id in fetched.items() if account_id},
+                )
+            resolved.update(fetched)
+
+        self._resolved.update(resolved)
+        return {name: resolved.get(name) for name in names}
+
+    async def fetch_statuses(
+        self,
+        username: str,
+        from_id: Optional[str] = None,
+        limit: Optional[int] = 40,
+        min_id: Optional[str] = None,
+    ) -> List[Mapping[str, Any]]:
+        """
+        Fetch statuses for a given username, following pagination.
+
+        :param username: Mastodon username (acct).
+        :param from_id: Optional status ID to fetch statuses since.
+        :param limit: Maximum number of statuses to fetch (None = all).
+        :param min_id: Optional status ID to resume after; pages are walked
+            oldest-first from it, so stopping at the limit never leaves a gap.
+        :return: List of normalized records as compact StatusRecords.
+        """
+        account_id = await self._lookup_account_id(username)
+        if not account_id:
+            return []
+
+        params: Dict[str, Any] = {
+            "exclude_replies": False,
+            "exclude_reblogs": False,
+        }
+        if from_id:
+            params["since_id"] = from_id
+        if min_id:
+            params["min_id"] = min_id
+
+        records: List[Mapping[str, Any]] = []
+        try:
+            async for page in self.client.iter_pages(
+                f"/api/v1/accounts/{account_id}/statuses",
+                params=params,
+                limit=limit,
+            ):
+                records.extend(normalize_statuses(page, compact=True))
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Failed to fetch statuses for %s: %s", username, exc)
+
+        logger.info(
+            "Fetched %d normalized statuses for username=%s",
+            len(records),
+            username,
+        )
+        return records
+
+    async def fetch_many(
+        self,
+        usernames: Iterable[str],
+        from_id: Optional[str] = None,
+        limit: Optional[int] = 40,
+        min_ids: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, List[Mapping[str, Any]]]:
+        """
+        Fetch statuses for several usernames concurrently.
+
+        :param min_ids: Optional per-username resume IDs (see fetch_statuses).
+        :return: Mapping of username to its normalized records.
+        """
+        usernames = list(dict.fromkeys(usernames))
+        min_ids = min_ids or {}
+        await self.lookup_account_ids(usernames)
+        results = await asyncio.gather(
+            *(
+                self.fetch_statuses(u, from_id=from_id, limit=limit, min_id=min_ids.get(u))
+                for u in usernames
+            )
+        )
+        return dict(zip(usernames, results))
+
+class AsyncTimelineExtractor:
+    """
+    asyncio version of TimelineExtractor with concurrent multi-tag fetching.
+    """
+
+    def __init__(self, client: AsyncMastodonClient) -> None:
+        self.client = client
+
+    async def fetch_timeline(
+        self,
+        tag: str,
+        from_id: Optional[str] = None,
+        limit: Optional[int] = 40,
+        min_id: Optional[str] = None,
+    ) -> List[Mapping[str, Any]]:
+        """
+        Fetch a hashtag timeline, following pagination.
+
+        :param tag: Hashtag (without #).
+        :param from_id: Optional status ID to fetch since.
+        :param limit: Maximum number of statuses to fetch (None = all).
+        :param min_id: Optional status ID to resume after; pages are walked
+            oldest-first from it, so stopping at the limit never leaves a gap.
+        :return: List of normalized records as compact StatusRecords.
+        """
+        params: Dict[str, Any] = {}
+        if from_id:
+            params["since_id"] = from_id
+        if min_id:
+            params["min_id"] = min_id
+
+        normalized_tag = tag.lstrip("#")
+        records: List[Mapping[str, Any]] = []
+        try:
+            async for page in self.client.iter_pages(
+                f"/api/v1/timelines/tag/{normalized_tag}",
+                params=params,
+                limit=limit,
+            ):
+                records.extend(normalize_statuses(page, tag=normalized_tag, compact=True))
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Failed to fetch timeline for tag=%s: %s", normalized_tag, exc)
+
+        logger.info(
+            "Fetched %d normalized timeline statuses for tag=%s",
+            len(records),
+            normalized_tag,
+        )
+        return records
+
+    async def fetch_many(
+        self,
+        tags: Iterable[str],
+        from_id: Optional[str] = None,
+        limit: Optional[int] = 40,
+        min_ids: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, List[Mapping[str, Any]]]:
+        """
+        Fetch several hashtag timelines concurrently.
+
+        :param min_ids: Optional per-tag resume IDs (see fetch_timeline).
+        :return: Mapping of tag (without #) to its normalized records.
+        """
+        tags = list(dict.fromkeys(t.lstrip("#") for t in tags))
+        min_ids = min_ids or {}
+        results = await asyncio.gather(
+            *(
+                self.fetch_timeline(t, from_id=from_id, limit=limit, min_id=min_ids.get(t))
+                for t in tags
+            )
+        )
+        return dict(zip(tags, results))
+
+class AsyncSearchHandler:
+    """
+    asyncio version of SearchHandler with concurrent multi-query search.
+    """
+
+    def __init__(self, client: AsyncMastodonClient) -> None:
+        self.client = client
+
+    async def fetch_raw(
+        self, query: str, search_type: str = "statuses", limit: int = 20
+    ) -> Dict[str, List[Any]]:
+        """
+        Fetch all pages of a search without normalizing them.
+
+        :param query: Text query.
+        :param search_type: One of accounts, hashtags, statuses, or "all".
+        :param limit: Maximum number of results per result type.
+        :return: Mapping of result type -> raw items.
+        """
+        pager = SearchPager(
+            query, search_type, limit, paginate=bool(self.client.client.access_token)
+        )
+        raw: Dict[str, List[Any]] = {t: [] for t in pager.remaining}
+        while True:
+            params = pager.next_params()
+            if params is None:
+                return raw
+            page = pager.feed(await self.client.get("/api/v2/search", params=params))
+            for result_type, items in page.items():
+                raw[result_type].extend(items)
+
+    async def search(
+        self, query: str, search_type: str = "statuses", limit: int = 20
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run a search, following offset pagination.
+
+        :param query: Text query.
+        :param search_type: One of accounts, hashtags, statuses, or "all".
+        :param limit: Maximum number of results per result type.
+        :return: Mapping of result type -> normalized records.
+        """
+        results = SearchHandler.normalize_page(
+            await self.fetch_raw(query, search_type, limit), query
+        )
+        for result_type, records in results.items():
+            logger.info("Search %s returned %d records", result_type, len(records))
+        return results
+
+    async def search_accounts(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        return (await self.search(query, "accounts", limit))["accounts"]
+
+    async def search_hashtags(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        return (await self.search(query, "hashtags", limit))["hashtags"]
+
+    async def search_statuses(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        return (await self.search(query, "statuses", limit))["statuses"]
+
+    async def search_many(
+        self,
+        queries: Iterable[str],
+        search_type: str = "statuses",
+        limit: int = 20,
+    ) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Run several searches concurrently; failed queries map to empty results.
+
+        :return: Mapping of query to its records per result type.
+        """
+        queries = list(dict.fromkeys(queries))
+        results = await asyncio.gather(
+            *(self.search(q, search_type, limit) for q in queries),
+            return_exceptions=True,
+        )
+        types = SEARCH_TYPES if search_type == "all" else (search_type,)
+        merged: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for query, result in zip(queries, results):
+            if isinstance(result, BaseException):
+                logger.error("Search failed for query=%r: %s", query, result)
+                merged[query] = {t: [] for t in types}
+            else:
+                merged[query] = result
+        return merged
@@ -0,0 +1,269 @@
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from html.parser import HTMLParser
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .metrics import CONTENT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Fields added to every record by the content stage.
+CONTENT_FIELDS = ("text", "hashtags", "mentions", "links", "language")
+
+_BLOCK_TAGS = {"p", "div", "blockquote", "li", "pre", "h1", "h2", "h3", "h4", "h5", "h6"}
+
+# Non-Latin scripts identify the language (or a small family) on their own.
+_SCRIPTS: Tuple[Tuple[str, str], ...] = (
+    ("ja", r"[぀-ヿ]"),
+    ("ko", r"[가-힯]"),
+    ("zh", r"[一-鿿]"),
+    ("ru", r"[Ѐ-ӿ]"),
+    ("ar", r"[؀-ۿ]"),
+    ("he", r"[֐-׿]"),
+    ("el", r"[Ͱ-Ͽ]"),
+    ("th", r"[฀-๿]"),
+    ("hi", r"[ऀ-ॿ]"),
+)
+_SCRIPT_PATTERNS = [(language, re.compile(pattern)) for language, pattern in _SCRIPTS]
+
+# Latin-script languages are told apart by their most frequent function words.
+_STOPWORDS = {
+    "en": "the and is are was to of in that it for on with this you not be have",
+    "de": "der die das und ist nicht ich ein eine zu mit auf den von sie es für",
+    "fr": "le la les et est une des pas je que qui dans pour sur du avec ce",
+    "es": "el la los las y es una que de en por con para no se lo del",
+    "pt": "o a os as e é um uma que de em para com não do da no na",
+    "it": "il lo la gli le e è un una che di per con non del della sono",
+    "nl": "de het een en is niet ik dat van op te met voor zijn er",
+}
+_STOPWORD_SETS = {language: set(words.split()) for language, words in _STOPWORDS.items()}
+_WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+class _ContentParser(HTMLParser):
+    """
+    Collects plain text, hashtags, mentions and links from Mastodon status HTML.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.hashtags: List[str] = []
+        self.mentions: List[str] = []
+        self.links: List[str] = []
+        self._anchor: Optional[Dict[str, Any]] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == "br":
+            self.parts.append("\n")
+        elif tag in _BLOCK_TAGS and self.parts and not self.parts[-1].endswith("\n"):
+            self.parts.append("\n\n")
+        elif tag == "a":
+            attributes = dict(attrs)
+            classes = set((attributes.get("class") or "").split())
+            rel = set((attributes.get("rel") or "").split())
+            href = attributes.get("href")
+            kind = "link"
+            # Remote software does not always set the classes; /tags/ links are hashtags too.
+            if "hashtag" in classes or "tag" in rel or "/tags/" in urlsplit(href or "").path:
+                kind = "hashtag"
+            elif "mention" in classes:
+                kind = "mention"
+            self._anchor = {"kind": kind, "href": href, "text": []}
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _BLOCK_TAGS:
+            self.parts.append("\n\n")
+        elif tag == "a" and self._anchor is not None:
+            self._close_anchor(self._anchor)
+            self._anchor = None
+
+    def handle_data(self, data: str) -> None:
+        self.parts.append(data)
+        if self._anchor is not None:
+            self._anchor["text"].append(data)
+
+    def _close_anchor(self, anchor: Dict[str, Any]) -> None:
+        text = "".join(anchor["text"]).strip()
+        href = anchor["href"]
+        if anchor["kind"] == "hashtag":
+            name = text.lstrip("#")
+            if name:
+                self.hashtags.append(name)
+        elif anchor["kind"] == "mention":
+            acct = _mention_acct(href, text)
+            if acct:
+                self.mentions.append(acct)
+        elif href:
+            self.links.append(href)
+
+    def text(self) -> str:
+        text = "".join(self.parts)
+        text = re.sub(r"[ \t]+\n", "\n", text)
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+def _mention_acct(href: Optional[str], text: str) -> Optional[str]:
+    # https://host/@user (or /users/user) -> user@host; fall back to the link text.
+    if href:
+        parts = urlsplit(href)
+        path = parts.path.rstrip("/")
+        name = path.rsplit("/", 1)[-1].lstrip("@")
+        if name and parts.netloc:
+            return f"{name}@{parts.netloc}"
+    return text.lstrip("@") or None
+
+def detect_language(text: str) -> Optional[str]:
+    """
+    Cheap language hint: script detection, then stopword counts for Latin text.
+
+    :param text: Plain text.
+    :return: ISO 639-1 code, or None when there is too little evidence.
+    """
+    if not text:
+        return None
+    for language, pattern in _SCRIPT_PATTERNS:
+        if len(pattern.findall(text)) >= 2:
+            return language
+    words = [word.lower() for word in _WORD.findall(text)]
+    if len(words) < 3:
+        return None
+    scores = {
+        language: sum(1 for word in words if word in stopwords)
+        for language, stopwords in _STOPWORD_SETS.items()
+    }
+    language, best = max(scores.items(), key=lambda item: item[1])
+    if best < 2 or list(scores.values()).count(best) > 1:
+        return None
+    return language
+
+def extract_content(html: Optional[str]) -> Dict[str, Any]:
+    """
+    Extract plain text, hashtags, mentions, links and a language hint from status HTML.
+
+    :param html: Raw `content` of a status (may be None).
+    :return: Mapping with the CONTENT_FIELDS keys.
+    """
+    if not html:
+        return {"text": None, "hashtags": [], "mentions": [], "links": [], "language": None}
+    parser = _ContentParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Could not parse content HTML: %s", exc)
+    text = parser.text()
+    return {
+        "text": text,
+        "hashtags": list(dict.fromkeys(parser.hashtags)),
+        "mentions": list(dict.fromkeys(parser.mentions)),
+        "links": list(dict.fromkeys(parser.links)),
+        "language": detect_language(text),
+    }
+
+def extract_many(contents: List[Optional[str]]) -> List[Dict[str, Any]]:
+    """
+    Worker entry point: extract a whole chunk in one task.
+    """
+    return [extract_content(html) for html in contents]
+
+class ContentProcessor:
+    """
+    Post-normalization stage that parses each record's `content` HTML once.
+
+    Records are cut into chunks that are parsed on a ProcessPoolExecutor, so
+    HTML parsing runs on all cores; only the content strings travel to the
+    workers. Results are yielded in input order, with a bounded number of
+    chunks in flight so memory stays flat on long streams. With workers <= 1
+    everything runs inline.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 200) -> None:
+        self.workers = int(workers) if workers else (os.cpu_count() or 1)
+        self.chunk_size = max(1, int(chunk_size))
+        self.max_pending = 2 * self.workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # The exporter (and so this processor) is shared by job worker threads.
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Never fork: the parent runs HTTP, media and job threads.
+                method = (
+                    "forkserver"
+                    if "forkserver" in multiprocessing.get_all_start_methods()
+                    else "spawn"
+                )
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(method)
+                )
+                logger.debug(
+                    "Started content processing pool with %d %s workers", self.workers, method
+                )
+            return self._executor
+
+    def process(self, records: Iterable[Mapping[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Add the CONTENT_FIELDS to every record.
+
+        :param records: Normalized records.
+        :return: Iterator over new dicts, in input order.
+        """
+        iterator = iter(records)
+        pending: Deque[Tuple[List[Dict[str, Any]], Optional[Future], float]] = deque()
+        while True:
+            chunk = [dict(record) for record in islice(iterator, self.chunk_size)]
+            if not chunk:
+                break
+            future = None
+            if self.workers > 1:
+                future = self._pool().submit(
+                    extract_many, [record.get("content") for record in chunk]
+                )
+            pending.append((chunk, future, time.perf_counter()))
+            if len(pending) >= self.max_pending or future is None:
+                yield from self._finish(*pending.popleft())
+        while pending:
+            yield from self._finish(*pending.popleft())
+
+    def _finish(
+        self, chunk: List[Dict[str, Any]], future: Optional[Future], started: float
+    ) -> Iterator[Dict[str, Any]]:
+        extracted: Optional[List[Dict[str, Any]]] = None
+        if future is not None:
+            try:
+                extracted = future.result()
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Content worker failed, processing chunk inline: %s", exc)
+        if extracted is None:
+            extracted = extract_many([record.get("content") for record in chunk])
+        CONTENT_SECONDS.observe(time.perf_counter() - started)
+        for record, fields in zip(chunk, extracted):
+            record.update(fields)
+            yield record
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+def create_content_processor_from_settings(
+    settings: Dict[str, Any]
+) -> Optional[ContentProcessor]:
+    """
+    Build a ContentProcessor if content_processing is enabled, else None.
+    """
+    if not settings.get("content_processing"):
+        return None
+    return ContentProcessor(
+        workers=int(settings.get("content_workers") or 0) or None,
+        chunk_size=int(settings.get("content_chunk_size") or 200),
+    )
@@ -0,0 +1,289 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+from .async_client import AsyncMastodonClient
+from .async_extractors import AsyncSearchHandler
+from .search_handler import SEARCH_TYPES, SearchHandler
+from .trends_extractor import TrendsExtractor
+from .utils_parser import DEFAULT_SETTINGS, create_client_from_settings, normalize_statuses
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+def instance_settings(settings: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Expand the "instances" setting into one settings dict per host.
+
+    Entries are base URLs or objects overriding any setting for that host
+    (e.g. {"base_url": ..., "access_token": ..., "concurrency": 2}); hosts
+    without their own "concurrency" get "instance_concurrency".
+
+    :param settings: Loaded settings.
+    :return: Per-instance settings, in configured order without duplicates
+        (empty when no instances are configured).
+    """
+    expanded: List[Dict[str, Any]] = []
+    seen = set()
+    for entry in settings.get("instances") or []:
+        if isinstance(entry, str):
+            entry = {"base_url": entry}
+        if not isinstance(entry, dict) or not entry.get("base_url"):
+            raise ValueError(f"Invalid instances entry: {entry!r}")
+
+        base_url = str(entry["base_url"]).rstrip("/")
+        if "://" not in base_url:
+            base_url = f"https://{base_url}"
+        if base_url in seen:
+            continue
+        seen.add(base_url)
+
+        merged = dict(settings)
+        merged["concurrency"] = settings.get(
+            "instance_concurrency", DEFAULT_SETTINGS["instance_concurrency"]
+        )
+        merged.update(entry)
+        merged["base_url"] = base_url
+        expanded.append(merged)
+    return expanded
+
+def _host(url: Any) -> Optional[str]:
+    return urlsplit(url).netloc.lower() if isinstance(url, str) else None
+
+def dedupe_by_uri(
+    batches: Iterable[Tuple[str, List[Any]]]
+) -> List[Tuple[str, List[Any]]]:
+    """
+    Drop statuses that several instances returned, keeping one copy per uri.
+
+    The copy from the status' origin instance wins when it was fetched (its
+    counters are authoritative), otherwise the first one seen. Statuses
+    without a uri are kept as they are.
+
+    :param batches: (instance host, raw statuses) pairs.
+    :return: The same pairs with duplicate statuses removed.
+    """
+    batches = list(batches)
+    owners: Dict[str, Tuple[int, bool]] = {}
+    for index, (host, statuses) in enumerate(batches):
+        for status in statuses:
+            uri = status.get("uri") if isinstance(status, dict) else None
+            if not uri:
+                continue
+            is_origin = _host(uri) == host.lower()
+            owner = owners.get(uri)
+            if owner is None or (is_origin and not owner[1]):
+                owners[uri] = (index, is_origin)
+
+    deduped: List[Tuple[str, List[Any]]] = []
+    for index, (host, statuses) in enumerate(batches):
+        kept = []
+        for status in statuses:
+            uri = status.get("uri") if isinstance(status, dict) else None
+            if not uri or owners[uri][0] == index:
+                kept.append(status)
+        deduped.append((host, kept))
+    return deduped
+
+def _tag_instance(records: List[Dict[str, Any]], host: str) -> List[Dict[str, Any]]:
+    for record in records:
+        record["instance"] = host
+    return records
+
+class FanOutExtractor:
+    """
+    Runs trends, timeline and search requests against several instances at once.
+
+    Every instance has its own AsyncMastodonClient, so connection pools,
+    concurrency limits, rate limits and circuit breakers are all per host.
+    Status results are merged across instances and de-duplicated by `uri`;
+    every record carries the host it came from in an "instance" field. An
+    instance that fails is logged and left out of the merged results.
+    """
+
+    def __init__(self, clients: Iterable[AsyncMastodonClient]) -> None:
+        self.clients: Dict[str, AsyncMastodonClient] = {
+            client.client.host: client for client in clients
+        }
+
+    @property
+    def hosts(self) -> List[str]:
+        return list(self.clients)
+
+    async def _per_instance(
+        self,
+        what: str,
+        fetch: Callable[[str, AsyncMastodonClient], Awaitable[T]],
+    ) -> Dict[str, T]:
+        hosts = self.hosts
+        results = await asyncio.gather(
+            *(fetch(host, self.clients[host]) for host in hosts),
+            return_exceptions=True,
+        )
+        merged: Dict[str, T] = {}
+        for host, result in zip(hosts, results):
+            if isinstance(result, BaseException):
+                logger.error("Fetching %s from %s failed: %s", what, host, result)
+            else:
+                merged[host] = result
+        return merged
+
+    async def fetch_trends(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Fetch trending tags from every instance.
+
+        Trends are per-instance data, so nothing is de-duplicated.
+
+        :param limit: Maximum number of trends per instance.
+        :return: Normalized records grouped by instance, in configured order.
+        """
+
+        async def fetch(host: str, client: AsyncMastodonClient) -> List[Dict[str, Any]]:
+            raw = await client.get("/api/v1/trends/tags", params={"limit": limit})
+            return _tag_instance(TrendsExtractor.normalize_trends(raw, limit), host)
+
+        results = await self._per_instance("trends", fetch)
+        records = [record for host in self.hosts for record in results.get(host, [])]
+        logger.info("Fetched %d trend records from %d instances", len(records), len(results))
+        return records
+
+    async def fetch_timeline(
+        self,
+        tags: Iterable[str],
+        from_id: Optional[str] = None,
+        limit: Optional[int] = 40,
+        min_ids: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch hashtag timelines from every instance and merge them.
+
+        :param tags: Hashtags (without #).
+        :param from_id: Optional status ID to fetch since (applies to every
+            instance, so only useful with a single one).
+        :param limit: Maximum number of statuses per tag and instance (None = all).
+        :param min_ids: Per-host mapping of tag -> status ID to resume after.
+        :return: Normalized, de-duplicated records, newest first.
+        """
+        tags = list(dict.fromkeys(tag.lstrip("#") for tag in tags))
+        min_ids = min_ids or {}
+
+        async def fetch_tag(
+            host: str, client: AsyncMastodonClient, tag: str
+        ) -> List[Any]:
+            params: Dict[str, Any] = {}
+            if from_id:
+                params["since_id"] = from_id
+            if min_ids.get(host, {}).get(tag):
+                params["min_id"] = min_ids[host][tag]
+            statuses: List[Any] = []
+            async for page in client.iter_pages(
+                f"/api/v1/timelines/tag/{tag}", params=params, limit=limit
+            ):
+                statuses.extend(page)
+            return statuses
+
+        async def fetch(host: str, client: AsyncMastodonClient) -> Dict[str, List[Any]]:
+            pages = await asyncio.gather(
+                *(fetch_tag(host, client, tag) for tag in tags), return_exceptions=True
+            )
+            by_tag: Dict[str, List[Any]] = {}
+            for tag, result in zip(tags, pages):
+                # One failing tag must not discard the other tags from this host.
+                if isinstance(result, BaseException):
+                    logger.error("Fetching #%s from %s failed: %s", tag, host, result)
+                else:
+                    by_tag[tag] = result
+            return by_tag
+
+        results = await self._per_instance("timelines", fetch)
+        fetched = 0
+        records: List[Dict[str, Any]] = []
+        for tag in tags:
+            # A status under two tags is two records, as with a single instance.
+            batches = [
+                (host, results[host][tag])
+                for host in self.hosts
+                if tag in results.get(host, {})
+            ]
+            fetched += sum(len(statuses) for _host, statuses in batches)
+            for host, kept in dedupe_by_uri(batches):
+                records.extend(_tag_instance(normalize_statuses(kept, tag=tag), host))
+        records.sort(key=lambda record: record.get("created_at") or "", reverse=True)
+        logger.info(
+            "Fetched %d timeline statuses for tag(s)=%s from %d instances (%d duplicates dropped)",
+            len(records),
+            ", ".join(tags),
+            len(results),
+            fetched - len(records),
+        )
+        return records
+
+    async def search(
+        self,
+        queries: Iterable[str],
+        search_type: str = "statuses",
+        limit: int = 20,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run every query on every instance; statuses are de-duplicated by uri.
+
+        :param queries: Text queries.
+        :param search_type: One of accounts, hashtags, statuses, or "all".
+        :param limit: Maximum number of results per result type, query and instance.
+        :return: Mapping of result type -> normalized records, grouped by
+            query, then instance.
+        """
+        queries = list(dict.fromkeys(queries))
+
+        async def fetch(
+            host: str, client: AsyncMastodonClient
+        ) -> List[Dict[str, List[Any]]]:
+            handler = AsyncSearchHandler(client)
+            return await asyncio.gather(
+                *(handler.fetch_raw(query, search_type, limit) for query in queries)
+            )
+
+        results = await self._per_instance("search results", fetch)
+        types = SEARCH_TYPES if search_type == "all" else (search_type,)
+        grouped: Dict[str, List[Dict[str, Any]]] = {t: [] for t in types}
+        for index, query in enumerate(queries):
+            for result_type in types:
+                batches = [
+                    (host, results[host][index][result_type])
+                    for host in self.hosts
+                    if host in results
+                ]
+                if result_type == "statuses":
+                    batches = dedupe_by_uri(batches)
+                for host, items in batches:
+                    page = SearchHandler.normalize_page({result_type: items}, query)
+                    grouped[result_type].extend(_tag_instance(page[result_type], host))
+        for result_type, records in grouped.items():
+            logger.info(
+                "Search %s returned %d records from %d instances",
+                result_type,
+                len(records),
+                len(results),
+            )
+        return grouped
+
+    def close(self) -> None:
+        for client in self.clients.values():
+            client.close()
+
+def create_fanout_from_settings(settings: Dict[str, Any]) -> FanOutExtractor:
+    """
+    Build a FanOutExtractor with one client per configured instance.
+    """
+    instances = instance_settings(settings)
+    if not instances:
+        raise ValueError("No instances configured")
+    return FanOutExtractor(
+        AsyncMastodonClient(
+            create_client_from_settings(instance),
+            concurrency=int(instance["concurrency"]),
+        )
+        for instance in instances
+    )
@@ -0,0 +1,257 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .account_cache import AccountIdCache, normalize_username
+from .statuses_extractor import StatusesExtractor
+from .utils_parser import DEFAULT_SETTINGS, MastodonClient
+
+logger = logging.getLogger(__name__)
+
+GRAPH_DIRECTIONS = ("followers", "following")
+
+# Frontier entry: [account_id, acct, depth].
+_Account = List[Any]
+
+class GraphCrawler:
+    """
+    Breadth-first crawl of the follower / following graph from seed accounts.
+
+    Accounts are expanded from a FIFO frontier on a bounded thread pool, each
+    one paging through /api/v1/accounts/:id/followers and /following. Every
+    relationship comes out as one edge record (follower -> followed) as soon
+    as its account is expanded; when both ends get expanded, the edge is
+    reported once from each side, told apart by "direction". Accounts
+    already discovered are never queued again; accounts at `max_depth` are
+    recorded as edge endpoints but not expanded, and the crawl stops after
+    `max_nodes` expansions.
+
+    With a state file, the seen-set and the frontier are saved by
+    save_state() (after the edges were exported), and a later run with the
+    same seeds continues where this one stopped.
+    """
+
+    def __init__(
+        self,
+        client: MastodonClient,
+        account_cache: Optional[AccountIdCache] = None,
+        directions: Iterable[str] = GRAPH_DIRECTIONS,
+        max_depth: int = 1,
+        max_nodes: int = 1000,
+        max_edges: Optional[int] = 1000,
+        concurrency: int = 4,
+        state_path: Optional[str] = None,
+    ) -> None:
+        self.client = client
+        self.account_cache = account_cache
+        self.directions = tuple(dict.fromkeys(directions))
+        for direction in self.directions:
+            if direction not in GRAPH_DIRECTIONS:
+                raise ValueError(
+                    f"Unknown direction {direction!r}; "
+                    f"expected one of {', '.join(GRAPH_DIRECTIONS)}"
+                )
+        self.max_depth = max(0, int(max_depth))
+        self.max_nodes = max(1, int(max_nodes))
+        self.max_edges = max_edges or None
+        self.concurrency = max(1, int(concurrency))
+        self.state_path = Path(state_path).resolve() if state_path else None
+        self.client.set_pool_size(self.concurrency)
+
+        self.seeds: List[str] = []
+        self.seen: Dict[str, int] = {}
+        self.frontier: Deque[_Account] = deque()
+        self.failed: List[_Account] = []
+        self.expanded = 0
+        self.edges = 0
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """
+        Stop expanding new accounts; safe to call from a signal handler.
+        """
+        self._stop.set()
+
+    def _load_state(self, seeds: List[str]) -> bool:
+        if self.state_path is None or not self.state_path.exists():
+            return False
+        with self.state_path.open("r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("seeds") != seeds or state.get("directions") != list(self.directions):
+            raise ValueError(
+                f"Crawl state {self.state_path} belongs to seeds {state.get('seeds')} "
+                f"({', '.join(state.get('directions') or [])}); use another state file"
+            )
+        self.seen = {str(k): int(v) for k, v in (state.get("seen") or {}).items()}
+        # Accounts that failed last time are retried first.
+        self.frontier = deque(list(state.get("failed") or []) + list(state.get("frontier") or []))
+        self.expanded = int(state.get("expanded", 0))
+        logger.info(
+            "Resuming crawl from %s: %d accounts expanded, %d queued",
+            self.state_path,
+            self.expanded,
+            len(self.frontier),
+        )
+        return True
+
+    def save_state(self) -> None:
+        """
+        Atomically write the seen-set and frontier to the state file, if any.
+        """
+        if self.state_path is None:
+            return
+        state = {
+            "seeds": self.seeds,
+            "directions": list(self.directions),
+            "seen": self.seen,
+            "frontier": list(self.frontier),
+            "failed": self.failed,
+            "expanded": self.expanded,
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{self.state_path.name}.", suffix=".tmp", dir=str(self.state_path.parent)
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"))
+            os.replace(tmp_path, self.state_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        logger.info(
+            "Saved crawl state to %s (%d queued, %d failed)",
+            self.state_path,
+            len(self.frontier),
+            len(self.failed),
+        )
+
+    def _init_seeds(self, seeds: List[str]) -> None:
+        resolved = StatusesExtractor(self.client, self.account_cache).lookup_account_ids(
+            seeds, max_workers=self.concurrency
+        )
+        for username, account_id in resolved.items():
+            if not account_id:
+                logger.warning("Skipping seed %s: account not found", username)
+            elif account_id not in self.seen:
+                self.seen[account_id] = 0
+                self.frontier.append([account_id, username, 0])
+
+    def crawl(self, seeds: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Crawl from the seeds and yield edge records as accounts are expanded.
+
+        :param seeds: Usernames or acct handles to start from.
+        :return: Iterator over {"follower_id", "follower", "followed_id",
+            "followed", "direction", "depth"} records, where depth is that of
+            the expanded account.
+        """
+        self.seeds = list(dict.fromkeys(normalize_username(seed) for seed in seeds))
+        if not self._load_state(self.seeds):
+            self._init_seeds(self.seeds)
+
+        inflight: Dict["Future[List[Tuple[Dict[str, Any], _Account]]]", _Account] = {}
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="graph"
+        ) as pool:
+            try:
+                while True:
+                    while (
+                        not self._stop.is_set()
+                        and self.frontier
+                        and len(inflight) < self.concurrency
+                        and self.expanded + len(inflight) < self.max_nodes
+                    ):
+                        account = self.frontier.popleft()
+                        inflight[pool.submit(self._expand, account)] = account
+                    if not inflight:
+                        break
+                    done, _pending = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        account = inflight.pop(future)
+                        try:
+                            edges = future.result()
+                        except Exception as exc:  # noqa: BLE001
+                            logger.error("Expanding account %s failed: %s", account[1], exc)
+                            self.failed.append(account)
+                            continue
+                        self.expanded += 1
+                        for edge, neighbor in edges:
+                            self.edges += 1
+                            yield edge
+                            if neighbor[0] not in self.seen and neighbor[2] < self.max_depth:
+                                self.seen[neighbor[0]] = neighbor[2]
+                                self.frontier.append(neighbor)
+            finally:
+                # Abandoned accounts go back to the front so a resume picks them up.
+                for future, account in inflight.items():
+                    future.cancel()
+                    self.frontier.appendleft(account)
+        logger.info(
+            "Crawl finished: %d accounts expanded, %d edges, %d queued, %d failed",
+            self.expanded,
+            self.edges,
+            len(self.frontier),
+            len(self.failed),
+        )
+
+    def _expand(self, account: _Account) -> List[Tuple[Dict[str, Any], _Account]]:
+        account_id, acct, depth = account
+        edges: List[Tuple[Dict[str, Any], _Account]] = []
+        for direction in self.directions:
+            for page in self.client.iter_pages(
+                f"/api/v1/accounts/{account_id}/{direction}", limit=self.max_edges
+            ):
+                for other in page:
+                    if not isinstance(other, dict) or not other.get("id"):
+                        continue
+                    other_id, other_acct = str(other["id"]), other.get("acct")
+                    if direction == "followers":
+                        edge = (other_id, other_acct, account_id, acct)
+                    else:
+                        edge = (account_id, acct, other_id, other_acct)
+                    edges.append(
+                        (
+                            {
+                                "follower_id": edge[0],
+                                "follower": edge[1],
+                                "followed_id": edge[2],
+                                "followed": edge[3],
+                                "direction": direction,
+                                "depth": depth,
+                            },
+                            [other_id, other_acct, depth + 1],
+                        )
+                    )
+        logger.debug("Expanded %s (depth %d): %d edges", acct, depth, len(edges))
+        return edges
+
+def create_graph_crawler_from_settings(
+    settings: Dict[str, Any],
+    client: MastodonClient,
+    account_cache: Optional[AccountIdCache] = None,
+    state_path: Optional[str] = None,
+) -> GraphCrawler:
+    """
+    Build a GraphCrawler from the graph_* settings.
+    """
+    return GraphCrawler(
+        client,
+        account_cache=account_cache,
+        directions=settings.get("graph_directions") or GRAPH_DIRECTIONS,
+        max_depth=int(settings.get("graph_max_depth", DEFAULT_SETTINGS["graph_max_depth"])),
+        max_nodes=int(settings.get("graph_max_nodes", DEFAULT_SETTINGS["graph_max_nodes"])),
+        max_edges=int(settings.get("graph_max_edges", DEFAULT_SETTINGS["graph_max_edges"]))
+        or None,
+        concurrency=int(
+            settings.get("graph_concurrency", DEFAULT_SETTINGS["graph_concurrency"])
+        ),
+        state_path=state_path,
+    )
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth keeping alongside a cached body.
+_STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+class ResponseCache:
+    """
+    Persistent on-disk cache for GET responses with HTTP revalidation.
+
+    Only endpoints listed in `ttls` (path prefix -> seconds) are cached. Within
+    the TTL an entry is served straight from disk; after it, the request is
+    revalidated with If-None-Match / If-Modified-Since and a 304 refreshes the
+    entry without re-downloading the body. Entries are evicted least recently
+    used first once the directory grows past `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttls: Mapping[str, float],
+        max_bytes: int = 50 * 1024 * 1024,
+    ) -> None:
+        self.cache_dir = Path(cache_dir).resolve()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Longest prefix first so specific endpoints override general ones.
+        self.ttls = dict(sorted(ttls.items(), key=lambda item: -len(item[0])))
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        logger.debug(
+            "Loaded %d cache entries (%d bytes) from %s",
+            len(self._index),
+            self._total_bytes,
+            self.cache_dir,
+        )
+
+    def ttl_for(self, path: str) -> Optional[float]:
+        """
+        Return the TTL configured for an API path, or None if it is not cacheable.
+        """
+        for prefix, ttl in self.ttls.items():
+            if path.startswith(prefix):
+                return float(ttl)
+        return None
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]], auth: str = "") -> str:
+        canonical = json.dumps(
+            [url, sorted((str(k), str(v)) for k, v in (params or {}).items()), auth]
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a cached entry and mark it as recently used.
+        """
+        path = self._entry_path(key)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any], ttl: float) -> bool:
+        return time.time() - float(entry.get("stored_at", 0)) < ttl
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = entry.get("headers") or {}
+        conditional: Dict[str, str] = {}
+        if headers.get("ETag"):
+            conditional["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+    def store(self, key: str, response: requests.Response) -> None:
+        """
+        Persist a 200 response body with its validators.
+        """
+        headers = {
+            name: response.headers[name]
+            for name in _STORED_HEADERS
+            if name in response.headers
+        }
+        self._write(
+            key,
+            {
+                "url": response.url,
+                "stored_at": time.time(),
+                "headers": headers,
+                "body": response.text,
+            },
+        )
+
+    def refresh(self, key: str, entry: Dict[str, Any], response: requests.Response) -> None:
+        """
+        Renew an entry after a 304, picking up any updated validators.
+        """
+        for name in _STORED_HEADERS:
+            if name in response.headers:
+                entry.setdefault("headers", {})[name] = response.headers[name]
+        entry["stored_at"] = time.time()
+        self._write(key, entry)
+
+    def _write(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        try:
+            with tmp_path.open("wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Failed to write cache entry %s: %s", path, exc)
+            return
+
+        with self._lock:
+            self._total_bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._entry_path(key).unlink()
+            except OSError:
+                pass
+            logger.debug("Evicted cache entry %s (%d bytes)", key, size)
+
+    @staticmethod
+    def to_response(entry: Dict[str, Any]) -> requests.Response:
+        """
+        Rebuild a requests.Response from a cached entry.
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry.get("url", "")
+        response.headers = CaseInsensitiveDict(entry.get("headers") or {})
+        response.encoding = "utf-8"
+        response._content = entry.get("body", "").encode("utf-8")
+        return response
@@ -0,0 +1,261 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import MEDIA_BYTES, MEDIA_DOWNLOADS
+from .utils_parser import DEFAULT_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_media_sha256 ON media (sha256);
+"""
+
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,5}$")
+
+def _extension(url: str, content_type: Optional[str]) -> str:
+    suffix = os.path.splitext(urlsplit(url).path)[1].lower()
+    if _EXTENSION.match(suffix):
+        return suffix
+    if content_type:
+        guessed = mimetypes.guess_extension(content_type.split(";")[0].strip())
+        if guessed:
+            return guessed
+    return ""
+
+class MediaDownloader:
+    """
+    Downloads media attachments into a content-addressed directory.
+
+    Files are streamed to disk in chunks on a bounded thread pool and stored
+    as <media_dir>/ab/cd/<sha256><ext>, so identical files behind different
+    URLs are kept once. A SQLite index maps every downloaded URL to its file,
+    so a URL is fetched at most once across runs; within a run, concurrent
+    requests for the same URL share one download. Interrupted downloads keep
+    their .part file and continue with a Range request on the next attempt.
+    """
+
+    def __init__(
+        self,
+        media_dir: str,
+        workers: int = 8,
+        chunk_size: int = 64 * 1024,
+        timeout: float = 60.0,
+        retries: int = 2,
+        max_bytes: Optional[int] = None,
+        user_agent: str = DEFAULT_SETTINGS["user_agent"],
+    ) -> None:
+        self.media_dir = Path(media_dir).resolve()
+        self.partial_dir = self.media_dir / ".partial"
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, int(workers))
+        self.chunk_size = max(1024, int(chunk_size))
+        self.timeout = timeout
+        self.retries = max(0, int(retries))
+        self.max_bytes = max_bytes or None
+        self.max_pending = 4 * self.workers
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="media")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "Future[str]"] = {}
+        self._conn = sqlite3.connect(
+            str(self.media_dir / "index.sqlite3"), timeout=30, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        logger.debug("MediaDownloader initialized at %s", self.media_dir)
+
+    def _lookup(self, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT path FROM media WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        path = self.media_dir / row[0]
+        return str(path) if path.exists() else None
+
+    def fetch(self, url: str) -> "Future[str]":
+        """
+        Schedule a download unless the URL is already on disk or in flight.
+
+        :param url: Media URL.
+        :return: Future resolving to the local file path.
+        """
+        known = self._lookup(url)
+        if known is not None:
+            MEDIA_DOWNLOADS.inc(result="url_hit")
+            done: "Future[str]" = Future()
+            done.set_result(known)
+            return done
+        with self._lock:
+            future = self._inflight.get(url)
+            submitted = future is None
+            if future is None:
+                future = self._pool.submit(self._download_with_retries, url)
+                self._inflight[url] = future
+        if submitted:
+            # Outside the lock: a finished future runs the callback right here.
+            future.add_done_callback(lambda _f: self._forget(url))
+        return future
+
+    def _forget(self, url: str) -> None:
+        with self._lock:
+            self._inflight.pop(url, None)
+
+    def _download_with_retries(self, url: str) -> str:
+        attempt = 0
+        while True:
+            try:
+                return self._download(url)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                attempt += 1
+                if attempt > self.retries:
+                    MEDIA_DOWNLOADS.inc(result="failed")
+                    raise
+                # The .part file is kept, so the retry resumes where this one stopped.
+                logger.debug("Media download %s interrupted (%s); resuming", url, exc)
+                time.sleep(min(5.0, 0.5 * 2 ** (attempt - 1)))
+            except Exception:
+                MEDIA_DOWNLOADS.inc(result="failed")
+                raise
+
+    def _download(self, url: str) -> str:
+        part = self.partial_dir / (hashlib.sha256(url.encode("utf-8")).hexdigest() + ".part")
+        offset = part.stat().st_size if part.exists() else 0
+        hasher = hashlib.sha256()
+        headers = {}
+        if offset:
+            with part.open("rb") as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                    hasher.update(chunk)
+            headers["Range"] = f"bytes={offset}-"
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if offset and response.status_code == 416:
+                # The server will not resume this file; start over next attempt.
+                part.unlink()
+                raise requests.ConnectionError(f"Range not satisfiable for {url}")
+            response.raise_for_status()
+            if offset and response.status_code != 206:
+                offset, hasher = 0, hashlib.sha256()
+            size = offset
+            with part.open("ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    size += len(chunk)
+                    MEDIA_BYTES.inc(len(chunk))
+                    if self.max_bytes is not None and size > self.max_bytes:
+                        f.close()
+                        part.unlink()
+                        raise ValueError(f"{url} is larger than {self.max_bytes} bytes")
+            content_type = response.headers.get("Content-Type")
+
+        digest = hasher.hexdigest()
+        relative = Path(digest[:2], digest[2:4], digest + _extension(url, content_type))
+        target = self.media_dir / relative
+        if target.exists():
+            part.unlink()
+            MEDIA_DOWNLOADS.inc(result="hash_hit")
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(part, target)
+            MEDIA_DOWNLOADS.inc(result="downloaded")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media (url, sha256, path, size, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, digest, relative.as_posix(), size, time.time()),
+            )
+        logger.debug("Downloaded %s (%d bytes) to %s", url, size, target)
+        return str(target)
+
+    def process(self, records: Iterable[Mapping[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Download every record's media and add "media_paths".
+
+        "media_paths" is parallel to "media", with None for attachments that
+        failed. Records keep their input order; at most a bounded number of
+        records wait for their downloads at any time.
+
+        :param records: Normalized records.
+        :return: Iterator over new dicts.
+        """
+        pending: Deque[Tuple[Dict[str, Any], List[Optional["Future[str]"]]]] = deque()
+        for record in records:
+            record = dict(record)
+            urls = record.get("media") or []
+            futures = [self.fetch(url) if isinstance(url, str) and url else None for url in urls]
+            pending.append((record, futures))
+            while len(pending) > self.max_pending or (
+                pending and all(f is None or f.done() for f in pending[0][1])
+            ):
+                yield self._finish(*pending.popleft())
+        while pending:
+            yield self._finish(*pending.popleft())
+
+    def _finish(
+        self, record: Dict[str, Any], futures: List[Optional["Future[str]"]]
+    ) -> Dict[str, Any]:
+        paths: List[Optional[str]] = []
+        for future in futures:
+            path = None
+            if future is not None:
+                try:
+                    path = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    logger.error(
+                        "Media download for status %s failed: %s", record.get("status_id"), exc
+                    )
+            paths.append(path)
+        record["media_paths"] = paths
+        return record
+
+    def close(self) -> None:
+        self._pool.shutdown()
+        self.session.close()
+        with self._lock:
+            self._conn.close()
+
+def create_media_downloader_from_settings(
+    settings: Dict[str, Any]
+) -> Optional[MediaDownloader]:
+    """
+    Build a MediaDownloader if media_dir is set, else None.
+    """
+    media_dir = settings.get("media_dir")
+    if not media_dir:
+        return None
+    return MediaDownloader(
+        media_dir,
+        workers=int(settings.get("media_workers", DEFAULT_SETTINGS["media_workers"])),
+        chunk_size=int(settings.get("media_chunk_size", DEFAULT_SETTINGS["media_chunk_size"])),
+        timeout=float(settings.get("media_timeout", DEFAULT_SETTINGS["media_timeout"])),
+        max_bytes=int(settings.get("media_max_bytes") or 0) or None,
+        user_agent=settings.get("user_agent", DEFAULT_SETTINGS["user_agent"]),
+    )
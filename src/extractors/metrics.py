@@ -0,0 +1,372 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans a cached lookup up to a slow, retried page.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_ID_SEGMENT = re.compile(r"^\d+$")
+# Path segments that are free-form user input rather than part of the route.
+_NAMED_SEGMENTS = {"tag": ":tag"}
+
+def endpoint_label(path: str) -> str:
+    """
+    Collapse an API path into a low-cardinality endpoint label.
+
+    Numeric ids become ":id" and the hashtag of a tag timeline becomes ":tag",
+    so /api/v1/accounts/109/statuses is reported as /api/v1/accounts/:id/statuses.
+    """
+    segments = path.split("?", 1)[0].rstrip("/").split("/")
+    for i, segment in enumerate(segments):
+        if _ID_SEGMENT.match(segment):
+            segments[i] = ":id"
+        elif i > 0 and segments[i - 1] in _NAMED_SEGMENTS:
+            segments[i] = _NAMED_SEGMENTS[segments[i - 1]]
+    return "/".join(segments) or "/"
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[Tuple[str, LabelKey, float]]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"labels": dict(key), "value": value}
+                for key, value in sorted(self._values.items())
+            ]
+
+class Histogram:
+    """
+    Cumulative-bucket histogram (Prometheus semantics) with optional labels.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum, min, max
+        self._series: Dict[LabelKey, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, value, value]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+            if value < series[2]:
+                series[2] = value
+            if value > series[3]:
+                series[3] = value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """
+        Observe the wall-clock duration of the with-block.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return sum(series[0]) if series else 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def samples(self) -> List[Tuple[str, LabelKey, float]]:
+        out: List[Tuple[str, LabelKey, float]] = []
+        with self._lock:
+            for key, (counts, total, _low, _high) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = key + (("le", _format_value(float(bound))),)
+                    out.append((f"{self.name}_bucket", le, cumulative))
+                out.append((f"{self.name}_sum", key, total))
+                out.append((f"{self.name}_count", key, cumulative))
+        return out
+
+    def summary(self) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        with self._lock:
+            for key, (counts, total, low, high) in sorted(self._series.items()):
+                count = sum(counts)
+                out.append(
+                    {
+                        "labels": dict(key),
+                        "count": count,
+                        "sum": round(total, 6),
+                        "mean": round(total / count, 6) if count else 0.0,
+                        "min": round(low, 6),
+                        "max": round(high, 6),
+                        "p50": self._quantile(counts, count, 0.50),
+                        "p95": self._quantile(counts, count, 0.95),
+                        "p99": self._quantile(counts, count, 0.99),
+                    }
+                )
+        return out
+
+    def _quantile(self, counts: List[int], count: int, q: float) -> Optional[float]:
+        # Upper bound of the bucket holding the q-th observation.
+        if not count:
+            return None
+        rank = q * count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return bound
+        return None
+
+class MetricsRegistry:
+    """
+    Thread-safe set of named counters and histograms.
+
+    One process-wide instance (METRICS) is shared by the client, the
+    normalizers and the exporter; write() dumps it at the end of a run.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(name, Counter(name, help_text))
+
+    def histogram(
+        self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(name, Histogram(name, help_text, buckets))
+
+    def _register(self, name: str, metric: Any) -> Any:
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if existing.kind != metric.kind:
+                    raise ValueError(f"Metric {name!r} already registered as a {existing.kind}")
+                return existing
+            self._metrics[name] = metric
+            return metric
+
+    def reset(self) -> None:
+        """
+        Clear all recorded values, keeping the registered metrics.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            self.started_at = time.time()
+        for metric in metrics:
+            metric.reset()
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in samples:
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarize all metrics as plain data (histograms as count/sum/quantiles).
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return {
+            "started_at": self.started_at,
+            "elapsed_seconds": round(time.time() - self.started_at, 3),
+            "metrics": {
+                metric.name: {"type": metric.kind, "help": metric.help, "series": metric.summary()}
+                for metric in metrics
+                if metric.summary()
+            },
+        }
+
+    def write(self, path: str) -> str:
+        """
+        Atomically write the metrics to path.
+
+        A ".prom" path gets the Prometheus textfile format (for node_exporter's
+        textfile collector); anything else gets the JSON summary.
+
+        :param path: Destination file.
+        :return: Resolved path of the written file.
+        """
+        target = Path(path).resolve()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.suffix == ".prom":
+            text = self.render_prometheus()
+        else:
+            text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2) + "\n"
+
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        logger.info("Metrics written to %s", target)
+        return str(target)
+
+METRICS = MetricsRegistry()
+
+REQUEST_SECONDS = METRICS.histogram(
+    "mastodon_request_duration_seconds", "Latency of HTTP GET attempts by endpoint."
+)
+REQUESTS_TOTAL = METRICS.counter(
+    "mastodon_requests_total", "HTTP GET attempts by endpoint and status code."
+)
+RESPONSE_BYTES = METRICS.counter(
+    "mastodon_response_bytes_total", "Response body bytes received by endpoint."
+)
+CACHE_HITS = METRICS.counter(
+    "mastodon_cache_hits_total", "Responses served from the local HTTP cache by endpoint."
+)
+REQUESTS_SHARED = METRICS.counter(
+    "mastodon_requests_shared_total",
+    "GETs answered by a concurrent identical request or the per-run memo, "
+    "by endpoint and source.",
+)
+DECODE_SECONDS = METRICS.histogram(
+    "mastodon_json_decode_seconds", "Time spent decoding JSON response bodies by endpoint."
+)
+NORMALIZE_SECONDS = METRICS.histogram(
+    "mastodon_normalize_seconds", "Time spent normalizing one status or one page of statuses."
+)
+NORMALIZED_RECORDS = METRICS.counter(
+    "mastodon_normalized_records_total", "Statuses normalized into records."
+)
+EXPORT_SECONDS = METRICS.histogram(
+    "mastodon_export_duration_seconds",
+    "Wall time of one export (including consuming the record stream) by format.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+EXPORT_WRITE_SECONDS = METRICS.histogram(
+    "mastodon_export_write_seconds",
+    "Time one export spent in its sink (encoding, compression, writes and commit) by format.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+RECORDS_WRITTEN = METRICS.counter(
+    "mastodon_records_written_total", "Records written by the exporter by format."
+)
+BYTES_WRITTEN = METRICS.counter(
+    "mastodon_output_bytes_total", "Bytes written to output files (after compression) by format."
+)
+STREAM_EVENTS = METRICS.counter(
+    "mastodon_stream_events_total", "Server-sent events received by stream and event type."
+)
+STREAM_RECONNECTS = METRICS.counter(
+    "mastodon_stream_reconnects_total", "Streaming connections re-established by stream."
+)
+STREAM_GAP_FILLED = METRICS.counter(
+    "mastodon_stream_gap_filled_total",
+    "Statuses recovered through the REST timeline after a reconnect by stream.",
+)
+CONTENT_SECONDS = METRICS.histogram(
+    "mastodon_content_process_seconds",
+    "Time from submitting a chunk of records to the content workers until its results are merged.",
+)
+MEDIA_DOWNLOADS = METRICS.counter(
+    "mastodon_media_downloads_total",
+    "Media URLs resolved by result (downloaded, url_hit, hash_hit, failed).",
+)
+MEDIA_BYTES = METRICS.counter(
+    "mastodon_media_bytes_total", "Media bytes downloaded (including resumed parts)."
+)
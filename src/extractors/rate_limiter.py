@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+def _parse_timestamp(value: str) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 timestamp, epoch seconds or HTTP-date into an aware datetime.
+    """
+    value = value.strip()
+    try:
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into seconds to wait.
+
+    :param value: Raw header value.
+    :return: Non-negative delay in seconds, or None if absent/unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    moment = _parse_timestamp(value)
+    if moment is None:
+        return None
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+class RateLimiter:
+    """
+    Thread-safe request scheduler driven by Mastodon's X-RateLimit-* headers.
+
+    Works as a leaky bucket: once the server has reported its remaining budget
+    and reset time, requests are spaced evenly over the rest of the window so
+    the budget (minus a safety margin) lasts until the reset instead of being
+    spent in a burst followed by 429s. Until headers are seen, requests are
+    not delayed.
+    """
+
+    def __init__(self, safety_margin: int = 5) -> None:
+        self.safety_margin = max(0, int(safety_margin))
+        self.limit: Optional[int] = None
+        self._remaining: Optional[int] = None
+        self._reset_at: Optional[float] = None
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Block until the next request may be sent.
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._paused_until)
+
+            if self._reset_at is not None and self._reset_at <= start:
+                # Window has rolled over; wait for fresh headers.
+                self._remaining = None
+                self._reset_at = None
+
+            if self._remaining is not None and self._reset_at is not None:
+                budget = self._remaining - self.safety_margin
+                if budget <= 0:
+                    start = self._reset_at
+                    self._remaining = None
+                    self._reset_at = None
+                else:
+                    interval = (self._reset_at - start) / budget
+                    start = max(start, self._next_slot)
+                    self._next_slot = start + interval
+                    self._remaining -= 1
+
+            delay = start - now
+
+        if delay > 0:
+            logger.debug("Rate limiter delaying request by %.3fs", delay)
+            time.sleep(delay)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Refresh the budget from a response's X-RateLimit-* headers.
+        """
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        try:
+            remaining_value = int(remaining)
+        except ValueError:
+            return
+
+        reset_at: Optional[float] = None
+        reset = headers.get("X-RateLimit-Reset")
+        moment = _parse_timestamp(reset) if reset else None
+        if moment is not None:
+            seconds = (moment - datetime.now(timezone.utc)).total_seconds()
+            reset_at = time.monotonic() + max(0.0, seconds)
+
+        with self._lock:
+            limit = headers.get("X-RateLimit-Limit")
+            if limit and limit.isdigit():
+                self.limit = int(limit)
+            new_window = (
+                self._reset_at is None
+                or reset_at is None
+                or abs(reset_at - self._reset_at) > 1.0
+            )
+            # Within a window responses may arrive out of order; trust the lowest figure.
+            if new_window or self._remaining is None or remaining_value < self._remaining:
+                self._remaining = remaining_value
+            if reset_at is not None:
+                self._reset_at = reset_at
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every caller for the given number of seconds (e.g. after a 429).
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._next_slot = max(self._next_slot, self._paused_until)
+        logger.warning("Rate limited; pausing requests for %.1fs", seconds)
+
+    def seconds_until_reset(self) -> Optional[float]:
+        with self._lock:
+            if self._reset_at is None:
+                return None
+            return max(0.0, self._reset_at - time.monotonic())
@@ -0,0 +1,105 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+def request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Normalized identity of a GET: the URL plus its params, sorted.
+
+    None values are dropped, as requests does not send them either.
+    """
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+    return json.dumps([url, items], separators=(",", ":"))
+
+class SingleFlight:
+    """
+    Lets concurrent callers with the same key share one call.
+
+    The first caller runs the function; callers arriving while it runs wait
+    for it and get its result (or its exception) instead of running their own.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, "Future[Any]"] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        Run fn, or join the call already running for key.
+
+        :return: Tuple of (result, True if it came from another caller's call).
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+        future.set_result(result)
+        return result, False
+
+class RequestMemo:
+    """
+    Bounded in-memory memo of successful GET responses for one run.
+
+    Entries expire after `ttl` seconds, so long-lived clients (`serve`,
+    reconnecting streams) still see new data, and the least recently used
+    ones are dropped once the bodies add up to more than `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 30.0) -> None:
+        self.max_bytes = int(max_bytes)
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, requests.Response]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[requests.Response]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ttl:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, response: requests.Response) -> None:
+        size = len(response.content)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), response)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        _stored_at, response = self._entries.pop(key)
+        self._bytes -= len(response.content)
+
+    def __len__(self) -> int:
+        return len(self._entries)
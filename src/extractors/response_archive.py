@@ -0,0 +1,242 @@
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+try:  # Optional dependency for zstd compression.
+    import zstandard  # type: ignore[import]
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COMPRESSIONS = ("zlib", "zstd")
+
+_SEGMENT_GLOB = "segment-*.dat"
+
+# Archives opened through the settings factory, shared per directory so that
+# several clients in one process (fan-out) append through the same writer.
+_SHARED: Dict[Path, "ResponseArchive"] = {}
+_SHARED_LOCK = threading.Lock()
+
+def _compressor(compression: str) -> Any:
+    if compression == "zlib":
+        return lambda data: zlib.compress(data, 6)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd archive compression requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=3).compress
+    raise ValueError(
+        f"Unknown archive compression {compression!r}; "
+        f"expected one of {', '.join(ARCHIVE_COMPRESSIONS)}"
+    )
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Reading zstd archive segments requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+def _read_index(path: Path) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Parse an index file, ignoring a torn last line.
+
+    :return: (entries, byte length of the valid prefix).
+    """
+    entries: List[Dict[str, Any]] = []
+    valid = 0
+    try:
+        with path.open("rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+                valid += len(line)
+    except FileNotFoundError:
+        pass
+    return entries, valid
+
+class ResponseArchive:
+    """
+    Append-only archive of raw API response bodies.
+
+    Bodies are compressed one by one and appended to segment files
+    (segment-NNNNNN.dat); every segment has an NDJSON index (.idx) with the
+    offset, length, request path, params and fetch time of each body. A new
+    segment starts once the current one exceeds `segment_bytes`. Because each
+    body is a separate frame, a reader can mmap a segment and decompress just
+    the entries it wants, selected from the index without touching the data.
+    Only one process should write to an archive directory at a time.
+    """
+
+    def __init__(
+        self,
+        archive_dir: str,
+        segment_bytes: int = 256 * 1024 * 1024,
+        compression: str = "zlib",
+    ) -> None:
+        self.archive_dir = Path(archive_dir).resolve()
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = max(1, int(segment_bytes))
+        self.compression = compression
+        self._compress = _compressor(compression)
+        self._lock = threading.Lock()
+        self._data: Optional[IO[bytes]] = None
+        self._index: Optional[IO[bytes]] = None
+        self._segment = 0
+        self._size = 0
+        logger.debug("ResponseArchive initialized at %s", self.archive_dir)
+
+    def segments(self) -> List[Path]:
+        return sorted(self.archive_dir.glob(_SEGMENT_GLOB))
+
+    def _open_segment(self) -> None:
+        existing = self.segments()
+        if self._segment == 0 and existing:
+            # Resume the newest segment, cutting off anything a crash left
+            # behind after its last complete index entry.
+            data_path = existing[-1]
+            self._segment = int(data_path.stem.split("-")[1])
+            index_path = data_path.with_suffix(".idx")
+            entries, valid = _read_index(index_path)
+            end = entries[-1]["offset"] + entries[-1]["length"] if entries else 0
+            with index_path.open("ab") as f:
+                f.truncate(valid)
+            with data_path.open("ab") as f:
+                f.truncate(end)
+        else:
+            self._segment += 1
+            data_path = self.archive_dir / f"segment-{self._segment:06d}.dat"
+        self._data = data_path.open("ab")
+        self._index = data_path.with_suffix(".idx").open("ab")
+        self._size = self._data.tell()
+
+    def _close_segment(self) -> None:
+        for f in (self._data, self._index):
+            if f is not None:
+                f.close()
+        self._data = self._index = None
+
+    def append(
+        self,
+        host: str,
+        path: str,
+        params: Optional[Dict[str, Any]],
+        body: bytes,
+        fetched_at: Optional[float] = None,
+    ) -> None:
+        """
+        Archive one response body.
+
+        :param host: Instance the response came from.
+        :param path: API path that was requested.
+        :param params: Query parameters of the request.
+        :param body: Raw (decoded transfer encoding) response body.
+        :param fetched_at: Fetch time (default: now).
+        """
+        frame = self._compress(body)
+        with self._lock:
+            if self._data is None or (self._size and self._size >= self.segment_bytes):
+                self._close_segment()
+                self._open_segment()
+            assert self._data is not None and self._index is not None
+            entry = {
+                "offset": self._size,
+                "length": len(frame),
+                "fetched_at": fetched_at if fetched_at is not None else time.time(),
+                "host": host,
+                "path": path,
+                "params": params or {},
+                "compression": self.compression,
+            }
+            self._data.write(frame)
+            self._data.flush()
+            # The index line goes last: an entry is only visible once its data is on disk.
+            self._index.write(json.dumps(entry, default=str).encode("utf-8") + b"\n")
+            self._index.flush()
+            self._size += len(frame)
+
+    def iter_entries(
+        self,
+        path_prefix: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+        """
+        Read archived bodies in archive order through memory-mapped segments.
+
+        Entries are filtered on their index metadata first, so skipped bodies
+        are never read or decompressed.
+
+        :param path_prefix: Only requests whose path starts with this.
+        :param since: Only bodies fetched at or after this unix time.
+        :param until: Only bodies fetched before this unix time.
+        :return: Iterator over (index entry, decompressed body).
+        """
+        for data_path in self.segments():
+            entries, _valid = _read_index(data_path.with_suffix(".idx"))
+            entries = [
+                entry
+                for entry in entries
+                if (path_prefix is None or entry["path"].startswith(path_prefix))
+                and (since is None or entry["fetched_at"] >= since)
+                and (until is None or entry["fetched_at"] < until)
+            ]
+            if not entries or os.path.getsize(data_path) == 0:
+                continue
+            with data_path.open("rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                for entry in entries:
+                    end = entry["offset"] + entry["length"]
+                    if end > len(mapped):
+                        logger.warning("Truncated archive entry in %s; stopping", data_path)
+                        break
+                    try:
+                        body = _decompress(
+                            mapped[entry["offset"]:end], entry.get("compression", "zlib")
+                        )
+                    except Exception as exc:  # noqa: BLE001
+                        logger.warning(
+                            "Skipping corrupt archive entry at %s:%d: %s",
+                            data_path,
+                            entry["offset"],
+                            exc,
+                        )
+                        continue
+                    yield entry, body
+
+    def close(self) -> None:
+        """
+        Close the open segment; a later append() starts a new one.
+        """
+        with self._lock:
+            self._close_segment()
+
+def create_archive_from_settings(settings: Dict[str, Any]) -> Optional[ResponseArchive]:
+    """
+    Return the ResponseArchive for archive_dir if it is set, else None.
+
+    Calls with the same directory share one archive.
+    """
+    archive_dir = settings.get("archive_dir")
+    if not archive_dir:
+        return None
+    key = Path(archive_dir).resolve()
+    with _SHARED_LOCK:
+        if key not in _SHARED:
+            _SHARED[key] = ResponseArchive(
+                archive_dir,
+                segment_bytes=int(settings.get("archive_segment_bytes") or 256 * 1024 * 1024),
+                compression=settings.get("archive_compression") or "zlib",
+            )
+        return _SHARED[key]
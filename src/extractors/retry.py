@@ -0,0 +1,95 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised instead of sending a request to a host whose circuit is open.
+    """
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry settings for idempotent GETs: capped exponential backoff with full jitter.
+    """
+
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    retry_statuses: FrozenSet[int] = field(
+        default_factory=lambda: frozenset({500, 502, 503, 504})
+    )
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before retry number `attempt` (1-based).
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+class CircuitBreaker:
+    """
+    Thread-safe per-host circuit breaker.
+
+    After `failure_threshold` consecutive failures a host's circuit opens and
+    requests fail fast for `reset_timeout` seconds. A single trial request is
+    then let through (half-open); its outcome closes or re-opens the circuit.
+    A threshold of 0 disables the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0) -> None:
+        self.failure_threshold = max(0, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        # host -> (consecutive failures, opened_at or None, trial in flight)
+        self._state: Dict[str, Tuple[int, float, bool]] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, host: str) -> None:
+        """
+        Raise CircuitOpenError if requests to `host` should not be sent right now.
+        """
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            failures, opened_at, trial = self._state.get(host, (0, 0.0, False))
+            if failures < self.failure_threshold:
+                return
+            retry_in = opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0 or trial:
+                raise CircuitOpenError(
+                    f"Circuit open for {host} after {failures} consecutive failures"
+                )
+            self._state[host] = (failures, opened_at, True)
+            logger.info("Circuit half-open for %s; sending trial request", host)
+
+    def record_success(self, host: str) -> None:
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            if host in self._state:
+                if self._state[host][0] >= self.failure_threshold:
+                    logger.info("Circuit closed for %s", host)
+                del self._state[host]
+
+    def record_failure(self, host: str) -> None:
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            failures, opened_at, _ = self._state.get(host, (0, 0.0, False))
+            failures += 1
+            if failures >= self.failure_threshold:
+                if failures == self.failure_threshold:
+                    logger.warning(
+                        "Circuit opened for %s after %d consecutive failures",
+                        host,
+                        failures,
+                    )
+                opened_at = time.monotonic()
+            self._state[host] = (failures, opened_at, False)
@@ -1,34 +1,188 @@
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Set
 
-from .utils_parser import MastodonClient, normalize_status
+from .trends_extractor import parse_history
+from .utils_parser import MastodonClient, build_record, normalize_statuses
 
 logger = logging.getLogger(__name__)
 
+SEARCH_TYPES = ("accounts", "hashtags", "statuses")
+
+# Largest `limit` /api/v2/search accepts; larger result sets need `offset`.
+SEARCH_PAGE_SIZE = 40
+
+class SearchPager:
+    """
+    Offset pagination state for /api/v2/search.
+
+    With search_type "all" a page is one untyped request whose accounts,
+    hashtags and statuses are split apart; a section that comes back short is
+    exhausted, and once only one section is left the requests are typed.
+    Mastodon rejects `offset` from anonymous clients, so without
+    authentication only the first page is fetched.
+    """
+
+    def __init__(
+        self, query: str, search_type: str, limit: int, paginate: bool = True
+    ) -> None:
+        types = SEARCH_TYPES if search_type == "all" else (search_type,)
+        limit = max(1, int(limit))
+        if not paginate and limit > SEARCH_PAGE_SIZE:
+            logger.warning(
+                "Search past %d results needs an access token; stopping at %d for query=%r",
+                SEARCH_PAGE_SIZE,
+                SEARCH_PAGE_SIZE,
+                query,
+            )
+            limit = SEARCH_PAGE_SIZE
+        self.query = query
+        self.remaining: Dict[str, int] = {t: limit for t in types}
+        self.offset = 0
+        self._page_size = 0
+        self._active: List[str] = []
+        self._seen: Dict[str, Set[Any]] = {t: set() for t in types}
+
+    def next_params(self) -> Optional[Dict[str, Any]]:
+        """
+        Query parameters for the next page, or None when done.
+        """
+        self._active = [t for t, left in self.remaining.items() if left > 0]
+        if not self._active:
+            return None
+        self._page_size = min(SEARCH_PAGE_SIZE, max(self.remaining[t] for t in self._active))
+        return SearchHandler.build_params(
+            self.query,
+            self._active[0] if len(self._active) == 1 else None,
+            self._page_size,
+            self.offset,
+        )
+
+    def feed(self, payload: Any) -> Dict[str, List[Any]]:
+        """
+        Consume one response.
+
+        :return: Mapping of result type to its new raw items on this page.
+        """
+        page: Dict[str, List[Any]] = {}
+        for search_type in self._active:
+            items = payload.get(search_type) if isinstance(payload, dict) else None
+            if not isinstance(items, list):
+                items = []
+            seen = self._seen[search_type]
+            fresh = []
+            for item in items[: self.remaining[search_type]]:
+                key = item.get("id") or item.get("name") if isinstance(item, dict) else None
+                if key is not None and key in seen:
+                    continue
+                seen.add(key)
+                fresh.append(item)
+            page[search_type] = fresh
+            self.remaining[search_type] -= len(fresh)
+            # A short page, or one with nothing new (offset ignored), ends the section.
+            if len(items) < self._page_size or not fresh:
+                self.remaining[search_type] = 0
+        self.offset += self._page_size
+        return page
+
 class SearchHandler:
     """
     Provides search capabilities for accounts, hashtags, and statuses.
+
+    Results past SEARCH_PAGE_SIZE are fetched with offset pagination, and the
+    "all" type splits one untyped search into its three result types.
     """
 
     def __init__(self, client: MastodonClient) -> None:
         self.client = client
 
-    def _search(self, query: str, search_type: str, limit: int) -> Dict[str, Any]:
+    @staticmethod
+    def build_params(
+        query: str, search_type: Optional[str], limit: int, offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Build /api/v2/search parameters; search_type None or "all" means untyped.
+        """
+        params: Dict[str, Any] = {
+            "q": query,
+            "limit": max(1, min(limit, SEARCH_PAGE_SIZE)),
+        }
+        if search_type and search_type != "all":
+            params["type"] = search_type
+        if offset:
+            params["offset"] = offset
+        return params
+
+    @staticmethod
+    def normalize_page(page: Dict[str, List[Any]], query: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Normalize the raw items of one SearchPager page, per result type.
+        """
+        return {
+            search_type: NORMALIZERS[search_type]({search_type: items}, query, len(items))
+            for search_type, items in page.items()
+        }
+
+    def iter_pages(
+        self, query: str, search_type: str = "statuses", limit: int = 20
+    ) -> Iterator[Dict[str, List[Any]]]:
+        """
+        Lazily fetch search results page by page.
+
+        :param query: Text query.
+        :param search_type: One of accounts, hashtags, statuses, or "all".
+        :param limit: Maximum number of results per result type.
+        :return: Iterator over mappings of result type -> raw items.
+        """
         logger.info(
             "Performing search type=%s query=%r limit=%d",
             search_type,
             query,
             limit,
         )
-        params: Dict[str, Any] = {
-            "q": query,
-            "type": search_type,
-            "limit": max(1, min(limit, 40)),
-        }
-        return self.client.get("/api/v2/search", params=params)
+        pager = SearchPager(query, search_type, limit, paginate=bool(self.client.access_token))
+        while True:
+            params = pager.next_params()
+            if params is None:
+                return
+            yield pager.feed(self.client.get("/api/v2/search", params=params))
+
+    def iter_search(
+        self, query: str, search_type: str = "statuses", limit: int = 20
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream normalized records of a single result type across pages.
+        """
+        for page in self.iter_pages(query, search_type, limit):
+            yield from self.normalize_page(page, query)[search_type]
+
+    def search(
+        self, query: str, search_type: str = "statuses", limit: int = 20
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run a search and collect its records per result type.
+
+        :param search_type: One of accounts, hashtags, statuses, or "all".
+        :return: Mapping of result type -> normalized records.
+        """
+        types = SEARCH_TYPES if search_type == "all" else (search_type,)
+        results: Dict[str, List[Dict[str, Any]]] = {t: [] for t in types}
+        for page in self.iter_pages(query, search_type, limit):
+            for result_type, records in self.normalize_page(page, query).items():
+                results[result_type].extend(records)
+        for result_type, records in results.items():
+            logger.info("Search %s returned %d records", result_type, len(records))
+        return results
 
     def search_accounts(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
-        payload = self._search(query, "accounts", limit)
+        return self.search(query, "accounts", limit)["accounts"]
+
+    @staticmethod
+    def normalize_accounts(
+        payload: Dict[str, Any], query: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Normalize the accounts section of a /api/v2/search response.
+        """
         accounts = payload.get("accounts") or []
         results: List[Dict[str, Any]] = []
 
@@ -40,31 +194,28 @@ class SearchHandler:
             if not isinstance(account, dict):
                 continue
 
-            pseudo_status = {
-                "id": account.get("id"),
-                "account": account,
-                "content": account.get("note"),
-                "created_at": account.get("created_at"),
-                "media_attachments": [],
-                "url": account.get("url"),
-                "uri": account.get("url"),
-                "replies_count": None,
-                "reblogs_count": None,
-                "favourites_count": None,
-            }
-            record = normalize_status(
-                pseudo_status,
-                trend_name=None,
-                tag=None,
+            record = build_record(
+                status_id=account.get("id"),
+                username=account.get("acct") or account.get("username"),
+                content=account.get("note"),
+                created_at=account.get("created_at"),
                 search_query=query,
+                url=account.get("url"),
             )
             results.append(record)
 
-        logger.info("Search accounts returned %d records", len(results))
         return results
 
     def search_hashtags(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
-        payload = self._search(query, "hashtags", limit)
+        return self.search(query, "hashtags", limit)["hashtags"]
+
+    @staticmethod
+    def normalize_hashtags(
+        payload: Dict[str, Any], query: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Normalize the hashtags section of a /api/v2/search response.
+        """
         hashtags = payload.get("hashtags") or []
         results: List[Dict[str, Any]] = []
 
@@ -77,31 +228,28 @@ class SearchHandler:
                 continue
 
             name = tag.get("name")
-            pseudo_status = {
-                "id": tag.get("id") or name,
-                "account": {"acct": None, "username": None},
-                "content": None,
-                "created_at": None,
-                "media_attachments": [],
-                "url": tag.get("url"),
-                "uri": tag.get("url"),
-                "replies_count": None,
-                "reblogs_count": tag.get("history"),
-                "favourites_count": None,
-            }
-            record = normalize_status(
-                pseudo_status,
+            record = build_record(
+                status_id=tag.get("id") or name,
                 trend_name=name,
                 tag=name.lstrip("#") if isinstance(name, str) else None,
                 search_query=query,
+                url=tag.get("url"),
             )
+            record["history"] = parse_history(tag.get("history"))
             results.append(record)
 
-        logger.info("Search hashtags returned %d records", len(results))
         return results
 
     def search_statuses(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
-        payload = self._search(query, "statuses", limit)
+        return self.search(query, "statuses", limit)["statuses"]
+
+    @staticmethod
+    def normalize_statuses(
+        payload: Dict[str, Any], query: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Normalize the statuses section of a /api/v2/search response.
+        """
         statuses = payload.get("statuses") or []
         results: List[Dict[str, Any]] = []
 
@@ -109,16 +257,10 @@ class SearchHandler:
             logger.warning("Unexpected statuses payload: %r", statuses)
             return results
 
-        for status in statuses[:limit]:
-            if not isinstance(status, dict):
-                continue
-            record = normalize_status(
-                status,
-                trend_name=None,
-                tag=None,
-                search_query=query,
-            )
-            results.append(record)
+        return normalize_statuses(statuses[:limit], search_query=query)
 
-        logger.info("Search statuses returned %d records", len(results))
-        return results
\ No newline at end of file
+NORMALIZERS = {
+    "accounts": SearchHandler.normalize_accounts,
+    "hashtags": SearchHandler.normalize_hashtags,
+    "statuses": SearchHandler.normalize_statuses,
+}
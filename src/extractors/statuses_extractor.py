@@ -1,7 +1,9 @@
 import logging
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
-from .utils_parser import MastodonClient, normalize_status
+from .account_cache import AccountIdCache, normalize_username
+from .utils_parser import MastodonClient, normalize_statuses
 
 logger = logging.getLogger(__name__)
 
@@ -10,21 +12,41 @@ class StatusesExtractor:
     Extracts user statuses from a Mastodon instance by username.
     """
 
-    def __init__(self, client: MastodonClient) -> None:
+    def __init__(
+        self,
+        client: MastodonClient,
+        account_cache: Optional[AccountIdCache] = None,
+    ) -> None:
         self.client = client
+        self.account_cache = account_cache
 
-    def _lookup_account_id(self, username: str) -> Optional[str]:
+    def _lookup_account_id(self, username: str, raise_errors: bool = False) -> Optional[str]:
         """
-        Look up a Mastodon account ID by username.
+        Look up a Mastodon account ID by username, consulting the account cache first.
 
         :param username: Username or acct handle.
+        :param raise_errors: Re-raise lookup errors instead of returning None.
         :return: Account ID or None.
         """
+        if self.account_cache is not None:
+            account_id = self.account_cache.get(self.client.base_url, username)
+            if account_id:
+                logger.debug("Account cache hit for username=%s", username)
+                return account_id
+
+        account_id = self._fetch_account_id(username, raise_errors)
+        if account_id and self.account_cache is not None:
+            self.account_cache.put(self.client.base_url, username, account_id)
+        return account_id
+
+    def _fetch_account_id(self, username: str, raise_errors: bool = False) -> Optional[str]:
         logger.info("Looking up account for username=%s", username)
         try:
             account = self.client.get("/api/v1/accounts/lookup", params={"acct": username})
         except Exception as exc:  # noqa: BLE001
             logger.error("Account lookup failed for %s: %s", username, exc)
+            if raise_errors:
+                raise
             return None
 
         account_id = account.get("id") if isinstance(account, dict) else None
@@ -34,62 +56,118 @@ class StatusesExtractor:
             logger.debug("Found account_id=%s for username=%s", account_id, username)
         return account_id
 
-    def fetch_statuses(
+    def lookup_account_ids(
+        self,
+        usernames: Iterable[str],
+        max_workers: int = 10,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Resolve many usernames at once, looking up only cache misses concurrently.
+
+        :param usernames: Usernames or acct handles.
+        :param max_workers: Maximum concurrent lookups.
+        :return: Mapping of normalized username to account ID (None if not found).
+        """
+        names = list(dict.fromkeys(normalize_username(u) for u in usernames))
+        resolved: Dict[str, Optional[str]] = {}
+        if self.account_cache is not None:
+            resolved.update(self.account_cache.get_many(self.client.base_url, names))
+
+        misses = [name for name in names if name not in resolved]
+        logger.info(
+            "Resolving %d usernames (%d cached, %d to look up)",
+            len(names),
+            len(names) - len(misses),
+            len(misses),
+        )
+        if misses:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+                found = dict(zip(misses, pool.map(self._fetch_account_id, misses)))
+            if self.account_cache is not None:
+                self.account_cache.put_many(
+                    self.client.base_url,
+                    {name: account_id for name, account_id in found.items() if account_id},
+                )
+            resolved.update(found)
+
+        return {name: resolved.get(name) for name in names}
+
+    def iter_statuses(
         self,
         username: str,
         from_id: Optional[str] = None,
-        limit: int = 40,
-    ) -> List[Dict[str, Any]]:
+        limit: Optional[int] = 40,
+        min_id: Optional[str] = None,
+        raise_errors: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Fetch statuses for a given username.
+        Lazily fetch statuses for a given username, following pagination.
+
+        Records are yielded page by page, so arbitrarily long feeds can be
+        streamed into DataExporter.export_ndjson without being held in memory.
 
         :param username: Mastodon username (acct).
         :param from_id: Optional status ID to fetch statuses since.
-        :param limit: Maximum number of statuses to fetch.
-        :return: List of normalized records.
+        :param limit: Maximum number of statuses to fetch (None = all).
+        :param min_id: Optional status ID to resume after; pages are walked
+            oldest-first from it, so stopping at the limit never leaves a gap.
+        :param raise_errors: Raise on fetch errors and unknown usernames instead
+            of logging them and ending the iteration early.
+        :return: Iterator over normalized records.
         """
-        account_id = self._lookup_account_id(username)
+        account_id = self._lookup_account_id(username, raise_errors)
         if not account_id:
-            return []
+            if raise_errors:
+                raise LookupError(f"No account found for username={username}")
+            return
 
         params: Dict[str, Any] = {
-            "limit": max(1, min(limit, 80)),
             "exclude_replies": False,
             "exclude_reblogs": False,
         }
         if from_id:
             params["since_id"] = from_id
+        if min_id:
+            params["min_id"] = min_id
 
         logger.info(
-            "Fetching up to %d statuses for username=%s (account_id=%s)",
-            limit,
+            "Fetching up to %s statuses for username=%s (account_id=%s)",
+            limit if limit is not None else "all",
             username,
             account_id,
         )
 
         try:
-            raw_statuses = self.client.get(
+            for page in self.client.iter_pages(
                 f"/api/v1/accounts/{account_id}/statuses",
                 params=params,
-            )
+                limit=limit,
+            ):
+                yield from normalize_statuses(page)
         except Exception as exc:  # noqa: BLE001
             logger.error("Failed to fetch statuses for %s: %s", username, exc)
-            return []
+            if raise_errors:
+                raise
 
-        if not isinstance(raw_statuses, list):
-            logger.warning("Unexpected statuses payload: %r", raw_statuses)
-            return []
+    def fetch_statuses(
+        self,
+        username: str,
+        from_id: Optional[str] = None,
+        limit: int = 40,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch statuses for a given username.
 
-        records: List[Dict[str, Any]] = []
-        for status in raw_statuses[:limit]:
-            if not isinstance(status, dict):
-                continue
-            record = normalize_status(status)
-            records.append(record)
+        :param username: Mastodon username (acct).
+        :param from_id: Optional status ID to fetch statuses since.
+        :param limit: Maximum number of statuses to fetch.
+        :return: List of normalized records.
+        """
+        records = list(self.iter_statuses(username, from_id=from_id, limit=limit))
 
         logger.info(
             "Fetched %d normalized statuses for username=%s",
             len(records),
             username,
         )
-        return records
\ No newline at end of file
+        return records
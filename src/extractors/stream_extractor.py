@@ -0,0 +1,406 @@
+import logging
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+import requests
+
+from .metrics import STREAM_EVENTS, STREAM_GAP_FILLED, STREAM_RECONNECTS
+from .utils_parser import (
+    DEFAULT_SETTINGS,
+    MastodonClient,
+    create_client_from_settings,
+    json_loads,
+    normalize_status,
+    normalize_statuses,
+)
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATHS = {
+    "public": "/api/v1/streaming/public",
+    "public:local": "/api/v1/streaming/public/local",
+    "hashtag": "/api/v1/streaming/hashtag",
+}
+
+# Status IDs remembered for de-duplicating gap-fill results against the stream.
+SEEN_IDS = 4096
+
+# Seconds between checks of the stop flag while blocked on the queue.
+_POLL_INTERVAL = 0.5
+
+# Upper bound for one socket read; read1() returns as soon as any bytes arrive.
+_READ_SIZE = 8192
+
+def _id_key(status_id: str) -> Tuple[int, str]:
+    return (len(status_id), status_id)
+
+def _iter_lines(response: requests.Response) -> Iterator[str]:
+    """
+    Yield the body's lines as soon as each one is complete.
+
+    Response.iter_lines() waits for a full chunk (512 bytes by default) before
+    splitting it, which holds back small events until more data arrives.
+    """
+    buffer = b""
+    while True:
+        chunk = response.raw.read1(_READ_SIZE, decode_content=True)
+        if not chunk:
+            break
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8", "replace")
+    if buffer:
+        yield buffer.rstrip(b"\r").decode("utf-8", "replace")
+
+def _socket_of(response: requests.Response) -> Optional[socket.socket]:
+    # requests -> urllib3 HTTPResponse -> http.client HTTPResponse -> SocketIO.
+    fp = getattr(getattr(response.raw, "_fp", None), "fp", None)
+    sock = getattr(getattr(fp, "raw", None), "_sock", None)
+    if sock is None:
+        sock = getattr(getattr(response.raw, "_connection", None), "sock", None)
+    return sock if isinstance(sock, socket.socket) else None
+
+class SSEParser:
+    """
+    Incremental parser for a text/event-stream, fed one line at a time.
+    """
+
+    def __init__(self) -> None:
+        self.event = "message"
+        self.data: List[str] = []
+
+    def feed(self, line: str) -> Optional[Tuple[str, str]]:
+        """
+        Consume one line (without its newline).
+
+        :return: (event, data) when the line completes an event, otherwise None.
+        """
+        if not line:
+            if not self.data:
+                self.event = "message"
+                return None
+            event = (self.event, "\n".join(self.data))
+            self.event, self.data = "message", []
+            return event
+        if line.startswith(":"):
+            # Comment; Mastodon sends ":thump" as a heartbeat.
+            return None
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            self.event = value
+        elif field == "data":
+            self.data.append(value)
+        return None
+
+class StreamExtractor:
+    """
+    Ingests statuses from a Mastodon streaming (server-sent events) endpoint.
+
+    A reader thread keeps the connection open and pushes normalized records
+    into a bounded queue; when the consumer falls behind, the reader blocks on
+    the full queue and stops reading the socket, so the server is throttled by
+    TCP flow control instead of records piling up in memory. Dropped
+    connections are re-established with exponential backoff, and statuses
+    posted while disconnected (or before since_id was checkpointed) are
+    fetched from the matching REST timeline (min_id = newest status seen)
+    as soon as the new connection is up.
+    """
+
+    def __init__(
+        self,
+        client: MastodonClient,
+        stream: str = "hashtag",
+        tag: Optional[str] = None,
+        streaming_url: Optional[str] = None,
+        since_id: Optional[str] = None,
+        queue_size: int = 1000,
+        read_timeout: float = 90.0,
+        reconnect_delay: float = 0.5,
+        reconnect_delay_max: float = 30.0,
+        gap_fill_limit: Optional[int] = 400,
+    ) -> None:
+        if stream not in STREAM_PATHS:
+            raise ValueError(
+                f"Unknown stream {stream!r}; expected one of {', '.join(STREAM_PATHS)}"
+            )
+        if stream == "hashtag" and not tag:
+            raise ValueError("The hashtag stream needs a tag")
+
+        self.client = client
+        self.stream = stream
+        self.tag = tag.lstrip("#") if tag else None
+        self.streaming_url = (streaming_url or client.base_url).rstrip("/")
+        self.read_timeout = read_timeout
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_delay_max = reconnect_delay_max
+        self.gap_fill_limit = gap_fill_limit
+        self.last_id = since_id
+        self.reconnects = 0
+        self.error: Optional[str] = None
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._response: Optional[requests.Response] = None
+        self._seen: Set[str] = set()
+        self._seen_order: Deque[str] = deque()
+
+    def start(self) -> None:
+        """
+        Start the reader thread (iter_records does this on first use).
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name=f"stream-{self.stream}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Ask the reader to finish; safe to call from a signal handler.
+
+        Never waits: a reader blocked on the socket is woken by shutting the
+        socket down, and closing the response is left to the reader thread.
+        """
+        self._stop.set()
+        response = self._response
+        sock = _socket_of(response) if response is not None else None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def iter_records(
+        self, max_records: Optional[int] = None, duration: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield normalized records as they arrive until stopped.
+
+        :param max_records: Stop after this many records (None = no limit).
+        :param duration: Stop after this many seconds (None = no limit).
+        :return: Iterator over normalized records; records already queued when
+            stop() is called are still yielded.
+        """
+        self.start()
+        deadline = time.monotonic() + duration if duration else None
+        emitted = 0
+        try:
+            while max_records is None or emitted < max_records:
+                if self._stop.is_set() or (
+                    self._thread is not None and not self._thread.is_alive()
+                ):
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                try:
+                    record = self._queue.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                emitted += 1
+                yield record
+
+            while max_records is None or emitted < max_records:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                emitted += 1
+                yield record
+        finally:
+            self.stop()
+            if self._thread is not None:
+                self._thread.join(timeout=2 * _POLL_INTERVAL)
+        logger.info(
+            "Stream %s finished after %d records (%d reconnects)",
+            self._label(),
+            emitted,
+            self.reconnects,
+        )
+
+    def _label(self) -> str:
+        return f"{self.stream}#{self.tag}" if self.tag else self.stream
+
+    def _run(self) -> None:
+        attempt = 0
+        while not self._stop.is_set():
+            try:
+                if self._consume():
+                    attempt = 0
+            except requests.HTTPError as exc:
+                status = exc.response.status_code if exc.response is not None else None
+                if status is not None and 400 <= status < 500 and status != 429:
+                    self.error = str(exc)
+                    logger.error("Stream %s rejected: %s", self._label(), exc)
+                    self._stop.set()
+                    return
+                logger.warning("Stream %s failed: %s", self._label(), exc)
+            except Exception as exc:  # noqa: BLE001
+                if self._stop.is_set():
+                    return
+                logger.warning("Stream %s disconnected: %s", self._label(), exc)
+
+            if self._stop.is_set():
+                return
+            attempt += 1
+            delay = min(self.reconnect_delay_max, self.reconnect_delay * 2 ** (attempt - 1))
+            logger.info("Reconnecting to stream %s in %.1fs", self._label(), delay)
+            if self._stop.wait(delay):
+                return
+            self.reconnects += 1
+            STREAM_RECONNECTS.inc(stream=self.stream)
+
+    def _consume(self) -> bool:
+        """
+        Read one streaming connection until it ends.
+
+        :return: True if at least one event was received.
+        """
+        params = {"tag": self.tag} if self.stream == "hashtag" else None
+        received = False
+        response = self.client.session.get(
+            self.streaming_url + STREAM_PATHS[self.stream],
+            params=params,
+            headers={"Accept": "text/event-stream"},
+            stream=True,
+            timeout=(self.client.timeout, self.read_timeout),
+        )
+        self._response = response
+        try:
+            if self._stop.is_set():
+                return received
+            response.raise_for_status()
+            logger.info("Connected to stream %s", self._label())
+            # Fill the gap only once subscribed: statuses posted meanwhile are
+            # buffered on the connection, and duplicates are dropped by _emit.
+            self._gap_fill()
+            parser = SSEParser()
+            for line in _iter_lines(response):
+                if self._stop.is_set():
+                    break
+                event = parser.feed(line)
+                if event is None:
+                    continue
+                received = True
+                self._handle(*event)
+        finally:
+            self._response = None
+            response.close()
+        return received
+
+    def _handle(self, event: str, data: str) -> None:
+        STREAM_EVENTS.inc(stream=self.stream, event=event)
+        if event != "update":
+            # delete / status.update / notifications carry no new statuses.
+            return
+        if self.client.archive is not None:
+            try:
+                self.client.archive.append(
+                    self.client.host,
+                    STREAM_PATHS[self.stream],
+                    {"tag": self.tag} if self.tag else None,
+                    data.encode("utf-8"),
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Failed to archive stream event: %s", exc)
+        try:
+            status = json_loads(data)
+        except ValueError as exc:
+            logger.warning("Skipping malformed %s event: %s", event, exc)
+            return
+        if isinstance(status, dict):
+            self._emit(normalize_status(status, tag=self.tag))
+
+    def _timeline(self) -> Tuple[str, Dict[str, Any]]:
+        if self.stream == "hashtag":
+            return f"/api/v1/timelines/tag/{self.tag}", {}
+        if self.stream == "public:local":
+            return "/api/v1/timelines/public", {"local": "true"}
+        return "/api/v1/timelines/public", {}
+
+    def _gap_fill(self) -> None:
+        if not self.last_id:
+            return
+        path, params = self._timeline()
+        params["min_id"] = self.last_id
+        filled = 0
+        try:
+            for page in self.client.iter_pages(path, params=params, limit=self.gap_fill_limit):
+                for record in normalize_statuses(page, tag=self.tag):
+                    if self._stop.is_set():
+                        return
+                    if self._emit(record):
+                        filled += 1
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Gap fill for stream %s failed: %s", self._label(), exc)
+        if filled:
+            STREAM_GAP_FILLED.inc(filled, stream=self.stream)
+        logger.info("Gap fill for stream %s recovered %d statuses", self._label(), filled)
+        if self.gap_fill_limit is not None and filled >= self.gap_fill_limit:
+            logger.warning(
+                "Gap fill for stream %s hit its limit of %d; older missed statuses were skipped",
+                self._label(),
+                self.gap_fill_limit,
+            )
+
+    def _emit(self, record: Dict[str, Any]) -> bool:
+        """
+        Queue a record unless it was already seen; blocks while the queue is full.
+
+        :return: True if the record was queued.
+        """
+        status_id = record.get("status_id")
+        if isinstance(status_id, str) and status_id:
+            if status_id in self._seen:
+                return False
+            self._seen.add(status_id)
+            self._seen_order.append(status_id)
+            if len(self._seen_order) > SEEN_IDS:
+                self._seen.discard(self._seen_order.popleft())
+            if self.last_id is None or _id_key(status_id) > _id_key(self.last_id):
+                self.last_id = status_id
+
+        while not self._stop.is_set():
+            try:
+                self._queue.put(record, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+def create_stream_extractor_from_settings(
+    settings: Dict[str, Any],
+    stream: str,
+    tag: Optional[str] = None,
+    since_id: Optional[str] = None,
+) -> StreamExtractor:
+    """
+    Build a StreamExtractor (and its client) from settings dictionary.
+    """
+    gap_fill_limit = int(
+        settings.get("stream_gap_fill_limit", DEFAULT_SETTINGS["stream_gap_fill_limit"])
+    )
+    return StreamExtractor(
+        create_client_from_settings(settings),
+        stream=stream,
+        tag=tag,
+        streaming_url=settings.get("streaming_url") or None,
+        since_id=since_id,
+        queue_size=int(settings.get("stream_queue_size", DEFAULT_SETTINGS["stream_queue_size"])),
+        read_timeout=float(
+            settings.get("stream_read_timeout", DEFAULT_SETTINGS["stream_read_timeout"])
+        ),
+        reconnect_delay=float(settings.get("retry_backoff", DEFAULT_SETTINGS["retry_backoff"])),
+        reconnect_delay_max=float(
+            settings.get("retry_backoff_max", DEFAULT_SETTINGS["retry_backoff_max"])
+        ),
+        gap_fill_limit=gap_fill_limit if gap_fill_limit > 0 else None,
+    )
@@ -0,0 +1,234 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from .utils_parser import DEFAULT_SETTINGS, MastodonClient, normalize_statuses
+
+logger = logging.getLogger(__name__)
+
+# Normalized context: (ancestor records, descendant records).
+Context = Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]
+
+class ContextCache:
+    """
+    In-memory status_id -> context cache with TTL and LRU eviction.
+    """
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 10000) -> None:
+        self.ttl = float(ttl)
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Context]]" = OrderedDict()
+
+    def get(self, status_id: str) -> Optional[Context]:
+        with self._lock:
+            entry = self._entries.get(status_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ttl:
+                del self._entries[status_id]
+                return None
+            self._entries.move_to_end(status_id)
+            return entry[1]
+
+    def put(self, status_id: str, context: Context) -> None:
+        with self._lock:
+            self._entries[status_id] = (time.monotonic(), context)
+            self._entries.move_to_end(status_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class ThreadExpander:
+    """
+    Adds the conversation around statuses that have replies.
+
+    For every record with at least `min_replies` replies, the whole thread is
+    fetched on a bounded thread pool: the status's context
+    (/api/v1/statuses/:id/context) gives the thread root (its first ancestor),
+    and the root's context gives every status below it. The thread is
+    emitted right after the record, each status with "context_of" (the thread
+    root) and "in_reply_to_id". Contexts are cached by status ID for
+    `cache_ttl` seconds, so a long-lived expander (e.g. in `serve`) reuses
+    them across jobs.
+
+    Within one expand() call each thread's root is fetched once and every
+    status is emitted at most once; a status already seen in a fetched
+    context is skipped without a request, so only lookups running at the
+    same time can overlap.
+    """
+
+    def __init__(
+        self,
+        client: MastodonClient,
+        workers: int = 4,
+        min_replies: int = 1,
+        cache: Optional[ContextCache] = None,
+    ) -> None:
+        self.client = client
+        self.workers = max(1, int(workers))
+        self.min_replies = max(1, int(min_replies))
+        self.cache = cache if cache is not None else ContextCache()
+        self.max_pending = 4 * self.workers
+
+    def fetch_context(self, status_id: str) -> Context:
+        """
+        Fetch (or reuse from the cache) the normalized context of a status.
+        """
+        cached = self.cache.get(status_id)
+        if cached is not None:
+            return cached
+        payload = self.client.get(f"/api/v1/statuses/{status_id}/context")
+        if not isinstance(payload, dict):
+            payload = {}
+        context = (
+            self._normalize(payload.get("ancestors") or [], status_id),
+            self._normalize(payload.get("descendants") or [], status_id),
+        )
+        self.cache.put(status_id, context)
+        return context
+
+    def _fetch_thread(
+        self, status_id: str, covered: Set[str], lock: threading.Lock
+    ) -> Optional[Context]:
+        """
+        Fetch the thread of a status as ([root], every status below the root).
+
+        Runs on the pool; the lock only guards `covered`. The worker whose
+        lookup first reaches a root claims the thread and fetches the root's
+        context, so each thread is fetched once; identical requests in flight
+        at the same time are shared by the client.
+
+        :return: None when the status or its thread was already covered.
+        """
+        with lock:
+            if status_id in covered:
+                return None
+        ancestors, descendants = self.fetch_context(status_id)
+        root_id = ancestors[0].get("status_id") if ancestors else None
+        with lock:
+            if (root_id or status_id) in covered:
+                return None
+            covered.add(root_id or status_id)
+            covered.add(status_id)
+            covered.update(r["status_id"] for r in ancestors + descendants if r.get("status_id"))
+        if not root_id:
+            # The status is the root: its descendants are the whole thread.
+            return [], descendants
+        root = dict(ancestors[0], context_of=root_id)
+        below = self.fetch_context(root_id)[1]
+        with lock:
+            covered.update(r["status_id"] for r in below if r.get("status_id"))
+        return [root], below
+
+    @staticmethod
+    def _normalize(statuses: List[Any], context_of: str) -> List[Dict[str, Any]]:
+        records = normalize_statuses(statuses)
+        # normalize_statuses skips non-dicts, so re-pair with the dict statuses.
+        for record, status in zip(records, (s for s in statuses if isinstance(s, dict))):
+            record["context_of"] = context_of
+            record["in_reply_to_id"] = status.get("in_reply_to_id")
+        return records
+
+    def expand(self, records: Iterable[Mapping[str, Any]]) -> Iterator[Mapping[str, Any]]:
+        """
+        Yield every record, each followed by its not yet emitted thread statuses.
+
+        :param records: Normalized status records.
+        :return: Iterator over the input records and the added context records.
+        """
+        emitted: Set[str] = set()
+        # Statuses emitted as thread members; a later input record for one of
+        # them (older statuses arrive after their replies) is dropped.
+        added: Set[str] = set()
+        # Statuses whose thread is fetched or being fetched; shared with the pool.
+        covered: Set[str] = set()
+        lock = threading.Lock()
+        inflight: Dict[str, "Future[Optional[Context]]"] = {}
+        pending: Deque[Tuple[Mapping[str, Any], Optional["Future[Optional[Context]]"]]] = deque()
+        stats = {"expanded": 0, "skipped": 0, "added": 0}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="context") as pool:
+            for record in records:
+                future = None
+                status_id = record.get("status_id")
+                if isinstance(status_id, str) and status_id:
+                    if status_id in added:
+                        continue
+                    emitted.add(status_id)
+                    if (record.get("replies_count") or 0) >= self.min_replies:
+                        future = inflight.get(status_id)
+                        if future is None:
+                            future = pool.submit(self._fetch_thread, status_id, covered, lock)
+                            inflight[status_id] = future
+                pending.append((record, future))
+                while len(pending) > self.max_pending or (
+                    pending and (pending[0][1] is None or pending[0][1].done())
+                ):
+                    yield from self._finish(*pending.popleft(), emitted, added, stats)
+            while pending:
+                yield from self._finish(*pending.popleft(), emitted, added, stats)
+
+        logger.info(
+            "Expanded %d threads (%d skipped as already covered), adding %d statuses",
+            stats["expanded"],
+            stats["skipped"],
+            stats["added"],
+        )
+
+    def _finish(
+        self,
+        record: Mapping[str, Any],
+        future: Optional["Future[Optional[Context]]"],
+        emitted: Set[str],
+        added: Set[str],
+        stats: Dict[str, int],
+    ) -> Iterator[Mapping[str, Any]]:
+        yield record
+        if future is None:
+            return
+        try:
+            thread = future.result()
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Fetching thread of %s failed: %s", record.get("status_id"), exc)
+            return
+        if thread is None:
+            stats["skipped"] += 1
+            return
+        stats["expanded"] += 1
+        root, below = thread
+        for context_record in root + below:
+            status_id = context_record.get("status_id")
+            if status_id in emitted:
+                continue
+            emitted.add(status_id)
+            added.add(status_id)
+            stats["added"] += 1
+            yield dict(context_record)
+
+def create_thread_expander_from_settings(
+    settings: Dict[str, Any], client: MastodonClient
+) -> Optional[ThreadExpander]:
+    """
+    Build a ThreadExpander if thread_expansion is enabled, else None.
+    """
+    if not settings.get("thread_expansion"):
+        return None
+    return ThreadExpander(
+        client,
+        workers=int(settings.get("thread_workers", DEFAULT_SETTINGS["thread_workers"])),
+        min_replies=int(
+            settings.get("thread_min_replies", DEFAULT_SETTINGS["thread_min_replies"])
+        ),
+        cache=ContextCache(
+            ttl=float(settings.get("thread_cache_ttl", DEFAULT_SETTINGS["thread_cache_ttl"])),
+            max_entries=int(
+                settings.get("thread_cache_size", DEFAULT_SETTINGS["thread_cache_size"])
+            ),
+        ),
+    )
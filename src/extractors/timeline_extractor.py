@@ -1,7 +1,7 @@
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
-from .utils_parser import MastodonClient, normalize_status
+from .utils_parser import MastodonClient, normalize_statuses
 
 logger = logging.getLogger(__name__)
 
@@ -13,60 +13,70 @@ class TimelineExtractor:
     def __init__(self, client: MastodonClient) -> None:
         self.client = client
 
-    def fetch_timeline(
+    def iter_timeline(
         self,
         tag: str,
         from_id: Optional[str] = None,
-        limit: int = 40,
-    ) -> List[Dict[str, Any]]:
+        limit: Optional[int] = 40,
+        min_id: Optional[str] = None,
+        raise_errors: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Fetch a hashtag timeline.
+        Lazily fetch a hashtag timeline, following pagination.
 
         :param tag: Hashtag (without #).
         :param from_id: Optional status ID to fetch since.
-        :param limit: Maximum number of statuses to fetch.
-        :return: List of normalized records.
+        :param limit: Maximum number of statuses to fetch (None = all).
+        :param min_id: Optional status ID to resume after; pages are walked
+            oldest-first from it, so stopping at the limit never leaves a gap.
+        :param raise_errors: Re-raise fetch errors instead of logging them and
+            ending the iteration early.
+        :return: Iterator over normalized records.
         """
-        params: Dict[str, Any] = {
-            "limit": max(1, min(limit, 80)),
-        }
+        params: Dict[str, Any] = {}
         if from_id:
             params["since_id"] = from_id
+        if min_id:
+            params["min_id"] = min_id
 
         normalized_tag = tag.lstrip("#")
         logger.info(
-            "Fetching up to %d timeline statuses for tag=%s",
-            limit,
+            "Fetching up to %s timeline statuses for tag=%s",
+            limit if limit is not None else "all",
             normalized_tag,
         )
 
         try:
-            raw_statuses = self.client.get(
+            for page in self.client.iter_pages(
                 f"/api/v1/timelines/tag/{normalized_tag}",
                 params=params,
-            )
+                limit=limit,
+            ):
+                yield from normalize_statuses(page, tag=normalized_tag)
         except Exception as exc:  # noqa: BLE001
             logger.error("Failed to fetch timeline for tag=%s: %s", normalized_tag, exc)
-            return []
+            if raise_errors:
+                raise
 
-        if not isinstance(raw_statuses, list):
-            logger.warning("Unexpected timeline payload: %r", raw_statuses)
-            return []
+    def fetch_timeline(
+        self,
+        tag: str,
+        from_id: Optional[str] = None,
+        limit: int = 40,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch a hashtag timeline.
 
-        records: List[Dict[str, Any]] = []
-        for status in raw_statuses[:limit]:
-            if not isinstance(status, dict):
-                continue
-            record = normalize_status(
-                status,
-                tag=normalized_tag,
-                search_query=None,
-            )
-            records.append(record)
+        :param tag: Hashtag (without #).
+        :param from_id: Optional status ID to fetch since.
+        :param limit: Maximum number of statuses to fetch.
+        :return: List of normalized records.
+        """
+        records = list(self.iter_timeline(tag, from_id=from_id, limit=limit))
 
         logger.info(
             "Fetched %d normalized timeline statuses for tag=%s",
             len(records),
-            normalized_tag,
+            tag.lstrip("#"),
         )
-        return records
\ No newline at end of file
+        return records
@@ -1,7 +1,7 @@
 import logging
 from typing import Any, Dict, List
 
-from .utils_parser import MastodonClient, normalize_status
+from .utils_parser import MastodonClient, build_record
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +22,19 @@ class TrendsExtractor:
         """
         logger.info("Fetching up to %d trends from Mastodon", limit)
         raw_trends = self.client.get("/api/v1/trends/tags", params={"limit": limit})
+        records = self.normalize_trends(raw_trends, limit)
+        logger.info("Fetched %d normalized trend records", len(records))
+        return records
+
+    @staticmethod
+    def normalize_trends(raw_trends: Any, limit: int) -> List[Dict[str, Any]]:
+        """
+        Normalize a raw /api/v1/trends/tags payload into the common schema.
+
+        :param raw_trends: Parsed JSON response.
+        :param limit: Maximum number of trends to keep.
+        :return: List of normalized records.
+        """
         records: List[Dict[str, Any]] = []
 
         if not isinstance(raw_trends, list):
@@ -33,27 +46,39 @@ class TrendsExtractor:
             if not name:
                 continue
 
-            # Construct a pseudo-status object for schema compatibility
-            pseudo_status = {
-                "id": trend.get("id") or trend.get("name"),
-                "account": {"acct": None, "username": None},
-                "content": None,
-                "created_at": None,
-                "media_attachments": [],
-                "url": trend.get("url"),
-                "uri": trend.get("url"),
-                "replies_count": None,
-                "reblogs_count": trend.get("statuses_count"),
-                "favourites_count": None,
-            }
-
-            record = normalize_status(
-                pseudo_status,
+            record = build_record(
+                status_id=trend.get("id") or name,
                 trend_name=name,
                 tag=name.lstrip("#") if isinstance(name, str) else None,
-                search_query=None,
+                url=trend.get("url"),
             )
+            record["history"] = parse_history(trend.get("history"))
             records.append(record)
 
-        logger.info("Fetched %d normalized trend records", len(records))
-        return records
\ No newline at end of file
+        return records
+
+def parse_history(history: Any) -> List[Dict[str, int]]:
+    """
+    Convert a tag's `history` (per-day strings) into integers, newest day first.
+
+    :param history: Raw list of {"day", "uses", "accounts"} objects.
+    :return: List of {"day": unix day start, "uses": int, "accounts": int}.
+    """
+    days: List[Dict[str, int]] = []
+    if not isinstance(history, list):
+        return days
+    for entry in history:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            days.append(
+                {
+                    "day": int(entry["day"]),
+                    "uses": int(entry.get("uses") or 0),
+                    "accounts": int(entry.get("accounts") or 0),
+                }
+            )
+        except (KeyError, TypeError, ValueError):
+            continue
+    days.sort(key=lambda day: day["day"], reverse=True)
+    return days
\ No newline at end of file
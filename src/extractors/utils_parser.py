@@ -1,13 +1,43 @@
 import json
 import logging
+import threading
+import time
+from collections.abc import Mapping
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from .http_cache import ResponseCache
+from .metrics import (
+    CACHE_HITS,
+    DECODE_SECONDS,
+    NORMALIZE_SECONDS,
+    NORMALIZED_RECORDS,
+    REQUEST_SECONDS,
+    REQUESTS_SHARED,
+    REQUESTS_TOTAL,
+    RESPONSE_BYTES,
+    endpoint_label,
+)
+from .rate_limiter import RateLimiter, parse_retry_after
+from .request_memo import RequestMemo, SingleFlight, request_key
+from .response_archive import ResponseArchive, create_archive_from_settings
+from .retry import CircuitBreaker, RetryPolicy
+
+try:  # Optional faster JSON decoder.
+    import orjson  # type: ignore[import]
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Decoder used for API responses; orjson is several times faster when installed.
+json_loads: Callable[[Any], Any] = orjson.loads if orjson is not None else json.loads
+
 DEFAULT_SETTINGS: Dict[str, Any] = {
     "base_url": "https://mastodon.social",
     "access_token": "",
@@ -15,8 +45,89 @@ DEFAULT_SETTINGS: Dict[str, Any] = {
     "timeout": 10,
     "output_dir": str(Path(__file__).resolve().parents[2] / "data"),
     "log_level": "INFO",
+    "concurrency": 10,
+    "rate_limit": True,
+    "rate_limit_margin": 5,
+    "max_rate_limit_retries": 3,
+    "max_retries": 3,
+    "retry_backoff": 0.5,
+    "retry_backoff_max": 30.0,
+    "circuit_breaker_threshold": 5,
+    "circuit_breaker_reset": 60.0,
+    "cache_dir": "",
+    "cache_max_bytes": 50 * 1024 * 1024,
+    "cache_ttl": {
+        "/api/v1/trends/tags": 300,
+        "/api/v1/accounts/lookup": 86400,
+        "/api/v2/search": 600,
+    },
+    "account_cache_path": "",
+    "account_cache_ttl": 86400,
+    "checkpoint_path": "",
+    "batch_workers": 4,
+    "output_compression": "",
+    "output_rotate_records": 0,
+    "output_rotate_bytes": 0,
+    "output_indent": 2,
+    "sqlite_path": "",
+    "metrics_path": "",
+    "streaming_url": "",
+    "stream_queue_size": 1000,
+    "stream_read_timeout": 90.0,
+    "stream_gap_fill_limit": 400,
+    "instances": [],
+    "instance_concurrency": 4,
+    "trend_store_path": "",
+    "trend_history_days": 30,
+    "trend_max_samples": 288,
+    "trend_min_sample_gap": 300,
+    "content_processing": False,
+    "content_workers": 0,
+    "content_chunk_size": 200,
+    "archive_dir": "",
+    "archive_segment_bytes": 256 * 1024 * 1024,
+    "archive_compression": "zlib",
+    "serve_host": "127.0.0.1",
+    "serve_port": 8765,
+    "serve_socket": "",
+    "serve_workers": 4,
+    "media_dir": "",
+    "media_workers": 8,
+    "media_chunk_size": 64 * 1024,
+    "media_timeout": 60.0,
+    "media_max_bytes": 0,
+    "graph_directions": ["followers", "following"],
+    "graph_max_depth": 1,
+    "graph_max_nodes": 1000,
+    "graph_max_edges": 1000,
+    "graph_concurrency": 4,
+    "thread_expansion": False,
+    "thread_workers": 4,
+    "thread_min_replies": 1,
+    "thread_cache_ttl": 600,
+    "thread_cache_size": 10000,
+    "query_indexing": False,
+    "query_index_path": "",
+    # Off by default: paginated runs that must see fresh data (e.g. repeated
+    # exports of the same timeline) would otherwise be served from memory.
+    "request_memo_bytes": 0,
+    "request_memo_ttl": 30.0,
 }
 
+# Delay used after a 429 when neither Retry-After nor X-RateLimit-Reset is usable.
+DEFAULT_RETRY_AFTER = 5.0
+
+# Requests polling for newer items are never answered from the run memo.
+_FRESH_PARAMS = ("min_id", "since_id")
+
+# Circuit breakers built by create_client_from_settings, one per host, so every
+# client of a process (batch, fan-out, thread expansion, gap fill) shares them.
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+# Largest page size accepted by the paginated Mastodon endpoints we use.
+MAX_PAGE_SIZE = 80
+
 def load_settings(config_path: Optional[str] = None) -> Dict[str, Any]:
     """
     Load scraper settings from JSON file or fall back to defaults.
@@ -46,19 +157,102 @@ def load_settings(config_path: Optional[str] = None) -> Dict[str, Any]:
 
     return settings
 
+class Paginator:
+    """
+    Tracks max_id pagination state independently of how pages are fetched.
+
+    Shared by the blocking and asyncio clients so both follow cursors the
+    same way. When the initial params carry a min_id, pagination walks
+    forward instead (rel="prev" links, min_id cursors), i.e. towards newer
+    items, so a limit never leaves a gap after the starting ID.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> None:
+        self.path = path
+        self.params: Dict[str, Any] = dict(params or {})
+        self.page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        self.remaining = limit
+        self.done = False
+        self.forward = "min_id" in self.params
+        self.rel = "prev" if self.forward else "next"
+        self.cursor_key = "min_id" if self.forward else "max_id"
+        self._seen_cursors: set = set()
+
+    def next_params(self) -> Optional[Dict[str, Any]]:
+        """
+        Return query params for the next page, or None when pagination is done.
+        """
+        if self.done or (self.remaining is not None and self.remaining <= 0):
+            return None
+        if self.remaining is None:
+            self.params["limit"] = self.page_size
+        else:
+            self.params["limit"] = min(self.page_size, self.remaining)
+        return dict(self.params)
+
+    def feed(self, payload: Any, cursor: Optional[str]) -> Optional[List[Any]]:
+        """
+        Consume a fetched page and advance the cursor.
+
+        :param payload: Parsed JSON of the page.
+        :param cursor: Cursor from the rel="next" (or "prev") link, if any.
+        :return: Items to yield, or None if pagination has ended.
+        """
+        if not isinstance(payload, list):
+            logger.warning("Unexpected paginated payload from %s: %r", self.path, payload)
+            self.done = True
+            return None
+        if not payload:
+            self.done = True
+            return None
+
+        page = payload if self.remaining is None else payload[: self.remaining]
+        if self.remaining is not None:
+            self.remaining -= len(page)
+
+        if cursor is None and len(payload) >= self.params["limit"]:
+            # No Link header: fall back to the oldest (or newest) item's ID.
+            edge = payload[0] if self.forward else payload[-1]
+            cursor = edge.get("id") if isinstance(edge, dict) else None
+        if cursor is None or cursor in self._seen_cursors:
+            self.done = True
+        else:
+            self._seen_cursors.add(cursor)
+            self.params[self.cursor_key] = cursor
+        return page
+
 @dataclass
 class MastodonClient:
     """
     Lightweight HTTP client for Mastodon API.
+
+    Identical GETs (same URL and params) that run at the same time share one
+    network call, and with a `memo` repeats within its TTL are answered from
+    memory (except polls for newer items, i.e. min_id / since_id); both skip
+    the disk cache and the archive.
     """
 
     base_url: str
     access_token: str
     user_agent: str
     timeout: int = 10
+    rate_limiter: Optional[RateLimiter] = None
+    max_rate_limit_retries: int = 3
+    retry_policy: Optional[RetryPolicy] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
+    cache: Optional[ResponseCache] = None
+    archive: Optional[ResponseArchive] = None
+    memo: Optional[RequestMemo] = None
 
     def __post_init__(self) -> None:
         self.base_url = self.base_url.rstrip("/")
+        self.host = urlsplit(self.base_url).netloc
         self.session = requests.Session()
         headers = {
             "User-Agent": self.user_agent,
@@ -67,8 +261,173 @@ class MastodonClient:
         if self.access_token:
             headers["Authorization"] = f"Bearer {self.access_token}"
         self.session.headers.update(headers)
+        self._flights = SingleFlight()
         logger.debug("Initialized MastodonClient with base_url=%s", self.base_url)
 
+    def _request(self, path: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        key = request_key(self.base_url + path, params)
+        memo = self.memo
+        if memo is not None and params and any(params.get(p) for p in _FRESH_PARAMS):
+            memo = None
+        if memo is not None:
+            memoized = memo.get(key)
+            if memoized is not None:
+                logger.debug("GET %s%s served from the run memo", self.base_url, path)
+                REQUESTS_SHARED.inc(endpoint=endpoint_label(path), source="memo")
+                return memoized
+        response, shared = self._flights.do(
+            key, lambda: self._fetch(key, path, params, memo)
+        )
+        if shared:
+            logger.debug("GET %s%s shared with a concurrent request", self.base_url, path)
+            REQUESTS_SHARED.inc(endpoint=endpoint_label(path), source="coalesced")
+        return response
+
+    def _fetch(
+        self,
+        key: str,
+        path: str,
+        params: Optional[Dict[str, Any]],
+        memo: Optional[RequestMemo],
+    ) -> requests.Response:
+        response = self._fetch_cached(path, params)
+        # Memoized before the flight ends, so later callers find it right away.
+        if memo is not None:
+            memo.put(key, response)
+        return response
+
+    def _fetch_cached(
+        self, path: str, params: Optional[Dict[str, Any]] = None
+    ) -> requests.Response:
+        url = self.base_url + path
+        ttl = self.cache.ttl_for(path) if self.cache is not None else None
+        if self.cache is None or ttl is None:
+            return self._archived(path, params, self._send(url, params))
+
+        key = self.cache.make_key(url, params, self.access_token)
+        entry = self.cache.load(key)
+        if entry is not None and self.cache.is_fresh(entry, ttl):
+            logger.debug("GET %s served from cache", url)
+            CACHE_HITS.inc(endpoint=endpoint_label(path))
+            return ResponseCache.to_response(entry)
+
+        headers = ResponseCache.conditional_headers(entry) if entry is not None else None
+        response = self._send(url, params, headers)
+        if response.status_code == 304 and entry is not None:
+            logger.debug("GET %s revalidated (304), served from cache", url)
+            CACHE_HITS.inc(endpoint=endpoint_label(path))
+            self.cache.refresh(key, entry, response)
+            return ResponseCache.to_response(entry)
+        self.cache.store(key, response)
+        return self._archived(path, params, response)
+
+    def _archived(
+        self, path: str, params: Optional[Dict[str, Any]], response: requests.Response
+    ) -> requests.Response:
+        # Only bodies that came over the network; cache hits were archived when fetched.
+        if self.archive is not None:
+            try:
+                self.archive.append(self.host, path, params, response.content)
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Failed to archive response for %s: %s", path, exc)
+        return response
+
+    def _send(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        rate_limited = 0
+        failures = 0
+        endpoint = endpoint_label(urlsplit(url).path)
+        try:
+            while True:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.allow(self.host)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+
+                start = time.perf_counter()
+                try:
+                    response = self.session.get(
+                        url, params=params or {}, headers=headers, timeout=self.timeout
+                    )
+                except (requests.ConnectionError, requests.Timeout) as exc:
+                    REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+                    REQUESTS_TOTAL.inc(endpoint=endpoint, code="error")
+                    self._record_failure()
+                    failures += 1
+                    if not self._can_retry(failures):
+                        raise
+                    self._wait_before_retry(url, failures, exc)
+                    continue
+
+                REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+                REQUESTS_TOTAL.inc(endpoint=endpoint, code=response.status_code)
+                RESPONSE_BYTES.inc(len(response.content), endpoint=endpoint)
+
+                if self.rate_limiter is not None:
+                    self.rate_limiter.update(response.headers)
+
+                if response.status_code == 429 and rate_limited < self.max_rate_limit_retries:
+                    rate_limited += 1
+                    self._wait_after_rate_limit(response)
+                    continue
+
+                if self.retry_policy is not None and (
+                    response.status_code in self.retry_policy.retry_statuses
+                ):
+                    self._record_failure()
+                    failures += 1
+                    if self._can_retry(failures):
+                        self._wait_before_retry(url, failures, response.status_code)
+                        continue
+                elif self.circuit_breaker is not None:
+                    self.circuit_breaker.record_success(self.host)
+
+                response.raise_for_status()
+                logger.debug(
+                    "GET %s succeeded with status=%s", response.url, response.status_code
+                )
+                return response
+        except requests.RequestException as exc:
+            logger.error("GET request to %s failed: %s", url, exc)
+            raise
+
+    def _record_failure(self) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_failure(self.host)
+
+    def _can_retry(self, failures: int) -> bool:
+        return self.retry_policy is not None and failures <= self.retry_policy.max_retries
+
+    def _wait_before_retry(self, url: str, attempt: int, reason: Any) -> None:
+        assert self.retry_policy is not None
+        delay = self.retry_policy.delay(attempt)
+        logger.warning(
+            "GET %s failed (%s); retry %d/%d in %.2fs",
+            url,
+            reason,
+            attempt,
+            self.retry_policy.max_retries,
+            delay,
+        )
+        time.sleep(delay)
+
+    def _wait_after_rate_limit(self, response: requests.Response) -> None:
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        if delay is None and self.rate_limiter is not None:
+            delay = self.rate_limiter.seconds_until_reset()
+        if delay is None:
+            delay = DEFAULT_RETRY_AFTER
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.pause(delay)
+        else:
+            logger.warning("Rate limited on %s; retrying in %.1fs", response.url, delay)
+            time.sleep(delay)
+
     def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         """
         Perform a GET request to the Mastodon API.
@@ -77,51 +436,279 @@ class MastodonClient:
         :param params: Query parameters dictionary.
         :return: Parsed JSON response.
         """
-        url = self.base_url + path
-        try:
-            response = self.session.get(url, params=params or {}, timeout=self.timeout)
-            response.raise_for_status()
-            logger.debug(
-                "GET %s succeeded with status=%s", response.url, response.status_code
+        response = self._request(path, params)
+        with DECODE_SECONDS.time(endpoint=endpoint_label(path)):
+            return json_loads(response.content)
+
+    def get_page(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        rel: str = "next",
+        cursor_key: str = "max_id",
+    ) -> Tuple[Any, Optional[str]]:
+        """
+        Perform a GET request and return the payload with its next-page cursor.
+
+        :param path: API path starting with '/api/...'
+        :param params: Query parameters dictionary.
+        :param rel: Link relation to follow ("next" for older, "prev" for newer).
+        :param cursor_key: Query parameter holding the cursor in that link.
+        :return: Tuple of (parsed JSON, cursor of the link or None).
+        """
+        response = self._request(path, params)
+        link = response.links.get(rel, {}).get("url")
+        with DECODE_SECONDS.time(endpoint=endpoint_label(path)):
+            payload = json_loads(response.content)
+        return payload, _cursor_from_link(link, cursor_key)
+
+    def iter_pages(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> Iterator[List[Any]]:
+        """
+        Follow Link-header (max_id) pagination and yield one page at a time.
+
+        The original params (e.g. since_id) are re-sent with every page, since
+        Mastodon does not always carry them over into its rel="next" links.
+
+        :param path: API path of a list endpoint.
+        :param params: Query parameters for the first page.
+        :param limit: Maximum number of items to yield in total (None = no limit).
+        :param page_size: Items requested per page (clamped to MAX_PAGE_SIZE).
+        :return: Iterator over lists of raw items.
+        """
+        pager = Paginator(path, params, limit=limit, page_size=page_size)
+        while True:
+            page_params = pager.next_params()
+            if page_params is None:
+                return
+            payload, cursor = self.get_page(
+                path, params=page_params, rel=pager.rel, cursor_key=pager.cursor_key
             )
-            return response.json()
-        except requests.RequestException as exc:
-            logger.error("GET request to %s failed: %s", url, exc)
-            raise
+            page = pager.feed(payload, cursor)
+            if page is None:
+                return
+            yield page
+
+    def set_pool_size(self, size: int) -> None:
+        """
+        Resize the session's connection pool so `size` threads can share it.
+        """
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, size))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def close(self) -> None:
         self.session.close()
+        if self.archive is not None:
+            self.archive.close()
+
+def _shared_circuit_breaker(settings: Dict[str, Any]) -> CircuitBreaker:
+    # The first client for a host decides its breaker's threshold and timeout.
+    host = urlsplit(settings.get("base_url", DEFAULT_SETTINGS["base_url"]).rstrip("/")).netloc
+    with _BREAKERS_LOCK:
+        if host not in _BREAKERS:
+            _BREAKERS[host] = CircuitBreaker(
+                failure_threshold=int(
+                    settings.get(
+                        "circuit_breaker_threshold",
+                        DEFAULT_SETTINGS["circuit_breaker_threshold"],
+                    )
+                ),
+                reset_timeout=float(
+                    settings.get(
+                        "circuit_breaker_reset", DEFAULT_SETTINGS["circuit_breaker_reset"]
+                    )
+                ),
+            )
+        return _BREAKERS[host]
 
 def create_client_from_settings(settings: Dict[str, Any]) -> MastodonClient:
     """
     Build a MastodonClient instance from settings dictionary.
     """
+    rate_limiter: Optional[RateLimiter] = None
+    if settings.get("rate_limit", DEFAULT_SETTINGS["rate_limit"]):
+        rate_limiter = RateLimiter(
+            safety_margin=int(
+                settings.get("rate_limit_margin", DEFAULT_SETTINGS["rate_limit_margin"])
+            )
+        )
+    retry_policy = RetryPolicy(
+        max_retries=int(settings.get("max_retries", DEFAULT_SETTINGS["max_retries"])),
+        backoff_base=float(settings.get("retry_backoff", DEFAULT_SETTINGS["retry_backoff"])),
+        backoff_max=float(
+            settings.get("retry_backoff_max", DEFAULT_SETTINGS["retry_backoff_max"])
+        ),
+    )
+    circuit_breaker = _shared_circuit_breaker(settings)
+    cache: Optional[ResponseCache] = None
+    if settings.get("cache_dir"):
+        cache = ResponseCache(
+            settings["cache_dir"],
+            ttls=settings.get("cache_ttl") or DEFAULT_SETTINGS["cache_ttl"],
+            max_bytes=int(settings.get("cache_max_bytes", DEFAULT_SETTINGS["cache_max_bytes"])),
+        )
     return MastodonClient(
         base_url=settings.get("base_url", DEFAULT_SETTINGS["base_url"]),
         access_token=settings.get("access_token", DEFAULT_SETTINGS["access_token"]),
         user_agent=settings.get("user_agent", DEFAULT_SETTINGS["user_agent"]),
         timeout=int(settings.get("timeout", DEFAULT_SETTINGS["timeout"])),
+        rate_limiter=rate_limiter,
+        max_rate_limit_retries=int(
+            settings.get("max_rate_limit_retries", DEFAULT_SETTINGS["max_rate_limit_retries"])
+        ),
+        retry_policy=retry_policy,
+        circuit_breaker=circuit_breaker,
+        cache=cache,
+        archive=create_archive_from_settings(settings),
+        memo=create_request_memo_from_settings(settings),
     )
 
-def normalize_status(
-    status: Dict[str, Any],
+def create_request_memo_from_settings(settings: Dict[str, Any]) -> Optional[RequestMemo]:
+    """
+    Build a RequestMemo if request_memo_bytes and request_memo_ttl are both
+    positive (request_memo_bytes is 0, i.e. off, by default).
+    """
+    max_bytes = int(settings.get("request_memo_bytes", DEFAULT_SETTINGS["request_memo_bytes"]))
+    ttl = float(settings.get("request_memo_ttl", DEFAULT_SETTINGS["request_memo_ttl"]))
+    if max_bytes <= 0 or ttl <= 0:
+        return None
+    return RequestMemo(max_bytes=max_bytes, ttl=ttl)
+
+def _cursor_from_link(url: Optional[str], key: str) -> Optional[str]:
+    """
+    Extract a pagination cursor (e.g. max_id) from a Link header URL.
+    """
+    if not url:
+        return None
+    values = parse_qs(urlsplit(url).query).get(key)
+    return values[0] if values else None
+
+def build_record(
+    status_id: Any = None,
     trend_name: Optional[str] = None,
+    username: Optional[str] = None,
+    content: Optional[str] = None,
+    created_at: Optional[str] = None,
+    media: Optional[List[str]] = None,
     tag: Optional[str] = None,
     search_query: Optional[str] = None,
+    url: Optional[str] = None,
+    replies_count: Any = None,
+    reblogs_count: Any = None,
+    favourites_count: Any = None,
 ) -> Dict[str, Any]:
     """
-    Normalize a Mastodon status object into the unified schema used by this project.
+    Build a normalized record directly, for objects that are not statuses
+    (trends, accounts, hashtags).
+    """
+    return {
+        "trend_name": trend_name,
+        "status_id": status_id,
+        "username": username,
+        "content": content,
+        "created_at": created_at,
+        "media": media if media is not None else [],
+        "tag": tag,
+        "search_query": search_query,
+        "url": url,
+        "replies_count": replies_count,
+        "reblogs_count": reblogs_count,
+        "favourites_count": favourites_count,
+    }
+
+# Field order of normalized records (and of exported JSON objects).
+RECORD_FIELDS: Tuple[str, ...] = (
+    "trend_name",
+    "status_id",
+    "username",
+    "content",
+    "created_at",
+    "media",
+    "tag",
+    "search_query",
+    "url",
+    "replies_count",
+    "reblogs_count",
+    "favourites_count",
+)
+
+class StatusRecord(Mapping):
+    """
+    Compact normalized record backed by __slots__.
+
+    Uses well under half the memory of the equivalent dict and behaves as a
+    read-only Mapping, so large batches (e.g. multi-target backfills held
+    until export) can be buffered cheaply and passed to the exporters as is.
     """
-    account = status.get("account") or {}
-    media_attachments = status.get("media_attachments") or []
 
+    __slots__ = RECORD_FIELDS
+
+    def __init__(
+        self,
+        trend_name: Optional[str],
+        status_id: Any,
+        username: Optional[str],
+        content: Optional[str],
+        created_at: Optional[str],
+        media: List[str],
+        tag: Optional[str],
+        search_query: Optional[str],
+        url: Optional[str],
+        replies_count: Any,
+        reblogs_count: Any,
+        favourites_count: Any,
+    ) -> None:
+        self.trend_name = trend_name
+        self.status_id = status_id
+        self.username = username
+        self.content = content
+        self.created_at = created_at
+        self.media = media
+        self.tag = tag
+        self.search_query = search_query
+        self.url = url
+        self.replies_count = replies_count
+        self.reblogs_count = reblogs_count
+        self.favourites_count = favourites_count
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in RECORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RECORD_FIELDS)
+
+    def __len__(self) -> int:
+        return len(RECORD_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"StatusRecord(status_id={self.status_id!r}, username={self.username!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in RECORD_FIELDS}
+
+def _status_record(
+    status: Dict[str, Any],
+    trend_name: Optional[str],
+    tag: Optional[str],
+    search_query: Optional[str],
+) -> Dict[str, Any]:
+    # The one status -> record mapping; keys in RECORD_FIELDS order.
+    account = status.get("account") or {}
     media_urls: List[str] = []
-    for m in media_attachments:
+    for m in status.get("media_attachments") or []:
         url = m.get("url") or m.get("preview_url") or m.get("remote_url")
         if url:
             media_urls.append(url)
 
-    normalized: Dict[str, Any] = {
+    return {
         "trend_name": trend_name,
         "status_id": status.get("id"),
         "username": account.get("acct") or account.get("username"),
@@ -135,4 +722,52 @@ def normalize_status(
         "reblogs_count": status.get("reblogs_count"),
         "favourites_count": status.get("favourites_count"),
     }
-    return normalized
\ No newline at end of file
+
+def normalize_status(
+    status: Dict[str, Any],
+    trend_name: Optional[str] = None,
+    tag: Optional[str] = None,
+    search_query: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Normalize a Mastodon status object into the unified schema used by this project.
+    """
+    start = time.perf_counter()
+    record = _status_record(status, trend_name, tag, search_query)
+    NORMALIZE_SECONDS.observe(time.perf_counter() - start)
+    NORMALIZED_RECORDS.inc()
+    return record
+
+def normalize_statuses(
+    statuses: Iterable[Any],
+    trend_name: Optional[str] = None,
+    tag: Optional[str] = None,
+    search_query: Optional[str] = None,
+    compact: bool = False,
+) -> List[Any]:
+    """
+    Normalize a whole page of statuses in one pass.
+
+    Produces the same records as calling normalize_status per item; non-dict
+    items are skipped.
+
+    :param statuses: Raw status objects (e.g. one API page).
+    :param compact: Return read-only StatusRecord objects instead of dicts.
+    :return: List of normalized records.
+    """
+    start = time.perf_counter()
+    if compact:
+        records: List[Any] = [
+            StatusRecord(*_status_record(status, trend_name, tag, search_query).values())
+            for status in statuses
+            if isinstance(status, dict)
+        ]
+    else:
+        records = [
+            _status_record(status, trend_name, tag, search_query)
+            for status in statuses
+            if isinstance(status, dict)
+        ]
+    NORMALIZE_SECONDS.observe(time.perf_counter() - start)
+    NORMALIZED_RECORDS.inc(len(records))
+    return records
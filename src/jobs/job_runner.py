@@ -0,0 +1,293 @@
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from extractors.account_cache import (  # type: ignore[import]
+    create_account_cache_from_settings,
+    normalize_username,
+)
+from extractors.search_handler import SEARCH_TYPES, SearchHandler  # type: ignore[import]
+from extractors.statuses_extractor import StatusesExtractor  # type: ignore[import]
+from extractors.timeline_extractor import TimelineExtractor  # type: ignore[import]
+from extractors.thread_expander import (  # type: ignore[import]
+    create_thread_expander_from_settings,
+)
+from extractors.trends_extractor import TrendsExtractor  # type: ignore[import]
+from extractors.utils_parser import create_client_from_settings  # type: ignore[import]
+from outputs.checkpoint_store import CheckpointStore, HighWaterMark  # type: ignore[import]
+from outputs.data_exporter import (  # type: ignore[import]
+    OUTPUT_FORMATS,
+    create_exporter_from_settings,
+)
+from outputs.trend_store import create_trend_store_from_settings  # type: ignore[import]
+
+logger = logging.getLogger(__name__)
+
+JOB_COMMANDS = ("trends", "statuses", "timeline", "search")
+
+# Same defaults as the CLI subcommands.
+DEFAULT_LIMITS = {"trends": 20, "statuses": 40, "timeline": 40, "search": 20}
+
+# job_id becomes part of the output filename.
+JOB_ID_PATTERN = re.compile(r"[A-Za-z0-9_.-]+")
+
+@dataclass
+class JobSpec:
+    """
+    One unit of work with the same semantics as the matching CLI subcommand.
+    """
+
+    job_id: str
+    command: str
+    username: Optional[str] = None
+    tag: Optional[str] = None
+    query: Optional[str] = None
+    type: str = "statuses"
+    from_id: Optional[str] = None
+    limit: Optional[int] = None
+    format: str = "json"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], default_id: str) -> "JobSpec":
+        """
+        Build and validate a JobSpec from a parsed JSON object.
+        """
+        command = data.get("command")
+        if command not in JOB_COMMANDS:
+            raise ValueError(f"Unknown job command: {command!r}")
+        spec = cls(
+            job_id=str(data.get("job_id") or data.get("id") or default_id),
+            command=command,
+            username=data.get("username"),
+            tag=data.get("tag"),
+            query=data.get("query"),
+            type=data.get("type", "statuses"),
+            from_id=data.get("from_id"),
+            limit=data.get("limit"),
+            format=data.get("format", "json"),
+        )
+        if not JOB_ID_PATTERN.fullmatch(spec.job_id):
+            raise ValueError(
+                f"Invalid job_id {spec.job_id!r}; expected letters, digits, '_', '.' or '-'"
+            )
+        required = {"statuses": "username", "timeline": "tag", "search": "query"}.get(command)
+        if required and not getattr(spec, required):
+            raise ValueError(f"Job {spec.job_id!r} ({command}) requires {required!r}")
+        if spec.type not in SEARCH_TYPES:
+            raise ValueError(f"Job {spec.job_id!r} has unknown search type {spec.type!r}")
+        if spec.limit is not None and not isinstance(spec.limit, int):
+            raise ValueError(f"Job {spec.job_id!r} has non-integer limit {spec.limit!r}")
+        if spec.format not in OUTPUT_FORMATS:
+            raise ValueError(f"Job {spec.job_id!r} has unknown format {spec.format!r}")
+        if spec.format == "sqlite" and (
+            command == "trends" or (command == "search" and spec.type != "statuses")
+        ):
+            raise ValueError(
+                f"Job {spec.job_id!r}: format 'sqlite' stores statuses only, "
+                f"not {command if command == 'trends' else spec.type}"
+            )
+        return spec
+
+@dataclass
+class JobResult:
+    job_id: str
+    command: str
+    ok: bool
+    output_path: Optional[str] = None
+    records: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+
+def load_jobs(path: str) -> List[JobSpec]:
+    """
+    Parse a JSONL jobs file; blank lines and lines starting with '#' are skipped.
+
+    :param path: Path to the jobs file.
+    :return: List of validated job specs.
+    """
+    jobs: List[JobSpec] = []
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as exc:
+                raise ValueError(f"{path}:{line_no}: invalid JSON: {exc}") from exc
+            if not isinstance(data, dict):
+                raise ValueError(f"{path}:{line_no}: job must be a JSON object")
+            jobs.append(JobSpec.from_dict(data, default_id=f"job{line_no}"))
+    return jobs
+
+class _Counter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def count_records(self, records: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        for record in records:
+            self.count += 1
+            yield record
+
+class JobRunner:
+    """
+    Runs jobs against one shared MastodonClient, exporter and state stores.
+
+    The client's connection pool is sized to the worker count so every
+    worker thread reuses the same keep-alive connections.
+    """
+
+    def __init__(self, settings: Dict[str, Any], workers: int = 4) -> None:
+        self.settings = settings
+        self.workers = max(1, int(workers))
+        self.instance = settings["base_url"].rstrip("/")
+        self.client = create_client_from_settings(settings)
+        self.client.set_pool_size(self.workers)
+        self.exporter = create_exporter_from_settings(settings)
+        self.account_cache = create_account_cache_from_settings(settings)
+        checkpoint_path = settings.get("checkpoint_path")
+        self.checkpoints = CheckpointStore(checkpoint_path) if checkpoint_path else None
+        self.trend_store = create_trend_store_from_settings(settings)
+        # Shared by all jobs, so its context cache carries over between them.
+        self.thread_expander = create_thread_expander_from_settings(settings, self.client)
+
+    def run_job(self, job: JobSpec) -> JobResult:
+        """
+        Run a single job, capturing any failure in the returned JobResult.
+        """
+        started = time.monotonic()
+        counter = _Counter()
+        try:
+            output_path = self._dispatch(job, counter)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Job %s (%s) failed: %s", job.job_id, job.command, exc)
+            return JobResult(
+                job_id=job.job_id,
+                command=job.command,
+                ok=False,
+                records=counter.count,
+                duration=time.monotonic() - started,
+                error=str(exc),
+            )
+        logger.info(
+            "Job %s (%s) wrote %d records to %s",
+            job.job_id,
+            job.command,
+            counter.count,
+            output_path,
+        )
+        return JobResult(
+            job_id=job.job_id,
+            command=job.command,
+            ok=True,
+            output_path=output_path,
+            records=counter.count,
+            duration=time.monotonic() - started,
+        )
+
+    def run_batch(self, jobs: List[JobSpec]) -> List[JobResult]:
+        """
+        Run jobs on the worker pool; results are returned in job order.
+        """
+        logger.info("Running %d jobs on %d workers", len(jobs), self.workers)
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="mastodon-job"
+        ) as pool:
+            return list(pool.map(self.run_job, jobs))
+
+    def write_summary(self, results: List[JobResult]) -> str:
+        return self.exporter.export_json((asdict(r) for r in results), "batch_summary")
+
+    def close(self) -> None:
+        self.client.close()
+        if self.account_cache is not None:
+            self.account_cache.close()
+        if self.trend_store is not None:
+            self.trend_store.close()
+        self.exporter.close()
+
+    def _export(self, job: JobSpec, records: Iterable[Dict[str, Any]], counter: _Counter) -> str:
+        prefix = f"{job.command}_{job.job_id}"
+        return self.exporter.export(counter.count_records(records), prefix, job.format)
+
+    def _dispatch(self, job: JobSpec, counter: _Counter) -> str:
+        records, finish = self.job_records(job)
+        output_path = self._export(job, records, counter)
+        finish()
+        return output_path
+
+    def job_records(
+        self, job: JobSpec
+    ) -> Tuple[Iterable[Dict[str, Any]], Callable[[], None]]:
+        """
+        Build the record stream of a job without exporting it.
+
+        :param job: Validated job spec.
+        :return: (records, finish); call finish() once every record was
+            consumed to commit checkpoints and trend history.
+        """
+        limit: Optional[int] = DEFAULT_LIMITS[job.command] if job.limit is None else job.limit
+
+        if job.command == "trends":
+            trends = TrendsExtractor(self.client).fetch_trends(limit=limit)
+
+            def finish_trends() -> None:
+                if self.trend_store is not None:
+                    self.trend_store.merge(trends, self.client.host)
+
+            return trends, finish_trends
+
+        if job.command == "search":
+            records = SearchHandler(self.client).iter_search(job.query, job.type, limit=limit)
+            if job.type == "statuses":
+                records = self._expand_threads(records)
+            return records, lambda: None
+
+        # Paginated commands: a limit of 0 means "all pages", as on the CLI.
+        if limit is not None and limit <= 0:
+            limit = None
+
+        if job.command == "statuses":
+            endpoint, key = "statuses", normalize_username(job.username or "")
+        else:
+            endpoint, key = "timeline", (job.tag or "").lstrip("#").lower()
+
+        min_id: Optional[str] = None
+        if self.checkpoints is not None and not job.from_id:
+            min_id = self.checkpoints.get(self.instance, endpoint, key)
+
+        mark = HighWaterMark()
+        # Fetch errors fail the job instead of ending it early with ok=True.
+        if job.command == "statuses":
+            extractor = StatusesExtractor(self.client, self.account_cache)
+            records = extractor.iter_statuses(
+                job.username or "",
+                from_id=job.from_id,
+                limit=limit,
+                min_id=min_id,
+                raise_errors=True,
+            )
+        else:
+            records = TimelineExtractor(self.client).iter_timeline(
+                job.tag or "",
+                from_id=job.from_id,
+                limit=limit,
+                min_id=min_id,
+                raise_errors=True,
+            )
+
+        def finish_paginated() -> None:
+            if self.checkpoints is not None:
+                self.checkpoints.commit_marks(self.instance, endpoint, {key: mark})
+
+        return self._expand_threads(mark.track(records)), finish_paginated
+
+    def _expand_threads(self, records: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        if self.thread_expander is None:
+            return records
+        return self.thread_expander.expand(records)
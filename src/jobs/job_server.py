@@ -0,0 +1,224 @@
+import itertools
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Generator, Optional, Tuple
+
+from extractors.metrics import METRICS  # type: ignore[import]
+from extractors.utils_parser import DEFAULT_SETTINGS  # type: ignore[import]
+
+from .job_runner import JobRunner, JobSpec
+
+logger = logging.getLogger(__name__)
+
+# Largest accepted request body; jobs are small JSON objects.
+MAX_BODY_BYTES = 1024 * 1024
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self) -> Tuple[Any, Tuple[str, int]]:
+        request, _address = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address.
+        return request, ("unix", 0)
+
+class JobServer:
+    """
+    Resident job API on top of one long-lived JobRunner.
+
+    The runner's MastodonClient, connection pool, caches and state stores
+    stay warm between jobs, so callers skip interpreter startup, imports and
+    TLS handshakes. Jobs are the JSON objects of a batch jobs file:
+
+    * POST /jobs runs a job, exports it like `batch` and returns its JobResult.
+    * POST /jobs/stream runs a job and streams its records back as NDJSON
+      instead of writing a file; checkpoints are committed once the whole
+      stream was sent.
+    * GET /health and GET /metrics (Prometheus text format).
+
+    At most `workers` jobs run at once; further requests wait for a slot.
+    """
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: Optional[str] = None,
+    ) -> None:
+        self.runner = runner
+        self.socket_path = socket_path or None
+        self.started_at = time.time()
+        self.jobs_run = 0
+        self._slots = threading.BoundedSemaphore(runner.workers)
+        self._ids = itertools.count(1)
+        handler = self._make_handler()
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self._server: socketserver.BaseServer = _UnixHTTPServer(self.socket_path, handler)
+            os.chmod(self.socket_path, 0o600)
+            self.address = f"unix:{self.socket_path}"
+        else:
+            httpd = ThreadingHTTPServer((host, port), handler)
+            httpd.daemon_threads = True
+            self._server = httpd
+            self.address = f"http://{host}:{httpd.server_port}"
+
+    def serve_forever(self) -> None:
+        logger.info("Serving jobs on %s with %d workers", self.address, self.runner.workers)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self) -> None:
+        """
+        Stop serve_forever from another thread (or a signal handler).
+        """
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def parse_job(self, body: bytes) -> JobSpec:
+        try:
+            data = json.loads(body or b"null")
+        except ValueError as exc:
+            raise ValueError(f"Invalid JSON: {exc}") from exc
+        if not isinstance(data, dict):
+            raise ValueError("Job must be a JSON object")
+        return JobSpec.from_dict(data, default_id=f"serve{next(self._ids)}")
+
+    def run_job(self, job: JobSpec) -> Dict[str, Any]:
+        with self._slots:
+            result = self.runner.run_job(job)
+            self.jobs_run += 1
+        return asdict(result)
+
+    def stream_job(self, job: JobSpec) -> Generator[Dict[str, Any], None, None]:
+        """
+        Yield a job's records, holding a worker slot until the stream ends.
+        """
+        with self._slots:
+            records, finish = self.runner.job_records(job)
+            processor = self.runner.exporter.processor
+            if processor is not None:
+                records = processor.process(records)
+            for record in records:
+                yield dict(record)
+            finish()
+            self.jobs_run += 1
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "instance": self.runner.instance,
+            "workers": self.runner.workers,
+            "jobs_run": self.jobs_run,
+            "uptime": round(time.time() - self.started_at, 3),
+        }
+
+    def _make_handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            server_version = "MastodonJobServer/1.0"
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                logger.debug("%s %s", self.address_string(), format % args)
+
+            def _send(self, status: int, body: bytes, content_type: str) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, status: int, payload: Any) -> None:
+                self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY_BYTES:
+                    raise ValueError(f"Request body larger than {MAX_BODY_BYTES} bytes")
+                return self.rfile.read(length) if length > 0 else b""
+
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path == "/health":
+                    self._send_json(200, server.health())
+                elif self.path == "/metrics":
+                    self._send(
+                        200,
+                        METRICS.render_prometheus().encode("utf-8"),
+                        "text/plain; version=0.0.4",
+                    )
+                else:
+                    self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+            def do_POST(self) -> None:  # noqa: N802
+                if self.path not in ("/jobs", "/jobs/stream"):
+                    self._send_json(404, {"error": f"Unknown path {self.path}"})
+                    return
+                try:
+                    job = server.parse_job(self._read_body())
+                except ValueError as exc:
+                    self._send_json(400, {"error": str(exc)})
+                    return
+                if self.path == "/jobs":
+                    result = server.run_job(job)
+                    self._send_json(200 if result["ok"] else 500, result)
+                else:
+                    self._stream(job)
+
+            def _stream(self, job: JobSpec) -> None:
+                # No Content-Length: the body runs until the connection closes.
+                self.close_connection = True
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                count = 0
+                records = server.stream_job(job)
+                try:
+                    for record in records:
+                        self.wfile.write(json.dumps(record, default=str).encode("utf-8") + b"\n")
+                        count += 1
+                except (BrokenPipeError, ConnectionResetError):
+                    logger.warning(
+                        "Client went away during job %s after %d records", job.job_id, count
+                    )
+                    return
+                except Exception as exc:  # noqa: BLE001
+                    logger.error("Job %s (%s) failed: %s", job.job_id, job.command, exc)
+                    # Errors after the headers went out travel in-band as the last line.
+                    self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8") + b"\n")
+                    return
+                finally:
+                    # Frees the worker slot right away if the stream stopped early.
+                    records.close()
+                logger.info("Job %s (%s) streamed %d records", job.job_id, job.command, count)
+
+        return Handler
+
+def create_job_server_from_settings(
+    settings: Dict[str, Any], workers: Optional[int] = None
+) -> JobServer:
+    """
+    Build a JobServer (and its JobRunner) from settings dictionary.
+    """
+    runner = JobRunner(
+        settings,
+        workers=workers or int(settings.get("serve_workers", DEFAULT_SETTINGS["serve_workers"])),
+    )
+    return JobServer(
+        runner,
+        host=settings.get("serve_host") or DEFAULT_SETTINGS["serve_host"],
+        port=int(settings.get("serve_port", DEFAULT_SETTINGS["serve_port"])),
+        socket_path=settings.get("serve_socket") or None,
+    )
@@ -1,8 +1,13 @@
 import argparse
+import asyncio
+import json
 import logging
+import signal
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
 
 # Ensure src/ is on sys.path so "extractors" and "outputs" can be imported
 CURRENT_FILE = Path(__file__).resolve()
@@ -12,14 +17,59 @@ if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
 from extractors.utils_parser import (  # type: ignore[import]
+    MastodonClient,
     load_settings,
     create_client_from_settings,
 )
 from extractors.trends_extractor import TrendsExtractor  # type: ignore[import]
 from extractors.statuses_extractor import StatusesExtractor  # type: ignore[import]
+from extractors.account_cache import (  # type: ignore[import]
+    create_account_cache_from_settings,
+    normalize_username,
+)
 from extractors.timeline_extractor import TimelineExtractor  # type: ignore[import]
-from extractors.search_handler import SearchHandler  # type: ignore[import]
-from outputs.data_exporter import DataExporter  # type: ignore[import]
+from extractors.search_handler import SEARCH_TYPES, SearchHandler  # type: ignore[import]
+from extractors.metrics import METRICS  # type: ignore[import]
+from extractors.fanout import (  # type: ignore[import]
+    FanOutExtractor,
+    create_fanout_from_settings,
+    instance_settings,
+)
+from extractors.stream_extractor import (  # type: ignore[import]
+    STREAM_PATHS,
+    create_stream_extractor_from_settings,
+)
+from extractors.graph_crawler import (  # type: ignore[import]
+    GRAPH_DIRECTIONS,
+    create_graph_crawler_from_settings,
+)
+from extractors.thread_expander import (  # type: ignore[import]
+    create_thread_expander_from_settings,
+)
+from extractors.response_archive import ResponseArchive  # type: ignore[import]
+from extractors.replay import REPLAY_KINDS, ArchiveReplayer  # type: ignore[import]
+from extractors.async_client import (  # type: ignore[import]
+    AsyncMastodonClient,
+    create_async_client_from_settings,
+)
+from extractors.async_extractors import (  # type: ignore[import]
+    AsyncSearchHandler,
+    AsyncStatusesExtractor,
+    AsyncTimelineExtractor,
+)
+from outputs.data_exporter import (  # type: ignore[import]
+    OUTPUT_FORMATS,
+    create_exporter_from_settings,
+)
+from outputs.trend_store import (  # type: ignore[import]
+    RANK_BY,
+    WINDOWS,
+    create_trend_store_from_settings,
+)
+from outputs.query_index import create_query_index_from_settings  # type: ignore[import]
+from outputs.checkpoint_store import CheckpointStore, HighWaterMark  # type: ignore[import]
+from jobs.job_runner import JobRunner, load_jobs  # type: ignore[import]
+from jobs.job_server import create_job_server_from_settings  # type: ignore[import]
 
 def _configure_logging(level_name: str) -> None:
     level = getattr(logging, level_name.upper(), logging.INFO)
@@ -28,75 +78,558 @@ def _configure_logging(level_name: str) -> None:
         format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
     )
 
+def _run_fanout(
+    settings: Dict[str, Any],
+    fetch: Callable[[FanOutExtractor], Awaitable[List[Dict[str, Any]]]],
+) -> List[Dict[str, Any]]:
+    """
+    Run a fetch across all configured instances, one client per host.
+    """
+
+    async def _main() -> List[Dict[str, Any]]:
+        fanout = create_fanout_from_settings(settings)
+        try:
+            return await fetch(fanout)
+        finally:
+            fanout.close()
+
+    return asyncio.run(_main())
+
 def run_trends(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
     logger = logging.getLogger("Mastodon.trends")
-    client = create_client_from_settings(settings)
-    exporter = DataExporter(settings["output_dir"])
 
-    extractor = TrendsExtractor(client)
-    records: List[Dict[str, Any]] = extractor.fetch_trends(limit=args.limit)
+    records: List[Dict[str, Any]]
+    if settings.get("instances"):
+        records = _run_fanout(settings, lambda fanout: fanout.fetch_trends(limit=args.limit))
+    else:
+        extractor = TrendsExtractor(create_client_from_settings(settings))
+        records = extractor.fetch_trends(limit=args.limit)
 
-    output_path = exporter.export_json(records, "trends")
+    exporter = create_exporter_from_settings(settings)
+    try:
+        output_path = exporter.export(records, "trends", args.format)
+    finally:
+        exporter.close()
+    trend_store = create_trend_store_from_settings(settings)
+    if trend_store is not None:
+        try:
+            trend_store.merge(records, urlsplit(settings["base_url"]).netloc)
+        finally:
+            trend_store.close()
     logger.info("Fetched %d trend records", len(records))
     logger.info("Output saved to %s", output_path)
 
+def run_rising(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
+    trend_store = create_trend_store_from_settings(settings)
+    if trend_store is None:
+        raise SystemExit("rising: set trend_store_path and collect trends first")
+    try:
+        rows = trend_store.rising(
+            window=args.window, limit=args.limit, instance=args.host, by=args.by
+        )
+    finally:
+        trend_store.close()
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+
+def _limit_arg(limit: int) -> Optional[int]:
+    return limit if limit > 0 else None
+
+def _run_concurrently(
+    settings: Dict[str, Any],
+    fetch: Callable[[AsyncMastodonClient], Awaitable[Dict[str, List[Dict[str, Any]]]]],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Run a multi-target fetch on a shared AsyncMastodonClient.
+    """
+
+    async def _main() -> Dict[str, List[Dict[str, Any]]]:
+        client = create_async_client_from_settings(settings)
+        try:
+            return await fetch(client)
+        finally:
+            client.close()
+
+    return asyncio.run(_main())
+
+def _flatten(results: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    return [record for records in results.values() for record in records]
+
+def _open_checkpoints(settings: Dict[str, Any]) -> Optional[CheckpointStore]:
+    path = settings.get("checkpoint_path")
+    return CheckpointStore(path) if path else None
+
+def _expand_threads(
+    settings: Dict[str, Any], client: MastodonClient, records: Iterable[Dict[str, Any]]
+) -> Iterable[Dict[str, Any]]:
+    # Applied after checkpoint tracking: thread statuses must not move the marks.
+    expander = create_thread_expander_from_settings(settings, client)
+    return records if expander is None else expander.expand(records)
+
 def run_statuses(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
     logger = logging.getLogger("Mastodon.statuses")
-    client = create_client_from_settings(settings)
-    exporter = DataExporter(settings["output_dir"])
+    limit = _limit_arg(args.limit)
+    account_cache = create_account_cache_from_settings(settings)
+    checkpoints = _open_checkpoints(settings)
 
-    extractor = StatusesExtractor(client)
-    records: List[Dict[str, Any]] = extractor.fetch_statuses(
-        username=args.username,
-        from_id=args.from_id,
-        limit=args.limit,
-    )
+    keys = {username: normalize_username(username) for username in args.username}
+    # An explicit --from-id takes precedence over stored checkpoints.
+    min_ids: Dict[str, str] = {}
+    if checkpoints is not None and not args.from_id:
+        min_ids = checkpoints.resume_ids(settings["base_url"].rstrip("/"), "statuses", keys)
+    marks = {key: HighWaterMark() for key in keys.values()}
 
-    output_path = exporter.export_json(records, "statuses")
-    logger.info("Fetched %d status records for username=%s", len(records), args.username)
+    # Shared by the single-user extractor and thread expansion; closed with the run.
+    client = create_client_from_settings(settings)
+    records: Iterable[Dict[str, Any]]
+    if len(args.username) > 1:
+        results = _run_concurrently(
+            settings,
+            lambda client: AsyncStatusesExtractor(client, account_cache).fetch_many(
+                args.username, from_id=args.from_id, limit=limit, min_ids=min_ids
+            ),
+        )
+        for username, user_records in results.items():
+            for record in user_records:
+                marks[keys[username]].observe(record.get("status_id"))
+        records = _flatten(results)
+    else:
+        username = args.username[0]
+        extractor = StatusesExtractor(client, account_cache)
+        records = marks[keys[username]].track(
+            extractor.iter_statuses(
+                username=username,
+                from_id=args.from_id,
+                limit=limit,
+                min_id=min_ids.get(username),
+            )
+        )
+
+    exporter = create_exporter_from_settings(settings)
+    try:
+        output_path = exporter.export(
+            _expand_threads(settings, client, records), "statuses", args.format
+        )
+    finally:
+        exporter.close()
+        client.close()
+    if checkpoints is not None:
+        checkpoints.commit_marks(settings["base_url"].rstrip("/"), "statuses", marks)
+    logger.info("Fetched statuses for username(s)=%s", ", ".join(args.username))
     logger.info("Output saved to %s", output_path)
 
 def run_timeline(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
     logger = logging.getLogger("Mastodon.timeline")
+    limit = _limit_arg(args.limit)
+    checkpoints = _open_checkpoints(settings)
+
+    tags = list(dict.fromkeys(tag.lstrip("#") for tag in args.tag))
+    keys = {tag: tag.lower() for tag in tags}
+    if settings.get("instances"):
+        _run_timeline_fanout(args, settings, tags, keys, checkpoints)
+        return
+
+    min_ids: Dict[str, str] = {}
+    if checkpoints is not None and not args.from_id:
+        min_ids = checkpoints.resume_ids(settings["base_url"].rstrip("/"), "timeline", keys)
+    marks = {key: HighWaterMark() for key in keys.values()}
+
+    # Shared by the single-tag extractor and thread expansion; closed with the run.
     client = create_client_from_settings(settings)
-    exporter = DataExporter(settings["output_dir"])
+    records: Iterable[Dict[str, Any]]
+    if len(tags) > 1:
+        results = _run_concurrently(
+            settings,
+            lambda client: AsyncTimelineExtractor(client).fetch_many(
+                tags, from_id=args.from_id, limit=limit, min_ids=min_ids
+            ),
+        )
+        for tag, tag_records in results.items():
+            for record in tag_records:
+                marks[keys[tag]].observe(record.get("status_id"))
+        records = _flatten(results)
+    else:
+        tag = tags[0]
+        extractor = TimelineExtractor(client)
+        records = marks[keys[tag]].track(
+            extractor.iter_timeline(
+                tag=tag,
+                from_id=args.from_id,
+                limit=limit,
+                min_id=min_ids.get(tag),
+            )
+        )
+
+    exporter = create_exporter_from_settings(settings)
+    try:
+        output_path = exporter.export(
+            _expand_threads(settings, client, records), "timeline", args.format
+        )
+    finally:
+        exporter.close()
+        client.close()
+    if checkpoints is not None:
+        checkpoints.commit_marks(settings["base_url"].rstrip("/"), "timeline", marks)
+    logger.info("Fetched timeline for tag(s)=%s", ", ".join(tags))
+    logger.info("Output saved to %s", output_path)
+
+def _run_timeline_fanout(
+    args: argparse.Namespace,
+    settings: Dict[str, Any],
+    tags: List[str],
+    keys: Dict[str, str],
+    checkpoints: Optional[CheckpointStore],
+) -> None:
+    logger = logging.getLogger("Mastodon.timeline")
+    limit = _limit_arg(args.limit)
 
-    extractor = TimelineExtractor(client)
-    records: List[Dict[str, Any]] = extractor.fetch_timeline(
-        tag=args.tag,
-        from_id=args.from_id,
-        limit=args.limit,
+    # Status IDs are per instance, so checkpoints are too.
+    base_urls = {
+        urlsplit(instance["base_url"]).netloc: instance["base_url"]
+        for instance in instance_settings(settings)
+    }
+    min_ids: Dict[str, Dict[str, str]] = {}
+    if checkpoints is not None and not args.from_id:
+        min_ids = {
+            host: checkpoints.resume_ids(base_url, "timeline", keys)
+            for host, base_url in base_urls.items()
+        }
+    marks = {host: {key: HighWaterMark() for key in keys.values()} for host in base_urls}
+
+    records = _run_fanout(
+        settings,
+        lambda fanout: fanout.fetch_timeline(
+            tags, from_id=args.from_id, limit=limit, min_ids=min_ids
+        ),
     )
+    for record in records:
+        marks[record["instance"]][keys[record["tag"]]].observe(record.get("status_id"))
 
-    output_path = exporter.export_json(records, "timeline")
-    logger.info("Fetched %d timeline records for tag=%s", len(records), args.tag)
+    exporter = create_exporter_from_settings(settings)
+    try:
+        output_path = exporter.export(records, "timeline", args.format)
+    finally:
+        exporter.close()
+    if checkpoints is not None:
+        for host, base_url in base_urls.items():
+            checkpoints.commit_marks(base_url, "timeline", marks[host])
+    logger.info(
+        "Fetched timeline for tag(s)=%s from %d instances", ", ".join(tags), len(base_urls)
+    )
     logger.info("Output saved to %s", output_path)
 
+def _load_queries(path: str) -> List[str]:
+    """
+    Read one search query per line; blank lines and "#" comments are skipped.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")
+        ]
+
 def run_search(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
     logger = logging.getLogger("Mastodon.search")
+    queries = list(args.query or [])
+    if args.query_file:
+        queries.extend(_load_queries(args.query_file))
+    queries = list(dict.fromkeys(queries))
+    if not queries:
+        raise SystemExit("search: give at least one --query or a non-empty --query-file")
+    if args.format == "sqlite" and args.type != "statuses":
+        raise SystemExit("search: --format sqlite stores statuses only; use --type statuses")
+
+    # Shared by the single-query handler and thread expansion; closed with the run.
     client = create_client_from_settings(settings)
-    exporter = DataExporter(settings["output_dir"])
+    # Result type -> records; "all" yields one output per type.
+    results: Dict[str, Iterable[Dict[str, Any]]]
+    if settings.get("instances"):
+        results = _run_fanout(
+            settings,
+            lambda fanout: fanout.search(queries, search_type=args.type, limit=args.limit),
+        )
+    elif len(queries) > 1:
+        per_query = _run_concurrently(
+            settings,
+            lambda client: AsyncSearchHandler(client).search_many(
+                queries, search_type=args.type, limit=args.limit
+            ),
+        )
+        results = {
+            result_type: [
+                record for grouped in per_query.values() for record in grouped[result_type]
+            ]
+            for result_type in (SEARCH_TYPES if args.type == "all" else (args.type,))
+        }
+    else:
+        handler = SearchHandler(client)
+        if args.type == "all":
+            results = handler.search(queries[0], "all", limit=args.limit)
+        else:
+            # Streams page by page, so large limits use constant memory.
+            results = {args.type: handler.iter_search(queries[0], args.type, limit=args.limit)}
 
-    handler = SearchHandler(client)
+    if "statuses" in results and not settings.get("instances"):
+        results["statuses"] = _expand_threads(settings, client, results["statuses"])
+    exporter = create_exporter_from_settings(settings)
+    try:
+        for result_type, records in results.items():
+            output_path = exporter.export(records, f"search_{result_type}", args.format)
+            logger.info(
+                "Fetched %s search results for %d queries; output saved to %s",
+                result_type,
+                len(queries),
+                output_path,
+            )
+    finally:
+        exporter.close()
+        client.close()
 
-    if args.type == "accounts":
-        records = handler.search_accounts(args.query, limit=args.limit)
-        prefix = "search_accounts"
-    elif args.type == "hashtags":
-        records = handler.search_hashtags(args.query, limit=args.limit)
-        prefix = "search_hashtags"
-    else:
-        records = handler.search_statuses(args.query, limit=args.limit)
-        prefix = "search_statuses"
+def run_stream(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
+    logger = logging.getLogger("Mastodon.stream")
+    if args.stream == "hashtag" and not args.tag:
+        raise SystemExit("stream: --tag is required for the hashtag stream")
+    checkpoints = _open_checkpoints(settings)
 
-    output_path = exporter.export_json(records, prefix)
-    logger.info(
-        "Fetched %d search records for type=%s query=%r",
-        len(records),
-        args.type,
-        args.query,
+    instance = settings["base_url"].rstrip("/")
+    tag = args.tag.lstrip("#") if args.stream == "hashtag" else None
+    key = f"{args.stream}:{tag.lower()}" if tag else args.stream
+    since_id = args.from_id
+    if checkpoints is not None and not since_id:
+        since_id = checkpoints.resume_ids(instance, "stream", {key: key}).get(key)
+
+    extractor = create_stream_extractor_from_settings(
+        settings, args.stream, tag=tag, since_id=since_id
     )
+    mark = HighWaterMark()
+
+    def _request_stop(signum: int, frame: Any) -> None:
+        logger.info("Received signal %d, finishing the stream", signum)
+        extractor.stop()
+
+    exporter = create_exporter_from_settings(settings)
+    # Stop cleanly on Ctrl-C / SIGTERM so the sink commits what was received.
+    previous = {sig: signal.signal(sig, _request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        output_path = exporter.export(
+            mark.track(
+                extractor.iter_records(
+                    max_records=_limit_arg(args.max_records),
+                    duration=args.duration or None,
+                )
+            ),
+            "stream_" + args.stream.replace(":", "_"),
+            args.format,
+        )
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        extractor.client.close()
+        exporter.close()
+
+    if checkpoints is not None:
+        checkpoints.commit_marks(instance, "stream", {key: mark})
+    logger.info("Streamed %s with %d reconnects", key, extractor.reconnects)
     logger.info("Output saved to %s", output_path)
+    if extractor.error:
+        sys.exit(1)
+
+def run_graph(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
+    logger = logging.getLogger("Mastodon.graph")
+    for option, key in (
+        ("direction", "graph_directions"),
+        ("max_depth", "graph_max_depth"),
+        ("max_nodes", "graph_max_nodes"),
+        ("max_edges", "graph_max_edges"),
+    ):
+        if getattr(args, option) is not None:
+            settings[key] = getattr(args, option)
+    account_cache = create_account_cache_from_settings(settings)
+    client = create_client_from_settings(settings)
+    crawler = create_graph_crawler_from_settings(
+        settings, client, account_cache=account_cache, state_path=args.state
+    )
+
+    def _request_stop(signum: int, frame: Any) -> None:
+        logger.info("Received signal %d, finishing accounts in flight", signum)
+        crawler.stop()
+
+    exporter = create_exporter_from_settings(settings)
+    # Stop cleanly on Ctrl-C / SIGTERM so the edges so far are committed and
+    # the crawl state can be saved for a resume.
+    previous = {sig: signal.signal(sig, _request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        output_path = exporter.export(crawler.crawl(args.seed), "graph", args.format)
+        # Only after the export committed, so a resume never skips lost edges.
+        crawler.save_state()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        client.close()
+        if account_cache is not None:
+            account_cache.close()
+        exporter.close()
+    logger.info(
+        "Crawled %d accounts into %d edges (%d still queued); output saved to %s",
+        crawler.expanded,
+        crawler.edges,
+        len(crawler.frontier),
+        output_path,
+    )
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    """
+    ISO 8601 date or datetime -> unix time; naive values are taken as UTC.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise SystemExit(f"Invalid time {value!r}; expected ISO 8601, e.g. 2025-01-31T12:00")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def run_replay(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
+    logger = logging.getLogger("Mastodon.replay")
+    archive_dir = args.archive_dir or settings.get("archive_dir")
+    if not archive_dir or not Path(archive_dir).is_dir():
+        raise SystemExit("replay: give --archive-dir or set archive_dir to an existing archive")
+    since, until = _parse_time(args.since), _parse_time(args.until)
+    kinds = list(dict.fromkeys(args.kind or REPLAY_KINDS))
+    # The status database only takes statuses: no trends, accounts or hashtags.
+    sqlite = args.format == "sqlite"
+    if sqlite:
+        if args.kind and "trends" in kinds:
+            raise SystemExit("replay: --format sqlite stores statuses only; drop --kind trends")
+        kinds = [kind for kind in kinds if kind != "trends"]
+    exporter = create_exporter_from_settings(settings)
+    replayer = ArchiveReplayer(ResponseArchive(archive_dir))
+
+    try:
+        for kind in kinds:
+            # Search bodies hold three result types; each becomes its own output.
+            if kind == "search":
+                types = ("statuses",) if sqlite else SEARCH_TYPES
+                outputs = [(t, f"search_{t}") for t in types]
+            else:
+                outputs = [("statuses", kind)]
+            for search_type, name in outputs:
+                output_path = exporter.export(
+                    replayer.iter_records(
+                        kind, since=since, until=until, host=args.host, search_type=search_type
+                    ),
+                    f"replay_{name}",
+                    args.format,
+                )
+                logger.info(
+                    "Replayed %s from %s; output saved to %s", name, archive_dir, output_path
+                )
+    finally:
+        exporter.close()
+
+def run_query(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
+    logger = logging.getLogger("Mastodon.query")
+    index = create_query_index_from_settings(settings)
+    try:
+        if not args.no_sync:
+            added = index.sync(settings["output_dir"])
+            if added:
+                logger.info("Indexed %d new records from %s", added, settings["output_dir"])
+        filters = dict(
+            tags=args.tag,
+            users=args.user,
+            terms=args.term,
+            since=_parse_time(args.since),
+            until=_parse_time(args.until),
+            limit=args.limit or None,
+            newest_first=args.newest_first,
+            all_copies=args.all_copies,
+        )
+        if args.count:
+            print(len(index.search(**filters)))
+            return
+        count = 0
+        for record in index.iter_records(**filters):
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+        sys.stdout.flush()
+        logger.info("Query returned %d records", count)
+    except BrokenPipeError:
+        # The reader (e.g. `head`) went away; stop quietly.
+        sys.stdout = None  # type: ignore[assignment]
+    finally:
+        index.close()
+
+def run_batch(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
+    logger = logging.getLogger("Mastodon.batch")
+    jobs = load_jobs(args.jobs)
+    workers = args.workers or int(settings.get("batch_workers", 4))
+
+    runner = JobRunner(settings, workers=workers)
+    try:
+        results = runner.run_batch(jobs)
+        summary_path = runner.write_summary(results)
+    finally:
+        runner.close()
+
+    failed = [result for result in results if not result.ok]
+    for result in results:
+        if result.ok:
+            logger.info(
+                "[ok]     %s %s: %d records -> %s",
+                result.job_id,
+                result.command,
+                result.records,
+                result.output_path,
+            )
+        else:
+            logger.error("[failed] %s %s: %s", result.job_id, result.command, result.error)
+    logger.info(
+        "Batch finished: %d succeeded, %d failed; summary saved to %s",
+        len(results) - len(failed),
+        len(failed),
+        summary_path,
+    )
+    if failed:
+        sys.exit(1)
+
+def run_serve(args: argparse.Namespace, settings: Dict[str, Any]) -> None:
+    logger = logging.getLogger("Mastodon.serve")
+    if args.host is not None:
+        settings["serve_host"] = args.host
+    if args.port is not None:
+        settings["serve_port"] = args.port
+    if args.socket is not None:
+        settings["serve_socket"] = args.socket
+    server = create_job_server_from_settings(settings, workers=args.workers)
+
+    def _request_stop(signum: int, frame: Any) -> None:
+        logger.info("Received signal %d, shutting down", signum)
+        server.shutdown()
+
+    previous = {sig: signal.signal(sig, _request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        server.serve_forever()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        server.runner.close()
+    logger.info("Served %d jobs", server.jobs_run)
+
+def _add_format_argument(
+    parser: argparse.ArgumentParser,
+    default: str = "json",
+    formats: Iterable[str] = OUTPUT_FORMATS,
+) -> None:
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=list(formats),
+        default=default,
+        help="Output format; ndjson streams pages to disk as they arrive, sqlite "
+        f"upserts statuses into the shared database by status_id (default: {default})",
+    )
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -109,6 +642,65 @@ def build_parser() -> argparse.ArgumentParser:
         help="Path to JSON settings file (default: src/config/settings.example.json)",
     )
 
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Maximum concurrent requests for multi-target runs (default: from settings)",
+    )
+
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default=None,
+        help="Write request/normalize/export metrics here at the end of the run; "
+        "a .prom path gets the Prometheus textfile format, anything else JSON "
+        "(default: metrics_path setting)",
+    )
+
+    parser.add_argument(
+        "--process-content",
+        action="store_true",
+        default=None,
+        help="Extract plain text, hashtags, mentions, links and a language hint "
+        "from status HTML on a process pool before exporting "
+        "(default: content_processing setting)",
+    )
+
+    parser.add_argument(
+        "--media-dir",
+        type=str,
+        default=None,
+        help="Download media attachments into this directory and add their "
+        "local paths to the records as media_paths (default: media_dir setting)",
+    )
+
+    parser.add_argument(
+        "--expand-threads",
+        action="store_true",
+        default=None,
+        help="Add the conversation (ancestors and replies) of statuses that have "
+        "replies to statuses/timeline/search outputs (default: thread_expansion setting)",
+    )
+
+    parser.add_argument(
+        "--index-exports",
+        action="store_true",
+        default=None,
+        help="Add every JSON/NDJSON export to the query index as it is written, "
+        "so `query` has nothing to catch up on (default: query_indexing setting)",
+    )
+
+    parser.add_argument(
+        "--instance",
+        type=str,
+        action="append",
+        default=None,
+        help="Fan trends/timeline/search out over this instance (base URL or "
+        "hostname); repeat for several and the results are merged "
+        "(default: instances setting)",
+    )
+
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # Trends
@@ -119,69 +711,354 @@ def build_parser() -> argparse.ArgumentParser:
         default=20,
         help="Maximum number of trends to fetch (default: 20)",
     )
+    # Trends carry no status_id, so the status database does not apply.
+    _add_format_argument(p_trends, formats=("json", "ndjson"))
+
+    # Rising trends
+    p_rising = subparsers.add_parser(
+        "rising", help="Print the fastest-rising trends from the trend store as JSON lines"
+    )
+    p_rising.add_argument(
+        "--window",
+        type=str,
+        choices=list(WINDOWS),
+        default="1h",
+        help="Ranking window (default: 1h)",
+    )
+    p_rising.add_argument(
+        "--by",
+        type=str,
+        choices=list(RANK_BY),
+        default="velocity",
+        help="Rank by uses per hour or by its change against the previous window "
+        "(default: velocity)",
+    )
+    p_rising.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Number of tags to print (default: 20)",
+    )
+    p_rising.add_argument(
+        "--host",
+        type=str,
+        default=None,
+        help="Only tags trending on this instance host (default: all instances)",
+    )
 
     # Statuses
     p_statuses = subparsers.add_parser("statuses", help="Fetch user statuses")
     p_statuses.add_argument(
         "--username",
         type=str,
+        nargs="+",
         required=True,
-        help="Mastodon username (without instance domain, e.g. 'example_user')",
+        help="Mastodon username(s) (without instance domain, e.g. 'example_user'); "
+        "several usernames are fetched concurrently",
     )
     p_statuses.add_argument(
         "--from-id",
         type=str,
         default=None,
-        help="Fetch statuses since this status ID (optional)",
+        help="Fetch statuses since this status ID (optional; overrides the stored checkpoint)",
     )
     p_statuses.add_argument(
         "--limit",
         type=int,
         default=40,
-        help="Maximum number of statuses to fetch (default: 40)",
+        help="Maximum number of statuses to fetch (default: 40, 0 = all pages)",
     )
+    _add_format_argument(p_statuses)
 
     # Timeline
     p_timeline = subparsers.add_parser("timeline", help="Fetch hashtag timeline")
     p_timeline.add_argument(
         "--tag",
         type=str,
+        nargs="+",
         required=True,
-        help="Hashtag (without #, e.g. 'technology')",
+        help="Hashtag(s) (without #, e.g. 'technology'); several tags are fetched concurrently",
     )
     p_timeline.add_argument(
         "--from-id",
         type=str,
         default=None,
-        help="Fetch timeline items since this status ID (optional)",
+        help="Fetch timeline items since this status ID "
+        "(optional; overrides the stored checkpoint)",
     )
     p_timeline.add_argument(
         "--limit",
         type=int,
         default=40,
-        help="Maximum number of statuses in timeline (default: 40)",
+        help="Maximum number of statuses in timeline (default: 40, 0 = all pages)",
     )
+    _add_format_argument(p_timeline)
 
     # Search
     p_search = subparsers.add_parser("search", help="Search accounts, hashtags, or statuses")
     p_search.add_argument(
         "--query",
         type=str,
-        required=True,
-        help="Text query to search",
+        nargs="+",
+        default=None,
+        help="Text query to search; several queries are run concurrently",
+    )
+    p_search.add_argument(
+        "--query-file",
+        type=str,
+        default=None,
+        help="File with one query per line, run concurrently together with --query",
     )
     p_search.add_argument(
         "--type",
         type=str,
-        choices=["accounts", "hashtags", "statuses"],
+        choices=list(SEARCH_TYPES) + ["all"],
         default="statuses",
-        help="Search type (default: statuses)",
+        help="Search type; 'all' splits one untyped search into accounts, hashtags "
+        "and statuses outputs (default: statuses)",
     )
     p_search.add_argument(
         "--limit",
         type=int,
         default=20,
-        help="Maximum number of results (default: 20)",
+        help="Maximum number of results per type; more than 40 pages through "
+        "results with offset and needs an access token (default: 20)",
+    )
+    _add_format_argument(p_search)
+
+    # Stream
+    p_stream = subparsers.add_parser(
+        "stream", help="Ingest statuses from the streaming API until stopped"
+    )
+    p_stream.add_argument(
+        "--stream",
+        type=str,
+        choices=list(STREAM_PATHS),
+        default="hashtag",
+        help="Streaming timeline to follow (default: hashtag)",
+    )
+    p_stream.add_argument(
+        "--tag",
+        type=str,
+        default=None,
+        help="Hashtag (without #) for the hashtag stream",
+    )
+    p_stream.add_argument(
+        "--from-id",
+        type=str,
+        default=None,
+        help="Backfill statuses newer than this ID through REST before streaming "
+        "(optional; overrides the stored checkpoint)",
+    )
+    p_stream.add_argument(
+        "--max-records",
+        type=int,
+        default=0,
+        help="Stop after this many records (default: 0 = run until interrupted)",
+    )
+    p_stream.add_argument(
+        "--duration",
+        type=float,
+        default=0,
+        help="Stop after this many seconds (default: 0 = run until interrupted)",
+    )
+    _add_format_argument(p_stream, default="ndjson")
+
+    # Graph
+    p_graph = subparsers.add_parser(
+        "graph", help="Crawl the follower/following graph breadth-first from seed accounts"
+    )
+    p_graph.add_argument(
+        "--seed",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Usernames or acct handles to start the crawl from",
+    )
+    p_graph.add_argument(
+        "--direction",
+        type=str,
+        nargs="+",
+        choices=list(GRAPH_DIRECTIONS),
+        default=None,
+        help="Relationships to follow (default: graph_directions setting)",
+    )
+    p_graph.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="Expand accounts up to this many hops from the seeds (default: graph_max_depth)",
+    )
+    p_graph.add_argument(
+        "--max-nodes",
+        type=int,
+        default=None,
+        help="Stop once this many accounts were expanded in total, counting "
+        "resumed runs (default: graph_max_nodes)",
+    )
+    p_graph.add_argument(
+        "--max-edges",
+        type=int,
+        default=None,
+        help="Maximum accounts read per direction and account, 0 = all "
+        "(default: graph_max_edges)",
+    )
+    p_graph.add_argument(
+        "--state",
+        type=str,
+        default=None,
+        help="Crawl state file; saved at the end and resumed from when it exists",
+    )
+    # Edges have no status_id, so the status database does not apply.
+    _add_format_argument(p_graph, default="ndjson", formats=("json", "ndjson"))
+
+    # Replay
+    p_replay = subparsers.add_parser(
+        "replay", help="Re-normalize and export archived raw responses without the network"
+    )
+    p_replay.add_argument(
+        "--archive-dir",
+        type=str,
+        default=None,
+        help="Response archive to read (default: archive_dir setting)",
+    )
+    p_replay.add_argument(
+        "--kind",
+        type=str,
+        nargs="+",
+        choices=list(REPLAY_KINDS),
+        default=None,
+        help="Kinds of responses to replay, one output each (default: all)",
+    )
+    p_replay.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="Only responses fetched at or after this ISO 8601 time (UTC if no offset)",
+    )
+    p_replay.add_argument(
+        "--until",
+        type=str,
+        default=None,
+        help="Only responses fetched before this ISO 8601 time (UTC if no offset)",
+    )
+    p_replay.add_argument(
+        "--host",
+        type=str,
+        default=None,
+        help="Only responses from this instance host (default: every host)",
+    )
+    _add_format_argument(p_replay)
+
+    # Query
+    p_query = subparsers.add_parser(
+        "query", help="Stream exported records matching tags, users, words and a time range"
+    )
+    p_query.add_argument(
+        "--tag",
+        type=str,
+        action="append",
+        default=None,
+        help="Only records with this tag (the extraction tag, trend or a hashtag in "
+        "the content); repeat to match any of several",
+    )
+    p_query.add_argument(
+        "--user",
+        type=str,
+        action="append",
+        default=None,
+        help="Only records by this username or acct; repeat to match any of several",
+    )
+    p_query.add_argument(
+        "--term",
+        type=str,
+        action="append",
+        default=None,
+        help="Only records whose content contains every word of this text; repeatable",
+    )
+    p_query.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="Only records created at or after this ISO 8601 time (UTC if no offset)",
+    )
+    p_query.add_argument(
+        "--until",
+        type=str,
+        default=None,
+        help="Only records created before this ISO 8601 time (UTC if no offset)",
+    )
+    p_query.add_argument(
+        "--limit",
+        type=int,
+        default=0,
+        help="Maximum number of records (default: 0 = no limit)",
+    )
+    p_query.add_argument(
+        "--newest-first",
+        action="store_true",
+        help="Sort by created_at descending instead of ascending",
+    )
+    p_query.add_argument(
+        "--all-copies",
+        action="store_true",
+        help="Also return earlier exports of the same status, not just the latest one",
+    )
+    p_query.add_argument(
+        "--count",
+        action="store_true",
+        help="Print the number of matching records instead of the records",
+    )
+    p_query.add_argument(
+        "--no-sync",
+        action="store_true",
+        help="Query the index as is instead of indexing new files in output_dir first",
+    )
+
+    # Batch
+    p_batch = subparsers.add_parser(
+        "batch", help="Run a JSONL file of trends/statuses/timeline/search jobs"
+    )
+    p_batch.add_argument(
+        "--jobs",
+        type=str,
+        required=True,
+        help="Path to a JSONL jobs file, one job object per line",
+    )
+    p_batch.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of jobs to run in parallel (default: batch_workers setting)",
+    )
+
+    # Serve
+    p_serve = subparsers.add_parser(
+        "serve", help="Run a daemon accepting batch-style jobs over HTTP or a Unix socket"
+    )
+    p_serve.add_argument(
+        "--host",
+        type=str,
+        default=None,
+        help="Address to listen on (default: serve_host setting)",
+    )
+    p_serve.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="TCP port to listen on; 0 picks a free one (default: serve_port setting)",
+    )
+    p_serve.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Listen on this Unix socket instead of TCP (default: serve_socket setting)",
+    )
+    p_serve.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of jobs to run at once (default: serve_workers setting)",
     )
 
     return parser
@@ -191,18 +1068,51 @@ def main() -> None:
     args = parser.parse_args()
 
     settings = load_settings(args.config)
+    if args.concurrency is not None:
+        settings["concurrency"] = args.concurrency
+    if args.instance is not None:
+        settings["instances"] = args.instance
+    if args.metrics is not None:
+        settings["metrics_path"] = args.metrics
+    if args.media_dir is not None:
+        settings["media_dir"] = args.media_dir
+    if args.expand_threads:
+        settings["thread_expansion"] = True
+    if args.index_exports:
+        settings["query_indexing"] = True
+    if args.process_content:
+        settings["content_processing"] = True
     _configure_logging(settings.get("log_level", "INFO"))
 
-    if args.command == "trends":
-        run_trends(args, settings)
-    elif args.command == "statuses":
-        run_statuses(args, settings)
-    elif args.command == "timeline":
-        run_timeline(args, settings)
-    elif args.command == "search":
-        run_search(args, settings)
-    else:
-        parser.error(f"Unknown command: {args.command!r}")
+    try:
+        if args.command == "trends":
+            run_trends(args, settings)
+        elif args.command == "statuses":
+            run_statuses(args, settings)
+        elif args.command == "timeline":
+            run_timeline(args, settings)
+        elif args.command == "search":
+            run_search(args, settings)
+        elif args.command == "rising":
+            run_rising(args, settings)
+        elif args.command == "stream":
+            run_stream(args, settings)
+        elif args.command == "graph":
+            run_graph(args, settings)
+        elif args.command == "replay":
+            run_replay(args, settings)
+        elif args.command == "query":
+            run_query(args, settings)
+        elif args.command == "batch":
+            run_batch(args, settings)
+        elif args.command == "serve":
+            run_serve(args, settings)
+        else:
+            parser.error(f"Unknown command: {args.command!r}")
+    finally:
+        # Also on failure: the metrics of a failed run are the interesting ones.
+        if settings.get("metrics_path"):
+            METRICS.write(settings["metrics_path"])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+def status_id_key(status_id: str) -> tuple:
+    """
+    Sort key for Mastodon status IDs (numeric strings of varying length).
+    """
+    return (len(status_id), status_id)
+
+class CheckpointStore:
+    """
+    Persists the high-water-mark status ID per (instance, endpoint, target).
+
+    The whole store is a single JSON file that is rewritten atomically
+    (temp file + os.replace), so a crash leaves either the previous or the
+    new checkpoint on disk, never a partial one.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path).resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(instance: str, endpoint: str, target: str) -> str:
+        return f"{instance}|{endpoint}|{target}"
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            logger.warning("Failed to read checkpoints from %s: %s", self.path, exc)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, instance: str, endpoint: str, target: str) -> Optional[str]:
+        """
+        Return the stored high-water-mark status ID, if any.
+        """
+        with self._lock:
+            entry = self._read().get(self._key(instance, endpoint, target))
+        return entry.get("status_id") if isinstance(entry, dict) else None
+
+    def commit(self, instance: str, endpoint: str, target: str, status_id: str) -> None:
+        """
+        Advance the checkpoint to `status_id` if it is newer than the stored one.
+        """
+        key = self._key(instance, endpoint, target)
+        with self._lock:
+            data = self._read()
+            current = (data.get(key) or {}).get("status_id")
+            if current and status_id_key(current) >= status_id_key(status_id):
+                return
+            data[key] = {
+                "status_id": status_id,
+                "updated_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+            self._write(data)
+        logger.info("Checkpoint %s advanced to %s", key, status_id)
+
+    def resume_ids(
+        self, instance: str, endpoint: str, targets: Dict[str, str]
+    ) -> Dict[str, str]:
+        """
+        Look up stored high-water marks for several targets.
+
+        :param targets: Mapping of target name as requested -> checkpoint key.
+        :return: Mapping of target name -> stored status ID (targets with one only).
+        """
+        resume: Dict[str, str] = {}
+        for target, key in targets.items():
+            status_id = self.get(instance, endpoint, key)
+            if status_id:
+                resume[target] = status_id
+        return resume
+
+    def commit_marks(
+        self, instance: str, endpoint: str, marks: Dict[str, "HighWaterMark"]
+    ) -> None:
+        """
+        Commit the high-water marks collected during a run.
+        """
+        for key, mark in marks.items():
+            if mark.status_id:
+                self.commit(instance, endpoint, key, mark.status_id)
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        fd, tmp_name = tempfile.mkstemp(
+            prefix=f".{self.path.name}.", suffix=".tmp", dir=str(self.path.parent)
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+class HighWaterMark:
+    """
+    Records the newest status ID seen while records stream through it.
+    """
+
+    def __init__(self) -> None:
+        self.status_id: Optional[str] = None
+
+    def observe(self, value: Optional[str]) -> None:
+        if not isinstance(value, str) or not value:
+            return
+        if self.status_id is None or status_id_key(value) > status_id_key(self.status_id):
+            self.status_id = value
+
+    def track(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for record in records:
+            self.observe(record.get("status_id"))
+            yield record
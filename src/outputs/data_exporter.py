@@ -1,19 +1,70 @@
-import json
 import logging
+import os
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from extractors.content_processor import (  # type: ignore[import]
+    ContentProcessor,
+    create_content_processor_from_settings,
+)
+from extractors.media_downloader import (  # type: ignore[import]
+    MediaDownloader,
+    create_media_downloader_from_settings,
+)
+from extractors.metrics import (  # type: ignore[import]
+    BYTES_WRITTEN,
+    EXPORT_SECONDS,
+    EXPORT_WRITE_SECONDS,
+    RECORDS_WRITTEN,
+)
+
+from .query_index import QueryIndex, create_query_index_from_settings
+from .sinks import RecordSink
+from .sqlite_sink import SQLiteSink
 
 logger = logging.getLogger(__name__)
 
+OUTPUT_FORMATS = ("json", "ndjson", "sqlite")
+
 class DataExporter:
     """
-    Handles exporting scraped data to JSON and NDJSON files.
+    Handles exporting scraped data to JSON and NDJSON files or a SQLite database.
+
+    Records are streamed through a RecordSink, so exports use constant memory
+    regardless of how many items the iterable yields. Optional stages run on
+    the stream first: a MediaDownloader fetches attachments and adds their
+    local paths, and a ContentProcessor extracts plain text, hashtags,
+    mentions, links and a language hint from the HTML content. With a
+    QueryIndex, every JSON/NDJSON file is indexed right after it is written.
     """
 
-    def __init__(self, output_dir: str) -> None:
+    def __init__(
+        self,
+        output_dir: str,
+        compression: Optional[str] = None,
+        max_records_per_file: Optional[int] = None,
+        max_bytes_per_file: Optional[int] = None,
+        indent: Optional[int] = 2,
+        sqlite_path: Optional[str] = None,
+        processor: Optional[ContentProcessor] = None,
+        media_downloader: Optional[MediaDownloader] = None,
+        query_index: Optional[QueryIndex] = None,
+    ) -> None:
         self.output_dir = Path(output_dir).resolve()
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.compression = compression or None
+        self.max_records_per_file = max_records_per_file or None
+        self.max_bytes_per_file = max_bytes_per_file or None
+        self.indent = indent
+        self.sqlite_path = (
+            Path(sqlite_path).resolve() if sqlite_path else self.output_dir / "mastodon.sqlite3"
+        )
+        self.processor = processor
+        self.media_downloader = media_downloader
+        self.query_index = query_index
+        self.last_output_paths: List[str] = []
         logger.debug("DataExporter initialized with output_dir=%s", self.output_dir)
 
     def _build_path(self, prefix: str, ext: str) -> Path:
@@ -21,20 +72,100 @@ class DataExporter:
         filename = f"{prefix}_{timestamp}.{ext}"
         return self.output_dir / filename
 
+    def open_sink(self, prefix: str, fmt: str = "ndjson") -> Union[RecordSink, SQLiteSink]:
+        """
+        Open a streaming sink using this exporter's compression and rotation settings.
+
+        :param prefix: Filename prefix (unused for "sqlite").
+        :param fmt: "json" (array), "ndjson" or "sqlite".
+        :return: Sink; call close() (or use it as a context manager) to commit.
+        """
+        if fmt == "sqlite":
+            return SQLiteSink(str(self.sqlite_path))
+
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+
+        def path_factory(part: str, ext: str) -> Path:
+            stem = f"{prefix}_{timestamp}" + (f"_{part}" if part else "")
+            return self.output_dir / f"{stem}.{ext}"
+
+        return RecordSink(
+            path_factory,
+            fmt=fmt,
+            compression=self.compression,
+            max_records=self.max_records_per_file,
+            max_bytes=self.max_bytes_per_file,
+            indent=self.indent if fmt == "json" else None,
+        )
+
+    def _export(
+        self, items: Iterable[Dict[str, Any]], prefix: str, fmt: str
+    ) -> Tuple[str, int]:
+        start = time.perf_counter()
+        if self.media_downloader is not None:
+            items = self.media_downloader.process(items)
+        if self.processor is not None:
+            items = self.processor.process(items)
+        # Only time spent in the sink counts as writing; the rest is the
+        # upstream fetching, normalizing and processing of the lazy stream.
+        write_seconds = 0.0
+        sink = self.open_sink(prefix, fmt)
+        try:
+            for item in items:
+                write_start = time.perf_counter()
+                sink.write(item)
+                write_seconds += time.perf_counter() - write_start
+        except BaseException:
+            sink.abort()
+            raise
+        write_start = time.perf_counter()
+        sink.close()
+        write_seconds += time.perf_counter() - write_start
+        elapsed = time.perf_counter() - start
+        self.last_output_paths = sink.paths
+
+        EXPORT_SECONDS.observe(elapsed, format=fmt)
+        EXPORT_WRITE_SECONDS.observe(write_seconds, format=fmt)
+        RECORDS_WRITTEN.inc(sink.count, format=fmt)
+        if fmt != "sqlite":
+            BYTES_WRITTEN.inc(sum(os.path.getsize(path) for path in sink.paths), format=fmt)
+            if self.query_index is not None:
+                self._index(sink.paths)
+        logger.debug(
+            "Export of %d %s records took %.3fs, %.3fs of it writing (%.0f records/s written)",
+            sink.count,
+            fmt,
+            elapsed,
+            write_seconds,
+            sink.count / write_seconds if write_seconds > 0 else 0.0,
+        )
+        if len(sink.paths) > 1:
+            logger.info(
+                "Exported %d records to %d files: %s",
+                sink.count,
+                len(sink.paths),
+                ", ".join(sink.paths),
+            )
+        return sink.paths[0], sink.count
+
+    def _index(self, paths: List[str]) -> None:
+        # The export itself succeeded; a failed index update is caught up by `query`.
+        try:
+            self.query_index.add_files(paths)  # type: ignore[union-attr]
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Indexing %s failed: %s", ", ".join(paths), exc)
+
     def export_json(self, items: Iterable[Dict[str, Any]], prefix: str) -> str:
         """
-        Export iterable of dictionaries to a pretty-printed JSON array.
+        Export iterable of dictionaries to a JSON array, streamed item by item.
 
         :param items: Iterable of dictionaries.
         :param prefix: Filename prefix.
-        :return: String path to created file.
+        :return: String path to created file (the first part when rotating).
         """
-        data: List[Dict[str, Any]] = list(items)
-        path = self._build_path(prefix, "json")
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        logger.info("Exported %d records to %s", len(data), path)
-        return str(path)
+        path, count = self._export(items, prefix, "json")
+        logger.info("Exported %d records to %s", count, path)
+        return path
 
     def export_ndjson(self, items: Iterable[Dict[str, Any]], prefix: str) -> str:
         """
@@ -42,14 +173,61 @@ class DataExporter:
 
         :param items: Iterable of dictionaries.
         :param prefix: Filename prefix.
-        :return: String path to created file.
+        :return: String path to created file (the first part when rotating).
         """
-        path = self._build_path(prefix, "ndjson")
-        count = 0
-        with path.open("w", encoding="utf-8") as f:
-            for item in items:
-                json_line = json.dumps(item, ensure_ascii=False)
-                f.write(json_line + "\n")
-                count += 1
+        path, count = self._export(items, prefix, "ndjson")
         logger.info("Exported %d records to %s (NDJSON)", count, path)
-        return str(path)
\ No newline at end of file
+        return path
+
+    def export_sqlite(self, items: Iterable[Dict[str, Any]], prefix: str) -> str:
+        """
+        Upsert iterable of dictionaries into the SQLite database, keyed by status_id.
+
+        :param items: Iterable of dictionaries.
+        :param prefix: Label for logging (all exports share one database).
+        :return: String path to the database file.
+        """
+        path, count = self._export(items, prefix, "sqlite")
+        logger.info("Upserted %d %s records into %s (SQLite)", count, prefix, path)
+        return path
+
+    def export(self, items: Iterable[Dict[str, Any]], prefix: str, fmt: str = "json") -> str:
+        """
+        Export records in the given format ("json", "ndjson" or "sqlite").
+        """
+        if fmt == "ndjson":
+            return self.export_ndjson(items, prefix)
+        if fmt == "sqlite":
+            return self.export_sqlite(items, prefix)
+        return self.export_json(items, prefix)
+
+    def close(self) -> None:
+        """
+        Shut down the content processing and media download pools and close
+        the query index, if any.
+        """
+        if self.processor is not None:
+            self.processor.close()
+        if self.media_downloader is not None:
+            self.media_downloader.close()
+        if self.query_index is not None:
+            self.query_index.close()
+
+def create_exporter_from_settings(settings: Dict[str, Any]) -> DataExporter:
+    """
+    Build a DataExporter from the output_* settings.
+    """
+    indent = settings.get("output_indent", 2)
+    return DataExporter(
+        settings["output_dir"],
+        compression=settings.get("output_compression") or None,
+        max_records_per_file=int(settings.get("output_rotate_records") or 0) or None,
+        max_bytes_per_file=int(settings.get("output_rotate_bytes") or 0) or None,
+        indent=int(indent) if indent is not None else None,
+        sqlite_path=settings.get("sqlite_path") or None,
+        processor=create_content_processor_from_settings(settings),
+        media_downloader=create_media_downloader_from_settings(settings),
+        query_index=create_query_index_from_settings(settings)
+        if settings.get("query_indexing")
+        else None,
+    )
@@ -0,0 +1,473 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from extractors.account_cache import normalize_username  # type: ignore[import]
+from extractors.content_processor import extract_content  # type: ignore[import]
+
+from .sinks import COMPRESSION_EXTENSIONS, open_record_file
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    records INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    ordinal INTEGER NOT NULL,
+    offset INTEGER,
+    length INTEGER,
+    created_at REAL,
+    status_id TEXT,
+    current INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_docs_created_at ON docs (created_at);
+CREATE INDEX IF NOT EXISTS idx_docs_status_id ON docs (status_id);
+CREATE INDEX IF NOT EXISTS idx_docs_file_id ON docs (file_id);
+CREATE TABLE IF NOT EXISTS terms (
+    term_id INTEGER PRIMARY KEY,
+    field TEXT NOT NULL,
+    term TEXT NOT NULL,
+    UNIQUE (field, term)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    PRIMARY KEY (term_id, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc_id ON postings (doc_id);
+"""
+
+# DataExporter file names: <prefix>_<timestamp>[_partNNNN].<json|ndjson>[.<compression>].
+_EXPORT_NAME = re.compile(
+    r"^[^.].*_\d{8}T\d{6}Z(_part\d{4})?\.(json|ndjson)"
+    r"(\.(" + "|".join(COMPRESSION_EXTENSIONS.values()) + r"))?$"
+)
+
+_TOKEN = re.compile(r"\w{2,}")
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+# Records fetched from the exported files per round trip of a query.
+_FETCH_BATCH = 256
+
+# Term ID cache entries kept before the cache is reset.
+_MAX_CACHED_TERMS = 500_000
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into the lowercase content terms the index stores.
+    """
+    if not text:
+        return []
+    return list(dict.fromkeys(_TOKEN.findall(text.lower())))
+
+def _parse_created_at(value: Any) -> Optional[float]:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+def _record_terms(record: Mapping[str, Any]) -> Set[Tuple[str, str]]:
+    terms: Set[Tuple[str, str]] = set()
+    hashtags, text = record.get("hashtags"), record.get("text")
+    if hashtags is None or text is None:
+        # Not run through the content processor on export; extract here.
+        extracted = extract_content(record.get("content"))
+        hashtags = extracted["hashtags"] if hashtags is None else hashtags
+        text = extracted["text"] if text is None else text
+    tags = [record.get("tag"), record.get("trend_name"), *hashtags]
+    for tag in tags:
+        if isinstance(tag, str) and tag.strip("# "):
+            terms.add(("tag", tag.strip("# ").lower()))
+    username = record.get("username")
+    if isinstance(username, str) and username.strip():
+        terms.add(("user", normalize_username(username)))
+    terms.update(("term", token) for token in tokenize(text))
+    return terms
+
+def _iter_file(path: str) -> Iterator[Tuple[Optional[int], Optional[int], Any]]:
+    """
+    Yield (offset, length, record) for every record of an exported file.
+
+    Offsets and lengths are in bytes of the uncompressed stream.
+    """
+    with open_record_file(path) as stream:
+        if ".ndjson" in Path(path).suffixes:
+            offset = 0
+            for line in stream:
+                if line.strip():
+                    yield offset, len(line), json.loads(line)
+                offset += len(line)
+            return
+        text = stream.read().decode("utf-8")
+    yield from _iter_json_array(text)
+
+def _iter_json_array(text: str) -> Iterator[Tuple[int, int, Any]]:
+    # Decode one element at a time to learn where each record sits in the file.
+    pos = _WHITESPACE.match(text).end()
+    if not text.startswith("[", pos):
+        json.loads(text)  # Raises on malformed JSON; other documents hold no records.
+        return
+    decoder = json.JSONDecoder()
+    pos += 1
+    # Byte offset of character position `mark`, advanced as records are read.
+    mark, offset = 0, 0
+    while True:
+        pos = _WHITESPACE.match(text, pos).end()
+        if text.startswith(",", pos):
+            pos += 1
+            continue
+        if text.startswith("]", pos):
+            return
+        record, end = decoder.raw_decode(text, pos)
+        offset += len(text[mark:pos].encode("utf-8"))
+        length = len(text[pos:end].encode("utf-8"))
+        yield offset, length, record
+        mark, offset, pos = end, offset + length, end
+
+class QueryIndex:
+    """
+    On-disk index over the JSON and NDJSON files written by DataExporter.
+
+    Each status or trend record becomes one document that points back into
+    its file (byte offset and length in the uncompressed export), so records
+    are read from the exports instead of being copied. Inverted indexes map
+    tags (the record's tag or trend, plus hashtags in its content), usernames
+    and content terms to documents, and created_at is kept in a sorted index.
+
+    Files are indexed incrementally: add_files() after an export, or sync()
+    to pick up every new, changed or deleted file in the output directory.
+    When a status was exported several times, only its latest copy is
+    current; queries return current copies unless asked for all of them.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path).resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._term_ids: Dict[Tuple[str, str], int] = {}
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        logger.debug("QueryIndex initialized at %s", self.path)
+
+    def add_files(self, paths: Iterable[str]) -> int:
+        """
+        Index exported files that are new or changed since they were indexed.
+
+        :param paths: Paths of .json/.ndjson exports (optionally compressed).
+        :return: Number of documents added.
+        """
+        added = 0
+        for path in paths:
+            resolved = str(Path(path).resolve())
+            try:
+                stat = os.stat(resolved)
+            except OSError as exc:
+                logger.warning("Not indexing %s: %s", path, exc)
+                continue
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT file_id, size, mtime_ns FROM files WHERE path = ?", (resolved,)
+                ).fetchone()
+                if row is not None and (row[1], row[2]) == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                added += self._index_file(resolved, stat, row[0] if row is not None else None)
+        return added
+
+    def sync(self, directory: str) -> int:
+        """
+        Bring the index up to date with the exports in a directory.
+
+        New and changed files are indexed, in modification order so the latest
+        export of a status wins, and files that no longer exist are dropped.
+
+        :param directory: Output directory to scan (not recursive).
+        :return: Number of documents added.
+        """
+        start = time.perf_counter()
+        root = Path(directory).resolve()
+        on_disk = sorted(
+            (
+                entry
+                for entry in os.scandir(root)
+                if entry.is_file() and _EXPORT_NAME.match(entry.name)
+            ),
+            key=lambda entry: entry.stat().st_mtime_ns,
+        )
+        present = {str(root / entry.name) for entry in on_disk}
+        with self._lock:
+            known = self._conn.execute("SELECT file_id, path FROM files").fetchall()
+            for file_id, path in known:
+                if Path(path).parent == root and path not in present:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    self._remove_file(file_id)
+                    self._conn.execute("COMMIT")
+                    logger.info("Dropped %s from the query index (file is gone)", path)
+        added = self.add_files(str(root / entry.name) for entry in on_disk)
+        logger.debug(
+            "Synced query index with %s in %.1f ms: %d files, %d documents added",
+            root,
+            (time.perf_counter() - start) * 1000,
+            len(on_disk),
+            added,
+        )
+        return added
+
+    def _term_id(self, term: Tuple[str, str]) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            self._conn.execute("INSERT OR IGNORE INTO terms (field, term) VALUES (?, ?)", term)
+            term_id = self._conn.execute(
+                "SELECT term_id FROM terms WHERE field = ? AND term = ?", term
+            ).fetchone()[0]
+            if len(self._term_ids) >= _MAX_CACHED_TERMS:
+                self._term_ids.clear()
+            self._term_ids[term] = term_id
+        return term_id
+
+    def _index_file(self, path: str, stat: os.stat_result, old_file_id: Optional[int]) -> int:
+        start = time.perf_counter()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if old_file_id is not None:
+                self._remove_file(old_file_id)
+            file_id = self._conn.execute(
+                "INSERT INTO files (path, size, mtime_ns, records, indexed_at) "
+                "VALUES (?, ?, ?, 0, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, time.time()),
+            ).lastrowid
+            # Doc IDs are handed out under the write lock taken by BEGIN IMMEDIATE.
+            next_id = self._conn.execute("SELECT COALESCE(MAX(doc_id), 0) FROM docs").fetchone()[0]
+            docs: List[List[Any]] = []
+            postings: List[Tuple[int, int]] = []
+            latest: Dict[str, int] = {}
+            for ordinal, (offset, length, record) in enumerate(_iter_file(path)):
+                if not isinstance(record, dict):
+                    continue
+                status_id = record.get("status_id")
+                if not status_id and not record.get("trend_name"):
+                    continue
+                next_id += 1
+                status_id = str(status_id) if status_id else None
+                if status_id is not None:
+                    if status_id in latest:
+                        docs[latest[status_id]][-1] = 0
+                    latest[status_id] = len(docs)
+                created_at = _parse_created_at(record.get("created_at"))
+                docs.append([next_id, file_id, ordinal, offset, length, created_at, status_id, 1])
+                postings.extend((self._term_id(term), next_id) for term in _record_terms(record))
+            # Earlier copies of the same statuses stop being current.
+            self._conn.executemany(
+                "UPDATE docs SET current = 0 WHERE status_id = ? AND current = 1",
+                [(status_id,) for status_id in latest],
+            )
+            self._conn.executemany(
+                "INSERT INTO docs (doc_id, file_id, ordinal, offset, length, created_at, "
+                "status_id, current) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                docs,
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO postings (term_id, doc_id) VALUES (?, ?)", postings
+            )
+            self._conn.execute(
+                "UPDATE files SET records = ? WHERE file_id = ?", (len(docs), file_id)
+            )
+            self._conn.execute("COMMIT")
+        except Exception as exc:  # noqa: BLE001
+            self._conn.execute("ROLLBACK")
+            # Term IDs allocated in the rolled-back transaction are gone.
+            self._term_ids.clear()
+            logger.error("Indexing %s failed: %r", path, exc)
+            return 0
+        logger.debug(
+            "Indexed %d records of %s in %.1f ms",
+            len(docs),
+            path,
+            (time.perf_counter() - start) * 1000,
+        )
+        return len(docs)
+
+    def _remove_file(self, file_id: int) -> None:
+        status_ids = [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT status_id FROM docs WHERE file_id = ? AND current = 1 "
+                "AND status_id IS NOT NULL",
+                (file_id,),
+            )
+        ]
+        self._conn.execute(
+            "DELETE FROM postings WHERE doc_id IN (SELECT doc_id FROM docs WHERE file_id = ?)",
+            (file_id,),
+        )
+        self._conn.execute("DELETE FROM docs WHERE file_id = ?", (file_id,))
+        self._conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+        # The newest remaining copy of each status becomes current again.
+        self._conn.executemany(
+            "UPDATE docs SET current = 1 WHERE doc_id = "
+            "(SELECT MAX(doc_id) FROM docs WHERE status_id = ?)",
+            [(status_id,) for status_id in status_ids],
+        )
+
+    def _lookup_terms(self, field: str, values: Iterable[str]) -> List[int]:
+        values = list(values)
+        rows = self._conn.execute(
+            f"SELECT term_id FROM terms WHERE field = ? "
+            f"AND term IN ({', '.join('?' * len(values))})",
+            [field, *values],
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def search(
+        self,
+        tags: Optional[Iterable[str]] = None,
+        users: Optional[Iterable[str]] = None,
+        terms: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = False,
+        all_copies: bool = False,
+    ) -> List[Tuple[str, int, Optional[int], Optional[int]]]:
+        """
+        Find matching documents, ordered by created_at.
+
+        Several tags (or users) match any of them; content terms must all
+        appear. Records without created_at only match when no time range is
+        given and sort first.
+
+        :param tags: Tags, with or without "#".
+        :param users: Usernames or acct handles.
+        :param terms: Words that must appear in the content.
+        :param since: Only records created at or after this unix time.
+        :param until: Only records created before this unix time.
+        :param limit: Maximum number of documents.
+        :param newest_first: Sort by created_at descending.
+        :param all_copies: Include earlier exports of the same status.
+        :return: (path, ordinal, offset, length) locators.
+        """
+        start = time.perf_counter()
+        groups: List[List[int]] = []
+        filters = [
+            ("tag", [tag.strip("# ").lower() for tag in tags or [] if tag.strip("# ")]),
+            ("user", [normalize_username(user) for user in users or [] if user.strip()]),
+        ]
+        # Every content term is its own group, so all of them have to match.
+        filters.extend(("term", [term]) for text in terms or [] for term in tokenize(text))
+        with self._lock:
+            for field, values in filters:
+                if not values:
+                    continue
+                term_ids = self._lookup_terms(field, values)
+                if not term_ids:
+                    return []
+                groups.append(term_ids)
+
+            params: List[Any] = []
+            sql = "SELECT f.path, d.ordinal, d.offset, d.length FROM "
+            if groups:
+                hits = " INTERSECT ".join(
+                    f"SELECT doc_id FROM postings WHERE term_id IN ({', '.join('?' * len(ids))})"
+                    for ids in groups
+                )
+                sql += f"({hits}) AS hits JOIN docs d ON d.doc_id = hits.doc_id "
+                params.extend(term_id for ids in groups for term_id in ids)
+            else:
+                sql += "docs d "
+            sql += "JOIN files f ON f.file_id = d.file_id WHERE 1 = 1"
+            if not all_copies:
+                sql += " AND d.current = 1"
+            if since is not None:
+                sql += " AND d.created_at >= ?"
+                params.append(since)
+            if until is not None:
+                sql += " AND d.created_at < ?"
+                params.append(until)
+            order = "DESC" if newest_first else "ASC"
+            sql += f" ORDER BY d.created_at {order}, d.doc_id {order}"
+            if limit:
+                sql += " LIMIT ?"
+                params.append(int(limit))
+            rows = self._conn.execute(sql, params).fetchall()
+        logger.debug(
+            "Query matched %d records in %.1f ms", len(rows), (time.perf_counter() - start) * 1000
+        )
+        return rows
+
+    def iter_records(self, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the records matching search(**filters) from the exported files.
+
+        Records whose file changed or disappeared since it was indexed are
+        skipped with a warning; sync() repairs the index.
+        """
+        rows = self.search(**filters)
+        # Files indexed without offsets are parsed whole, at most once per query.
+        parsed: Dict[str, List[Any]] = {}
+        for start in range(0, len(rows), _FETCH_BATCH):
+            batch = rows[start:start + _FETCH_BATCH]
+            loaded = self._load(batch, parsed)
+            for row in batch:
+                record = loaded.get((row[0], row[1]))
+                if record is not None:
+                    yield record
+
+    def _load(
+        self,
+        rows: List[Tuple[str, int, Optional[int], Optional[int]]],
+        parsed: Dict[str, List[Any]],
+    ) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        by_path: Dict[str, List[Tuple[int, Optional[int], Optional[int]]]] = {}
+        for path, ordinal, offset, length in rows:
+            by_path.setdefault(path, []).append((ordinal, offset, length))
+        loaded: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for path, wanted in by_path.items():
+            try:
+                if wanted[0][1] is None:
+                    if path not in parsed:
+                        parsed[path] = [record for _o, _l, record in _iter_file(path)]
+                    for ordinal, _offset, _length in wanted:
+                        loaded[(path, ordinal)] = parsed[path][ordinal]
+                    continue
+                with open_record_file(path) as stream:
+                    # Forward seeks only, so compressed streams are read once.
+                    for ordinal, offset, length in sorted(wanted, key=lambda w: w[1] or 0):
+                        stream.seek(offset)
+                        loaded[(path, ordinal)] = json.loads(stream.read(length))
+            except (OSError, ValueError, IndexError) as exc:
+                logger.warning("Could not read indexed records from %s: %s", path, exc)
+        return loaded
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def create_query_index_from_settings(settings: Dict[str, Any]) -> QueryIndex:
+    """
+    Open the query index at query_index_path (default: inside output_dir).
+    """
+    path = settings.get("query_index_path") or os.path.join(
+        settings["output_dir"], "query_index.sqlite3"
+    )
+    return QueryIndex(path)
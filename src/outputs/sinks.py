@@ -0,0 +1,216 @@
+import bz2
+import gzip
+import io
+import json
+import logging
+import lzma
+import os
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Mapping, Optional
+
+try:  # Optional dependency for zstd compression.
+    import zstandard  # type: ignore[import]
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_EXTENSIONS: Dict[str, str] = {
+    "gzip": "gz",
+    "bz2": "bz2",
+    "xz": "xz",
+    "zstd": "zst",
+}
+
+def _open_compressed(raw: IO[bytes], compression: Optional[str]) -> IO[bytes]:
+    if not compression:
+        return raw
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="wb")  # type: ignore[return-value]
+    if compression == "bz2":
+        return bz2.BZ2File(raw, mode="wb")  # type: ignore[return-value]
+    if compression == "xz":
+        return lzma.LZMAFile(raw, mode="wb")  # type: ignore[return-value]
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    raise ValueError(f"Unknown compression: {compression!r}")
+
+def open_record_file(path: str) -> IO[bytes]:
+    """
+    Open an exported file for reading, decompressing by its extension.
+
+    :param path: Path of a .json/.ndjson file, optionally compressed.
+    :return: Binary stream of the uncompressed content.
+    """
+    suffix = Path(path).suffix
+    if suffix == ".gz":
+        return gzip.open(path, "rb")  # type: ignore[return-value]
+    if suffix == ".bz2":
+        return bz2.open(path, "rb")  # type: ignore[return-value]
+    if suffix == ".xz":
+        return lzma.open(path, "rb")  # type: ignore[return-value]
+    if suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("Reading zstd files requires the 'zstandard' package")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        # The bare reader cannot iterate lines; buffering adds readline() and
+        # keeps forward seeks working.
+        return io.BufferedReader(reader)  # type: ignore[arg-type]
+    return open(path, "rb")
+
+class _Part:
+    """
+    One output file being written to a temp path until it is committed.
+    """
+
+    def __init__(self, path: Path, compression: Optional[str]) -> None:
+        self.path = path
+        self.tmp_path = path.with_name(f".{path.name}.tmp")
+        self._raw = self.tmp_path.open("wb")
+        self._stream = _open_compressed(self._raw, compression)
+        self.bytes_written = 0
+        self.records = 0
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self._stream.write(data)
+        self.bytes_written += len(data)
+
+    def commit(self) -> None:
+        self._finish()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        try:
+            self._finish()
+        finally:
+            try:
+                self.tmp_path.unlink()
+            except OSError:
+                pass
+
+    def _finish(self) -> None:
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+
+class RecordSink:
+    """
+    Streams records to JSON-array or NDJSON files with constant memory use.
+
+    Each file is written to a hidden temp file and atomically renamed into
+    place when complete, so readers never see a half-written file. Output can
+    be compressed (gzip, bz2, xz, or zstd when `zstandard` is installed) and
+    rotated into numbered parts once a part reaches `max_records` records or
+    `max_bytes` uncompressed bytes.
+
+    `path_factory(part_suffix, extension)` returns the final path of each part.
+    """
+
+    def __init__(
+        self,
+        path_factory: Callable[[str, str], Path],
+        fmt: str = "ndjson",
+        compression: Optional[str] = None,
+        max_records: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        indent: Optional[int] = None,
+    ) -> None:
+        if fmt not in ("json", "ndjson"):
+            raise ValueError(f"Unknown output format: {fmt!r}")
+        if compression and compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unknown compression: {compression!r}")
+        self.fmt = fmt
+        self.compression = compression or None
+        self.max_records = max_records or None
+        self.max_bytes = max_bytes or None
+        self.indent = indent
+        self.paths: List[str] = []
+        self.count = 0
+        self._path_factory = path_factory
+        self._rotating = bool(self.max_records or self.max_bytes)
+        self._part: Optional[_Part] = None
+
+    @property
+    def extension(self) -> str:
+        ext = self.fmt
+        if self.compression:
+            ext += "." + COMPRESSION_EXTENSIONS[self.compression]
+        return ext
+
+    def _open_part(self) -> _Part:
+        suffix = f"part{len(self.paths) + 1:04d}" if self._rotating else ""
+        part = _Part(self._path_factory(suffix, self.extension), self.compression)
+        if self.fmt == "json":
+            part.write("[")
+        return part
+
+    def _close_part(self) -> None:
+        part = self._part
+        if part is None:
+            return
+        self._part = None
+        if self.fmt == "json":
+            part.write("\n]\n" if part.records else "]\n")
+        part.commit()
+        self.paths.append(str(part.path))
+        logger.debug("Committed %d records to %s", part.records, part.path)
+
+    def _encode(self, record: Mapping[str, Any]) -> str:
+        if not isinstance(record, dict):
+            record = dict(record)
+        if self.fmt == "ndjson":
+            return json.dumps(record, ensure_ascii=False) + "\n"
+        if self.indent is None:
+            return json.dumps(record, ensure_ascii=False)
+        text = json.dumps(record, ensure_ascii=False, indent=self.indent)
+        pad = " " * self.indent
+        return pad + text.replace("\n", "\n" + pad)
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        if self._part is None:
+            self._part = self._open_part()
+        part = self._part
+        text = self._encode(record)
+        if self.fmt == "json":
+            text = ("\n" if not part.records else ",\n") + text
+        part.write(text)
+        part.records += 1
+        self.count += 1
+
+        if (self.max_records and part.records >= self.max_records) or (
+            self.max_bytes and part.bytes_written >= self.max_bytes
+        ):
+            self._close_part()
+
+    def close(self) -> List[str]:
+        """
+        Commit the current part and return the paths of all files written.
+
+        An empty run still produces one (empty) file so callers always get a path.
+        """
+        if self._part is None and not self.paths:
+            self._part = self._open_part()
+        self._close_part()
+        return self.paths
+
+    def abort(self) -> None:
+        """
+        Discard the part in progress; parts already committed are kept.
+        """
+        if self._part is not None:
+            self._part.abort()
+            self._part = None
+
+    def __enter__(self) -> "RecordSink":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,150 @@
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Normalized record fields stored as columns; anything else goes into `extra`.
+RECORD_COLUMNS = (
+    "status_id",
+    "trend_name",
+    "username",
+    "content",
+    "created_at",
+    "media",
+    "tag",
+    "search_query",
+    "url",
+    "replies_count",
+    "reblogs_count",
+    "favourites_count",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    status_id TEXT PRIMARY KEY,
+    trend_name TEXT,
+    username TEXT,
+    content TEXT,
+    created_at TEXT,
+    media TEXT,
+    tag TEXT,
+    search_query TEXT,
+    url TEXT,
+    replies_count INTEGER,
+    reblogs_count INTEGER,
+    favourites_count INTEGER,
+    extra TEXT,
+    first_seen_at REAL NOT NULL,
+    last_seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_tag ON records (tag);
+CREATE INDEX IF NOT EXISTS idx_records_username ON records (username);
+CREATE INDEX IF NOT EXISTS idx_records_created_at ON records (created_at);
+"""
+
+# Counters and content take the latest value; context columns (tag, query,
+# trend) keep what earlier sightings recorded when the new one has none.
+_UPSERT = f"""
+INSERT INTO records ({", ".join(RECORD_COLUMNS)}, extra, first_seen_at, last_seen_at)
+VALUES ({", ".join("?" * (len(RECORD_COLUMNS) + 3))})
+ON CONFLICT (status_id) DO UPDATE SET
+    trend_name = COALESCE(excluded.trend_name, records.trend_name),
+    username = COALESCE(excluded.username, records.username),
+    content = COALESCE(excluded.content, records.content),
+    created_at = COALESCE(excluded.created_at, records.created_at),
+    media = excluded.media,
+    tag = COALESCE(excluded.tag, records.tag),
+    search_query = COALESCE(excluded.search_query, records.search_query),
+    url = COALESCE(excluded.url, records.url),
+    replies_count = COALESCE(excluded.replies_count, records.replies_count),
+    reblogs_count = COALESCE(excluded.reblogs_count, records.reblogs_count),
+    favourites_count = COALESCE(excluded.favourites_count, records.favourites_count),
+    extra = COALESCE(excluded.extra, records.extra),
+    last_seen_at = excluded.last_seen_at
+"""
+
+def _to_sql(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+class SQLiteSink:
+    """
+    Upserts normalized records into a SQLite database keyed by status_id.
+
+    Records are buffered and written in batches inside a single transaction
+    each, so the same status seen by several runs or extractors is stored
+    once. Indexes on tag, username and created_at serve downstream queries.
+    Exposes the same write/close/abort interface as RecordSink.
+
+    Only status records belong here: trends, accounts and hashtags carry
+    other IDs in status_id, so callers keep them out of this format.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500) -> None:
+        self.path = Path(path).resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, int(batch_size))
+        self.paths: List[str] = [str(self.path)]
+        self.count = 0
+        self.skipped = 0
+        self._buffer: List[Tuple[Any, ...]] = []
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        status_id = record.get("status_id")
+        if status_id is None:
+            self.skipped += 1
+            return
+        now = time.time()
+        extra = {k: v for k, v in record.items() if k not in RECORD_COLUMNS}
+        row = tuple(
+            str(status_id) if column == "status_id" else _to_sql(record.get(column))
+            for column in RECORD_COLUMNS
+        ) + (json.dumps(extra, ensure_ascii=False) if extra else None, now, now)
+        self._buffer.append(row)
+        self.count += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer or self._conn is None:
+            return
+        with self._conn:
+            self._conn.executemany(_UPSERT, self._buffer)
+        logger.debug("Upserted %d records into %s", len(self._buffer), self.path)
+        self._buffer.clear()
+
+    def close(self) -> List[str]:
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+        if self.skipped:
+            logger.warning("Skipped %d records without status_id", self.skipped)
+        return self.paths
+
+    def abort(self) -> None:
+        """
+        Drop buffered records; batches already committed are kept.
+        """
+        self._buffer.clear()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "SQLiteSink":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
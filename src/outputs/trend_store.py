@@ -0,0 +1,367 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Ranking windows in seconds.
+WINDOWS = {"1h": 3600, "24h": 86400, "7d": 7 * 86400}
+
+RANK_BY = ("velocity", "acceleration")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trend_series (
+    instance TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    days TEXT NOT NULL,
+    samples TEXT NOT NULL,
+    first_seen_at REAL NOT NULL,
+    last_seen_at REAL NOT NULL,
+    PRIMARY KEY (instance, tag)
+);
+CREATE TABLE IF NOT EXISTS trend_rankings (
+    instance TEXT NOT NULL,
+    window TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    uses INTEGER,
+    velocity REAL,
+    acceleration REAL,
+    computed_at REAL NOT NULL,
+    PRIMARY KEY (instance, window, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_trend_rankings_velocity
+    ON trend_rankings (window, velocity DESC);
+CREATE INDEX IF NOT EXISTS idx_trend_rankings_acceleration
+    ON trend_rankings (window, acceleration DESC);
+"""
+
+class TrendSeries:
+    """
+    Bounded per-tag history: daily counts plus intra-day poll samples.
+
+    `days` maps the unix day start to [uses, accounts] and keeps the newest
+    `history_days` days; `samples` holds [observed_at, day, uses that day]
+    for the newest `max_samples` polls, at least `min_sample_gap` seconds
+    apart (a closer poll replaces the previous sample).
+    """
+
+    __slots__ = ("days", "samples")
+
+    def __init__(
+        self,
+        days: Optional[Dict[int, List[int]]] = None,
+        samples: Optional[List[List[int]]] = None,
+    ) -> None:
+        self.days: Dict[int, List[int]] = days or {}
+        self.samples: List[List[int]] = samples or []
+
+    @classmethod
+    def loads(cls, days: str, samples: str) -> "TrendSeries":
+        return cls(
+            {int(day): counts for day, counts in json.loads(days)},
+            json.loads(samples),
+        )
+
+    def dumps(self) -> Tuple[str, str]:
+        return (
+            json.dumps(sorted(self.days.items()), separators=(",", ":")),
+            json.dumps(self.samples, separators=(",", ":")),
+        )
+
+    def merge(
+        self,
+        history: Iterable[Dict[str, int]],
+        observed_at: float,
+        history_days: int,
+        max_samples: int,
+        min_sample_gap: float,
+    ) -> None:
+        latest: Optional[Tuple[int, int]] = None
+        for entry in history:
+            day, uses, accounts = entry["day"], entry["uses"], entry["accounts"]
+            # Counts only grow; max() also makes out-of-order polls harmless.
+            known = self.days.get(day)
+            if known is None:
+                self.days[day] = [uses, accounts]
+            else:
+                known[0] = max(known[0], uses)
+                known[1] = max(known[1], accounts)
+            if latest is None or day > latest[0]:
+                latest = (day, self.days[day][0])
+
+        for day in sorted(self.days)[:-history_days]:
+            del self.days[day]
+
+        if latest is None:
+            return
+        sample = [int(observed_at), latest[0], latest[1]]
+        if self.samples and observed_at - self.samples[-1][0] < min_sample_gap:
+            self.samples[-1] = sample
+        else:
+            self.samples.append(sample)
+        del self.samples[:-max_samples]
+
+    def points(self) -> List[Tuple[float, int]]:
+        """
+        Cumulative uses over time: day boundaries plus every poll sample.
+        """
+        base: Dict[int, int] = {}
+        total = 0
+        points: List[Tuple[float, int]] = []
+        for day in sorted(self.days):
+            base[day] = total
+            points.append((float(day), total))
+            total += self.days[day][0]
+        for observed_at, day, uses in self.samples:
+            if day in base:
+                points.append((float(observed_at), base[day] + min(uses, self.days[day][0])))
+        points.sort()
+        return points
+
+def _cumulative_at(points: List[Tuple[float, int]], at: float) -> Optional[float]:
+    # Linear interpolation; None before the first point, flat after the last.
+    if not points or at < points[0][0]:
+        return None
+    index = bisect_right(points, (at, float("inf")))
+    if index >= len(points):
+        return float(points[-1][1])
+    (t0, c0), (t1, c1) = points[index - 1], points[index]
+    if t1 == t0:
+        return float(c1)
+    return c0 + (c1 - c0) * (at - t0) / (t1 - t0)
+
+def _window_rate(
+    points: List[Tuple[float, int]], end: float, seconds: int
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Uses and uses-per-hour in (end - seconds, end].
+
+    A window reaching back before the first data point is shortened to the
+    available span if that still covers at least half of it.
+    """
+    if not points:
+        return None, None
+    start = max(end - seconds, points[0][0])
+    if end - start < seconds / 2:
+        return None, None
+    start_value = _cumulative_at(points, start)
+    end_value = _cumulative_at(points, end)
+    if start_value is None or end_value is None:
+        return None, None
+    uses = end_value - start_value
+    return uses, uses / ((end - start) / 3600)
+
+def compute_rankings(
+    series: TrendSeries, now: float
+) -> Dict[str, Tuple[Optional[int], Optional[float], Optional[float]]]:
+    """
+    Uses, velocity (uses per hour) and acceleration per window.
+
+    Acceleration is the velocity of the window minus that of the window before it.
+
+    :return: Mapping of window name -> (uses, velocity, acceleration).
+    """
+    points = series.points()
+    rankings: Dict[str, Tuple[Optional[int], Optional[float], Optional[float]]] = {}
+    for name, seconds in WINDOWS.items():
+        uses, velocity = _window_rate(points, now, seconds)
+        _previous_uses, previous = _window_rate(points, now - seconds, seconds)
+        acceleration = (
+            velocity - previous if velocity is not None and previous is not None else None
+        )
+        rankings[name] = (
+            round(uses) if uses is not None else None,
+            round(velocity, 4) if velocity is not None else None,
+            round(acceleration, 4) if acceleration is not None else None,
+        )
+    return rankings
+
+class TrendStore:
+    """
+    Incremental trend time-series store backed by SQLite.
+
+    Every poll merges each tag's per-day `history` into a compact TrendSeries
+    and re-ranks all tags of that instance, so "what is rising" is an indexed
+    lookup in trend_rankings instead of a rescan of old trends exports. Tags
+    that drop out of the trends keep their series and fall down the rankings
+    until they have no sample inside the longest window; then they are deleted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        history_days: int = 30,
+        max_samples: int = 288,
+        min_sample_gap: float = 300.0,
+    ) -> None:
+        self.path = Path(path).resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.history_days = max(1, int(history_days))
+        self.max_samples = max(1, int(max_samples))
+        self.min_sample_gap = float(min_sample_gap)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        logger.debug("TrendStore initialized at %s", self.path)
+
+    def merge(
+        self,
+        records: Iterable[Dict[str, Any]],
+        instance: str,
+        observed_at: Optional[float] = None,
+    ) -> int:
+        """
+        Merge one poll of normalized trend records and refresh the rankings.
+
+        :param records: Trend records with "tag" and "history"; a record's own
+            "instance" field (fan-out runs) takes precedence over `instance`.
+        :param instance: Host the records were fetched from.
+        :param observed_at: Poll time (default: now).
+        :return: Number of tags merged.
+        """
+        now = observed_at if observed_at is not None else time.time()
+        by_instance: Dict[str, Dict[str, List[Dict[str, int]]]] = {}
+        for record in records:
+            tag = record.get("tag") or record.get("trend_name")
+            if not isinstance(tag, str) or not tag:
+                continue
+            host = record.get("instance") or instance
+            by_instance.setdefault(host, {})[tag.lstrip("#").lower()] = (
+                record.get("history") or []
+            )
+
+        # Series not polled within the longest window would rank as flat anyway.
+        stale_before = now - max(WINDOWS.values())
+        merged = 0
+        with self._lock, self._conn:
+            for host, tags in by_instance.items():
+                pruned = self._conn.execute(
+                    "DELETE FROM trend_series WHERE instance = ? AND last_seen_at < ?",
+                    (host, stale_before),
+                ).rowcount
+                if pruned:
+                    logger.debug("Pruned %d stale trend series of %s", pruned, host)
+                stored = {
+                    tag: TrendSeries.loads(days, samples)
+                    for tag, days, samples in self._conn.execute(
+                        "SELECT tag, days, samples FROM trend_series WHERE instance = ?",
+                        (host,),
+                    )
+                }
+                rows = []
+                for tag, history in tags.items():
+                    series = stored.setdefault(tag, TrendSeries())
+                    series.merge(
+                        history, now, self.history_days, self.max_samples, self.min_sample_gap
+                    )
+                    rows.append((host, tag, *series.dumps(), now, now))
+                self._conn.executemany(
+                    """
+                    INSERT INTO trend_series
+                        (instance, tag, days, samples, first_seen_at, last_seen_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (instance, tag) DO UPDATE SET
+                        days = excluded.days,
+                        samples = excluded.samples,
+                        last_seen_at = MAX(last_seen_at, excluded.last_seen_at)
+                    """,
+                    rows,
+                )
+                self._conn.execute("DELETE FROM trend_rankings WHERE instance = ?", (host,))
+                self._conn.executemany(
+                    """
+                    INSERT INTO trend_rankings
+                        (instance, window, tag, uses, velocity, acceleration, computed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (host, window, tag, *values, now)
+                        for tag, series in stored.items()
+                        for window, values in compute_rankings(series, now).items()
+                    ],
+                )
+                merged += len(rows)
+        logger.info(
+            "Merged %d trends from %d instance(s) into %s", merged, len(by_instance), self.path
+        )
+        return merged
+
+    def rising(
+        self,
+        window: str = "1h",
+        limit: int = 20,
+        instance: Optional[str] = None,
+        by: str = "velocity",
+    ) -> List[Dict[str, Any]]:
+        """
+        Look up the precomputed ranking for a window.
+
+        :param window: One of WINDOWS.
+        :param limit: Maximum number of tags.
+        :param instance: Only tags from this host (None = every instance).
+        :param by: "velocity" or "acceleration".
+        :return: Ranked rows, fastest first; tags without enough data are omitted.
+        """
+        if window not in WINDOWS:
+            raise ValueError(f"Unknown window {window!r}; expected one of {', '.join(WINDOWS)}")
+        if by not in RANK_BY:
+            raise ValueError(f"Unknown ranking {by!r}; expected one of {', '.join(RANK_BY)}")
+        query = (
+            "SELECT instance, tag, uses, velocity, acceleration, computed_at "
+            f"FROM trend_rankings WHERE window = ? AND {by} IS NOT NULL"
+        )
+        params: List[Any] = [window]
+        if instance:
+            query += " AND instance = ?"
+            params.append(instance)
+        query += f" ORDER BY {by} DESC LIMIT ?"
+        params.append(max(1, int(limit)))
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {
+                "rank": rank,
+                "window": window,
+                "instance": host,
+                "tag": tag,
+                "uses": uses,
+                "velocity": velocity,
+                "acceleration": acceleration,
+                "computed_at": computed_at,
+            }
+            for rank, (host, tag, uses, velocity, acceleration, computed_at) in enumerate(
+                rows, start=1
+            )
+        ]
+
+    def series(self, instance: str, tag: str) -> Optional[TrendSeries]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT days, samples FROM trend_series WHERE instance = ? AND tag = ?",
+                (instance, tag.lstrip("#").lower()),
+            ).fetchone()
+        return TrendSeries.loads(*row) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def create_trend_store_from_settings(settings: Dict[str, Any]) -> Optional[TrendStore]:
+    """
+    Build a TrendStore if trend_store_path is set, else None.
+    """
+    path = settings.get("trend_store_path")
+    if not path:
+        return None
+    return TrendStore(
+        path,
+        history_days=int(settings.get("trend_history_days", 30)),
+        max_samples=int(settings.get("trend_max_samples", 288)),
+        min_sample_gap=float(settings.get("trend_min_sample_gap", 300.0)),
+    )